@@ -3,39 +3,51 @@
 activity-pulse.py — minute-resolution Claude activity tracker.
 
 Runs every minute via cron. Detects session file changes by comparing
-mtimes against a saved state, records active minutes in a rolling log,
-and writes an hourly-bucketed JSON for the homepage sparkline.
+mtimes against a saved state, records active minutes in a minute ring,
+and writes an hourly-bucketed JSON for the homepage sparkline
+(--window-days 7|30 for a longer one).
 
 State:  /tmp/activity-pulse-state.json   — {filepath: mtime} snapshot
-Log:    /tmp/activity-pulse-log.json     — list of active minute timestamps
+Ring:   /tmp/activity-pulse-ring.bin     — 30 days × 1440 one-byte minute slots
 Output: public/data/activity-pulse.json  — 24h hourly buckets for frontend
+
+--watch runs it as a long-lived daemon instead (activity-pulse.service):
+inotify watches on the projects tree record the minute of every session-file
+write as it happens, and the buckets are flushed every --flush-interval
+seconds. No per-minute tree scan; the state file is unused in that mode.
 """
 
+import argparse
+import ctypes
 import json
+import mmap
 import os
+import select
+import struct
+import sys
 import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
-CLAUDE_DIR = Path.home() / ".claude" / "projects"
+from claude_sessions import SOURCES, discover_session_files
+
+# Local (dc0) only — the DC-1 mirror changes in 4-hourly rsync bursts, not live.
+LOCAL_SOURCES = SOURCES[:1]
 STATE_FILE = Path("/tmp/activity-pulse-state.json")
-LOG_FILE = Path("/tmp/activity-pulse-log.json")
+LOG_FILE = Path("/tmp/activity-pulse-log.json")  # pre-ring format, imported once
+RING_FILE = Path("/tmp/activity-pulse-ring.bin")
 OUTPUT_FILE = Path(__file__).parent.parent / "public" / "data" / "activity-pulse.json"
 
 WINDOW_HOURS = 24
+RING_DAYS = 30  # minutes retained; --window-days can be anything up to this
 
 
 def scan_session_files() -> dict[str, float]:
     """Return {filepath: mtime} for all session JSONL files."""
-    mtimes = {}
-    if not CLAUDE_DIR.exists():
-        return mtimes
-    for f in CLAUDE_DIR.rglob("*.jsonl"):
-        try:
-            mtimes[str(f)] = f.stat().st_mtime
-        except OSError:
-            pass
-    return mtimes
+    return {
+        str(sf.path): sf.mtime
+        for sf in discover_session_files(subagents=True, sources=LOCAL_SOURCES)
+    }
 
 
 def load_json(path: Path) -> list | dict:
@@ -51,10 +63,130 @@ def save_json(path: Path, data):
         json.dump(data, f)
 
 
-def main():
+def epoch_minute(dt: datetime) -> int:
+    return int(dt.timestamp()) // 60
+
+
+class MinuteRing:
+    """One byte per minute for the last RING_DAYS, in a memory-mapped file.
+
+    Slot = epoch-minute % slots. The header keeps the newest minute seen
+    (head); moving head forward zeroes the slots it passes over, so stale
+    minutes from the previous lap never leak into a count. mark() is O(1)
+    and a window count is a C-level bytes.count over at most two slices.
+    """
+
+    HEADER = struct.Struct("<4sIq")  # magic, slots, head epoch-minute
+    MAGIC = b"APR1"
+
+    def __init__(self, path: Path, days: int = RING_DAYS):
+        self.slots = days * 1440
+        size = self.HEADER.size + self.slots
+        fresh = not path.exists() or path.stat().st_size != size
+        with open(path, "a+b") as f:
+            if fresh:
+                f.truncate(0)
+                f.truncate(size)
+            self.buf = mmap.mmap(f.fileno(), size)
+        magic, slots, self.head = self.HEADER.unpack_from(self.buf, 0)
+        if magic != self.MAGIC or slots != self.slots:
+            self.buf[:] = bytes(size)
+            self.head = 0
+            self.HEADER.pack_into(self.buf, 0, self.MAGIC, self.slots, 0)
+            fresh = True
+        if fresh:
+            self._import_log()
+
+    def _import_log(self):
+        """One-off carry-over of the old list-of-ISO-strings log."""
+        for ts in load_json(LOG_FILE):
+            try:
+                self.mark(epoch_minute(datetime.fromisoformat(ts)))
+            except (TypeError, ValueError):
+                continue
+
+    def advance(self, minute: int):
+        if minute <= self.head:
+            return
+        stale = min(minute - self.head, self.slots)
+        self._fill(minute - stale + 1, minute + 1, 0)
+        self.head = minute
+        self.HEADER.pack_into(self.buf, 0, self.MAGIC, self.slots, minute)
+
+    def mark(self, minute: int):
+        self.advance(minute)
+        if minute > self.head - self.slots:
+            self.buf[self.HEADER.size + minute % self.slots] = 1
+
+    def _spans(self, start: int, end: int):
+        """[start, end) in epoch-minutes → ≤2 (lo, hi) byte ranges in buf."""
+        if end - start >= self.slots:
+            start = end - self.slots
+        lo = start % self.slots
+        hi = lo + (end - start)
+        off = self.HEADER.size
+        if hi <= self.slots:
+            return [(off + lo, off + hi)]
+        return [(off + lo, off + self.slots), (off, off + hi - self.slots)]
+
+    def _fill(self, start: int, end: int, value: int):
+        for lo, hi in self._spans(start, end):
+            self.buf[lo:hi] = bytes([value]) * (hi - lo)
+
+    def count(self, start: int, end: int) -> int:
+        """Active minutes in [start, end), clipped to what the ring still holds."""
+        start = max(start, self.head - self.slots + 1)
+        end = min(end, self.head + 1)
+        if end <= start:
+            return 0
+        return sum(self.buf[lo:hi].count(1) for lo, hi in self._spans(start, end))
+
+    def flush(self):
+        self.buf.flush()
+
+
+def record_minutes(minutes, now: datetime) -> MinuteRing:
+    """Mark active epoch-minutes in the ring and roll it forward to now."""
+    ring = MinuteRing(RING_FILE)
+    for m in minutes:
+        ring.mark(m)
+    ring.advance(epoch_minute(now))
+    ring.flush()
+    return ring
+
+
+def write_pulse(ring: MinuteRing, now: datetime, window_hours: int = WINDOW_HOURS, mirrors=()) -> int:
+    """Hourly buckets for the last window_hours → OUTPUT_FILE (+ any mirror copies)."""
+    buckets: list[dict] = []
+    for h in range(window_hours):
+        bucket_start = (now - timedelta(hours=window_hours - h)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        start = epoch_minute(bucket_start)
+        buckets.append({
+            "hour": bucket_start.strftime("%Y-%m-%dT%H:%M"),
+            "minutes": ring.count(start, start + 60),
+        })
+
+    now_min = epoch_minute(now)
+    total = ring.count(now_min - window_hours * 60 + 1, now_min + 1)
+    output = {
+        "generated": now.isoformat(timespec="seconds"),
+        "windowHours": window_hours,
+        "totalActiveMinutes": total,
+        "buckets": buckets,
+    }
+    for path in (OUTPUT_FILE, *mirrors):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        save_json(tmp, output)
+        tmp.replace(path)
+    return total
+
+
+def main(window_hours: int = WINDOW_HOURS):
     now = datetime.now(timezone.utc)
     now_ts = now.isoformat(timespec="seconds")
-    cutoff = now - timedelta(hours=WINDOW_HOURS)
 
     # 1. Scan current mtimes
     current = scan_session_files()
@@ -73,44 +205,112 @@ def main():
     # 4. Save new state
     save_json(STATE_FILE, current)
 
-    # 5. Update activity log
-    log: list[str] = load_json(LOG_FILE)
+    # 5. Mark this minute in the ring
+    ring = record_minutes([epoch_minute(now)] if active else [], now)
+
+    # 6-7. Hourly buckets → output
+    total = write_pulse(ring, now, window_hours)
+
     if active:
-        log.append(now_ts)
+        print(f"[{now_ts}] Active — {total} minutes in last {window_hours}h")
 
-    # Prune to last 24h
-    cutoff_str = cutoff.isoformat(timespec="seconds")
-    log = [ts for ts in log if ts >= cutoff_str]
-    save_json(LOG_FILE, log)
 
-    # 6. Build hourly buckets for the last 24 hours
-    buckets: list[dict] = []
-    for h in range(WINDOW_HOURS):
-        bucket_start = (now - timedelta(hours=WINDOW_HOURS - h)).replace(
-            minute=0, second=0, microsecond=0
-        )
-        bucket_end = bucket_start + timedelta(hours=1)
-        start_str = bucket_start.isoformat(timespec="seconds")
-        end_str = bucket_end.isoformat(timespec="seconds")
-        minutes = sum(1 for ts in log if start_str <= ts < end_str)
-        buckets.append({
-            "hour": bucket_start.strftime("%Y-%m-%dT%H:%M"),
-            "minutes": minutes,
-        })
+# ── --watch: inotify daemon ───────────────────────────────────
+#
+# Instead of a per-minute rglob + stat of every JSONL, keep one inotify watch
+# per directory under the projects tree and note the minute of every write to a
+# session file. Buckets are flushed on a timer. stdlib only (ctypes + select).
 
-    # 7. Write output
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    output = {
-        "generated": now_ts,
-        "windowHours": WINDOW_HOURS,
-        "totalActiveMinutes": len(log),
-        "buckets": buckets,
-    }
-    save_json(OUTPUT_FILE, output)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len — then len bytes of NUL-padded name
 
-    if active:
-        print(f"[{now_ts}] Active — {len(log)} minutes in last 24h")
+
+class Inotify:
+    """Minimal recursive inotify over libc via ctypes."""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths: dict[int, str] = {}
+
+    def watch_tree(self, root: str):
+        for dirpath, _dirnames, _files in os.walk(root):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                self.paths[wd] = dirpath
+
+    def read(self):
+        """Yield (dir, name, mask) for every queued event."""
+        buf = os.read(self.fd, 64 * 1024)
+        i = 0
+        while i < len(buf):
+            wd, mask, _cookie, length = EVENT.unpack_from(buf, i)
+            i += EVENT.size
+            name = buf[i:i + length].rstrip(b"\0").decode(errors="replace")
+            i += length
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            yield self.paths.get(wd, ""), name, mask
+
+
+def watch(flush_s: float, window_hours: int = WINDOW_HOURS, mirrors=()):
+    root = LOCAL_SOURCES[0][0]
+    if not root.exists():
+        print(f"{root} does not exist — nothing to watch", file=sys.stderr)
+        return 1
+    ino = Inotify()
+    ino.watch_tree(str(root))
+    print(f"watching {len(ino.paths)} dirs under {root}; flushing every {flush_s:.0f}s", flush=True)
+
+    pending: set[int] = set()
+    next_flush = time.monotonic()
+    while True:
+        timeout = max(0.0, next_flush - time.monotonic())
+        ready, _, _ = select.select([ino.fd], [], [], timeout)
+        if ready:
+            minute = epoch_minute(datetime.now(timezone.utc))
+            for dirpath, name, mask in ino.read():
+                if mask & IN_Q_OVERFLOW:  # events dropped — something was certainly happening
+                    pending.add(minute)
+                elif mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        ino.watch_tree(os.path.join(dirpath, name))
+                elif name.endswith(".jsonl"):
+                    pending.add(minute)
+        if time.monotonic() >= next_flush:
+            now = datetime.now(timezone.utc)
+            total = write_pulse(record_minutes(pending, now), now, window_hours, mirrors)
+            if pending:
+                print(f"[{now.isoformat(timespec='seconds')}] Active — {total} minutes in last {window_hours}h",
+                      flush=True)
+            pending.clear()
+            next_flush = time.monotonic() + flush_s
 
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="minute-resolution Claude activity tracker")
+    ap.add_argument("--watch", action="store_true",
+                    help="run as a daemon on inotify instead of one cron-driven mtime scan")
+    ap.add_argument("--flush-interval", type=float, default=60, metavar="S",
+                    help="--watch: seconds between writes of activity-pulse.json")
+    ap.add_argument("--mirror", action="append", default=[], type=Path, metavar="FILE",
+                    help="--watch: also write the output here (repeatable)")
+    ap.add_argument("--window-days", type=int, choices=(1, 7, RING_DAYS), default=WINDOW_HOURS // 24,
+                    help="sparkline length in days (hourly buckets); the ring always keeps %d" % RING_DAYS)
+    args = ap.parse_args()
+    if args.watch:
+        sys.exit(watch(args.flush_interval, args.window_days * 24, args.mirror))
+    main(args.window_days * 24)
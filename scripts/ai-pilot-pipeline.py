@@ -9,10 +9,16 @@ import json
 import os
 import re
 import sys
+import time
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from claude_sessions import (
+    SOURCES, TECH_PATTERNS, SessionIndexAggregator, ToolSampleAggregator,
+    discover_session_files, load_snapshot, sample_files, scan,
+)
+
 CLAUDE_DIR = Path.home() / ".claude"
 CLAUDE_DC1_DIR = Path.home() / ".claude-dc1"
 STATS_CACHE = CLAUDE_DIR / "stats-cache.json"
@@ -30,6 +36,8 @@ if CLAUDE_DC1_DIR.exists():
 USER_PROJECTS = Path.home() / "projects"
 
 DEFAULT_OUTPUT = Path(__file__).parent.parent / "public" / "data" / "ai-pilot-data.json"
+# refresh-stats-cache.py runs just ahead of us in the 4h chain; older than this → rescan.
+SCAN_MAX_AGE_S = 6 * 3600
 
 # Domain keyword dictionaries
 DOMAIN_KEYWORDS = {
@@ -81,24 +89,6 @@ DOMAIN_KEYWORDS = {
     ],
 }
 
-# Technology extraction patterns
-TECH_PATTERNS = [
-    "Python", "TypeScript", "JavaScript", "React", "Next.js", "Tailwind CSS",
-    "D3.js", "Node.js", "FastAPI", "Flask", "Django", "Docker", "Nginx",
-    "PostgreSQL", "SQLite", "DuckDB", "Redis", "MongoDB", "Snowflake",
-    "AWS", "GCP", "Azure", "Vercel", "GitHub Actions", "Terraform",
-    "Kubernetes", "Raspberry Pi", "Arduino", "ESP32", "MQTT", "LoRa",
-    "Ollama", "LangChain", "OpenAI", "Anthropic", "Rust", "Go", "C++",
-    "Svelte", "Vue.js", "Angular", "GraphQL", "REST API", "WebSocket",
-    "Socket.IO", "Framer Motion", "Recharts", "Shadcn", "Radix UI",
-    "Tailwind", "CSS", "HTML", "Bash", "Linux", "systemd", "PM2",
-    "Git", "Markdown", "MDX", "JSON", "YAML", "TOML", "CSV",
-    "Pandas", "NumPy", "Jupyter", "Matplotlib", "Seaborn",
-    "TLS", "Ed25519", "JWT", "OAuth", "SSH", "WireGuard",
-    "Meshtastic", "Zigbee", "Bluetooth", "I2C", "SPI", "GPIO",
-    "SWR", "Zustand", "Redux", "MobX", "Prisma", "Drizzle",
-    "Pydantic", "SQLAlchemy", "Alembic", "Pytest",
-]
 
 
 def log(msg, verbose=False):
@@ -116,119 +106,51 @@ def read_stats_cache(verbose=False):
         return json.load(f)
 
 
-def read_session_data(verbose=False):
-    """Read structured data from JSONL session files across DC-0 + DC-1."""
-    # Collect all JSONL session files, deduplicating by stem
-    jsonl_files = []
-    seen_stems = set()
-    for projects_dir in PROJECTS_DIRS:
-        if not projects_dir.exists():
-            continue
-        for proj_dir in projects_dir.iterdir():
-            if not proj_dir.is_dir():
-                continue
-            for f in proj_dir.glob("*.jsonl"):
-                if f.stem not in seen_stems:
-                    seen_stems.add(f.stem)
-                    jsonl_files.append(f)
-
-    if not jsonl_files:
-        log("No JSONL session files found", verbose)
-        return {"sessions": [], "projects": [], "models": []}
-
-    log(f"Found {len(jsonl_files)} JSONL session files ({len(PROJECTS_DIRS)} sources)", verbose)
-
-    sessions = []
-    project_agg = defaultdict(lambda: {
-        "sessions": 0, "messages": 0,
-        "first_active": None, "last_active": None,
-    })
-    model_agg = defaultdict(lambda: {"msg_count": 0, "total_cost": 0, "total_duration": 0})
-
-    for filepath in jsonl_files:
-        try:
-            messages = []
-            cwd = None
-            with open(filepath, errors="replace") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if entry.get("type") not in ("user", "assistant"):
-                        continue
-                    if entry.get("isSidechain"):
-                        continue
-                    messages.append(entry)
-                    if not cwd and entry.get("cwd"):
-                        cwd = entry["cwd"]
-
-            if not messages:
-                continue
-
-            session_id = filepath.stem
-            first_ts = messages[0].get("timestamp", "")
-            last_ts = messages[-1].get("timestamp", "")
-            user_msgs = sum(1 for m in messages if m.get("type") == "user")
-            asst_msgs = sum(1 for m in messages if m.get("type") == "assistant")
-
-            # Parse timestamps to epoch ms
-            first_epoch = None
-            last_epoch = None
-            try:
-                first_dt = datetime.fromisoformat(first_ts.replace("Z", "+00:00"))
-                last_dt = datetime.fromisoformat(last_ts.replace("Z", "+00:00"))
-                first_epoch = int(first_dt.timestamp() * 1000)
-                last_epoch = int(last_dt.timestamp() * 1000)
-            except (ValueError, TypeError):
-                pass
-
-            sessions.append({
-                "session_id": session_id,
-                "cwd": cwd or "",
-                "first_msg": first_epoch,
-                "last_msg": last_epoch,
-                "msg_count": len(messages),
-                "user_msgs": user_msgs,
-                "asst_msgs": asst_msgs,
-            })
-
-            # Aggregate per project
-            if cwd:
-                pa = project_agg[cwd]
-                pa["sessions"] += 1
-                pa["messages"] += len(messages)
-                if first_epoch and (pa["first_active"] is None or first_epoch < pa["first_active"]):
-                    pa["first_active"] = first_epoch
-                if last_epoch and (pa["last_active"] is None or last_epoch > pa["last_active"]):
-                    pa["last_active"] = last_epoch
-
-            # Aggregate per model
-            for msg in messages:
-                if msg.get("type") != "assistant":
-                    continue
-                model = msg.get("message", {}).get("model", "")
-                if not model or model == "<synthetic>":
-                    continue
-                model_agg[model]["msg_count"] += 1
-
-        except Exception as e:
-            log(f"Error reading {filepath}: {e}", verbose)
-
-    # Build project list sorted by messages
-    projects = sorted(
-        [{"cwd": cwd, **v} for cwd, v in project_agg.items()],
-        key=lambda p: p["messages"],
-        reverse=True,
-    )
-
-    models = [{"model": m, **v} for m, v in model_agg.items()]
+def read_session_data(verbose=False, quick=False, rescan=False):
+    """Session index + tool/tech sample from JSONL session files across DC-0 + DC-1.
+
+    refresh-stats-cache.py folds both in its own pass over the corpus and leaves
+    them in the session-scan snapshot; only re-scan when that is stale/missing.
+    Returns (db_data, jsonl_data).
+    """
+    empty_sample = {"tool_counts": Counter(), "tech_mentions": Counter(), "files_sampled": 0}
+
+    snapshot = None if rescan else load_snapshot(SCAN_MAX_AGE_S)
+    if snapshot:
+        log(f"Using session-scan snapshot ({(time.time() - snapshot['generated']) / 60:.0f} min old)", verbose)
+        db_data = snapshot["sessionIndex"]
+        sample = snapshot["toolSample"]
+        jsonl_data = {
+            "tool_counts": Counter(sample["tool_counts"]),
+            "tech_mentions": Counter(sample["tech_mentions"]),
+            "files_sampled": sample["files_sampled"],
+        }
+    else:
+        files = discover_session_files()
+        if not files:
+            log("No JSONL session files found", verbose)
+            return {"sessions": [], "projects": [], "models": []}, empty_sample
+        log(f"Found {len(files)} JSONL session files ({len(SOURCES)} sources)", verbose)
+
+        index = SessionIndexAggregator()
+        aggregators = [index]
+        sample = None
+        if quick:
+            log("Quick mode: skipping JSONL sampling", verbose)
+        else:
+            sample = ToolSampleAggregator(sample_files(files), TECH_PATTERNS)
+            aggregators.append(sample)
+        scan(files, aggregators, log=lambda m: log(m, verbose))
+        db_data = index.result()
+        jsonl_data = sample.result() if sample else empty_sample
 
-    log(f"Parsed {len(sessions)} sessions, {len(projects)} projects, {len(models)} models", verbose)
-    return {"sessions": sessions, "projects": projects, "models": models}
+    if quick:
+        jsonl_data = empty_sample
+    log(f"Parsed {len(db_data['sessions'])} sessions, {len(db_data['projects'])} projects, "
+        f"{len(db_data['models'])} models", verbose)
+    log(f"Sampled {jsonl_data['files_sampled']} files, found {len(jsonl_data['tool_counts'])} tools, "
+        f"{len(jsonl_data['tech_mentions'])} techs", verbose)
+    return db_data, jsonl_data
 
 
 def read_plan_files(verbose=False):
@@ -293,76 +215,6 @@ def read_claude_md_files(verbose=False):
     return texts
 
 
-def sample_jsonl_files(verbose=False, quick=False):
-    """Sample JSONL conversation files for tool usage and tech mentions."""
-    if quick:
-        log("Quick mode: skipping JSONL sampling", verbose)
-        return {"tool_counts": Counter(), "tech_mentions": Counter(), "files_sampled": 0}
-
-    tool_counts = Counter()
-    tech_mentions = Counter()
-    files_sampled = 0
-    max_files = 100
-
-    # Collect JSONL files from all projects across DC-0 + DC-1
-    all_jsonl = []
-    for projects_dir in PROJECTS_DIRS:
-        for proj_dir in projects_dir.glob("*/"):
-            jsonl_files = sorted(proj_dir.glob("*.jsonl"), key=lambda f: f.stat().st_mtime)
-            if len(jsonl_files) >= 2:
-                all_jsonl.append(jsonl_files[0])   # oldest
-                all_jsonl.append(jsonl_files[-1])  # newest
-            elif jsonl_files:
-                all_jsonl.append(jsonl_files[0])
-
-    all_jsonl = all_jsonl[:max_files]
-    log(f"Sampling {len(all_jsonl)} JSONL files", verbose)
-
-    for jsonl_path in all_jsonl:
-        try:
-            with open(jsonl_path, errors="replace") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    msg = entry.get("message", {})
-                    content = msg.get("content", "")
-
-                    # Extract tool usage from assistant messages
-                    if entry.get("type") == "assistant" and isinstance(content, list):
-                        for block in content:
-                            if isinstance(block, dict) and block.get("type") == "tool_use":
-                                tool_counts[block.get("name", "unknown")] += 1
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                text_lower = block.get("text", "").lower()
-                                for tech in TECH_PATTERNS:
-                                    if tech.lower() in text_lower:
-                                        tech_mentions[tech] += 1
-
-                    # Extract tech mentions from user messages
-                    if entry.get("type") == "user" and isinstance(content, str):
-                        content_lower = content.lower()
-                        for tech in TECH_PATTERNS:
-                            if tech.lower() in content_lower:
-                                tech_mentions[tech] += 1
-
-            files_sampled += 1
-        except Exception:
-            pass
-
-    log(f"Sampled {files_sampled} files, found {len(tool_counts)} tools, {len(tech_mentions)} techs", verbose)
-    return {
-        "tool_counts": tool_counts,
-        "tech_mentions": tech_mentions,
-        "files_sampled": files_sampled,
-    }
-
-
 def read_history_file(verbose=False):
     """Read history.jsonl for command patterns across DC-0 + DC-1."""
     project_switches = 0
@@ -944,6 +796,7 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Print output to stdout instead of file")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
     parser.add_argument("--quick", "-q", action="store_true", help="Skip JSONL sampling for faster run")
+    parser.add_argument("--rescan", action="store_true", help="Ignore the session-scan snapshot and re-read JSONL")
     parser.add_argument("--output", "-o", type=str, default=str(DEFAULT_OUTPUT), help="Output file path")
     args = parser.parse_args()
 
@@ -955,7 +808,7 @@ def main():
     stats = read_stats_cache(args.verbose)
 
     print("Reading JSONL session files...", file=sys.stderr)
-    db_data = read_session_data(args.verbose)
+    db_data, jsonl_data = read_session_data(args.verbose, args.quick, args.rescan)
 
     print("Reading plan files...", file=sys.stderr)
     plans = read_plan_files(args.verbose)
@@ -963,9 +816,6 @@ def main():
     print("Reading CLAUDE.md files...", file=sys.stderr)
     claude_mds = read_claude_md_files(args.verbose)
 
-    print("Sampling JSONL files...", file=sys.stderr)
-    jsonl_data = sample_jsonl_files(args.verbose, args.quick)
-
     print("Reading history...", file=sys.stderr)
     history = read_history_file(args.verbose)
 
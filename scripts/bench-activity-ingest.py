@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+bench-activity-ingest.py — rows/sec of claude-activity-export's --ingest paths.
+
+Builds a synthetic session corpus (realistic turn/tool mix, no real data),
+parses it once with the export's own parse_file, then loads the same rows into
+a fresh in-memory DuckDB through each ingester and reports throughput.
+
+  python3 scripts/bench-activity-ingest.py                 # 20k turns (executemany is slow)
+  python3 scripts/bench-activity-ingest.py --turns 1000000 --paths arrow ndjson
+
+Requires: duckdb; pyarrow for the arrow path (skipped if missing).
+"""
+
+import argparse
+import importlib.util
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import duckdb
+
+_spec = importlib.util.spec_from_file_location(
+    "claude_activity_export", Path(__file__).resolve().parent / "claude-activity-export.py"
+)
+export = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(export)
+
+MODELS = ["claude-opus-4-1", "claude-sonnet-4-5", "claude-haiku-4-5"]
+TOOLS = ["Bash", "Read", "Edit", "Grep", "Glob", "Write", "TodoWrite", "Task"]
+
+
+def synth_corpus(out: Path, n_turns: int, turns_per_file: int = 400, seed: int = 7) -> list[Path]:
+    """Write n_turns user/assistant lines across session files; returns the paths."""
+    rng = random.Random(seed)
+    t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    paths = []
+    for fi in range(0, n_turns, turns_per_file):
+        path = out / f"bench-{fi // turns_per_file:05d}.jsonl"
+        ts = t0 + timedelta(hours=rng.randint(0, 24 * 200))
+        with open(path, "w") as f:
+            for i in range(min(turns_per_file, n_turns - fi)):
+                ts += timedelta(seconds=rng.randint(1, 300))
+                entry = {
+                    "type": "assistant" if i % 2 else "user",
+                    "uuid": f"{fi}-{i}",
+                    "timestamp": ts.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                    "cwd": f"/home/bench/projects/p{fi % 17}",
+                    "gitBranch": "main",
+                    "version": "2.0.0",
+                    "isSidechain": rng.random() < 0.05,
+                }
+                if i % 2:
+                    entry["message"] = {
+                        "model": rng.choice(MODELS),
+                        "usage": {"input_tokens": rng.randint(1, 5000), "output_tokens": rng.randint(1, 2000),
+                                  "cache_read_input_tokens": rng.randint(0, 90000),
+                                  "cache_creation_input_tokens": rng.randint(0, 4000)},
+                        "content": [{"type": "tool_use", "name": rng.choice(TOOLS)}
+                                    for _ in range(rng.choice((0, 0, 1, 1, 2, 3)))],
+                    }
+                else:
+                    entry["message"] = {"content": "synthetic prompt"}
+                f.write(json.dumps(entry) + "\n")
+        paths.append(path)
+    return paths
+
+
+def bench(ingest, batches) -> tuple[float, int]:
+    con = duckdb.connect(":memory:")
+    export.ensure_schema(con)
+    start = time.perf_counter()
+    for turns, tools in batches:
+        con.execute("BEGIN TRANSACTION")
+        for i in range(0, max(len(turns), len(tools)), export.BATCH):
+            ingest(con, turns[i:i + export.BATCH], tools[i:i + export.BATCH])
+        con.execute("COMMIT")
+    elapsed = time.perf_counter() - start
+    got = con.execute("SELECT (SELECT count(*) FROM turns) + (SELECT count(*) FROM tool_calls)").fetchone()[0]
+    con.close()
+    return elapsed, got
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=20_000, help="synthetic turns to generate")
+    ap.add_argument("--paths", nargs="+", default=list(export.INGESTERS), choices=list(export.INGESTERS))
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = synth_corpus(Path(tmp), args.turns)
+        batches = []
+        for path in files:
+            _, turns, tools = export.parse_file(path, "bench", 0)
+            batches.append((turns, tools))
+    n_rows = sum(len(t) + len(c) for t, c in batches)
+    print(f"synthetic corpus: {len(files)} files · {n_rows:,} rows (turns + tool_calls)\n")
+
+    baseline = None
+    for name in args.paths:
+        if name == "arrow" and export.pa is None:
+            print(f"  {name:12s} skipped (pyarrow not installed)")
+            continue
+        elapsed, got = bench(export.INGESTERS[name], batches)
+        rate = n_rows / elapsed
+        baseline = baseline or rate
+        note = "" if got == n_rows else f"  (loaded {got:,}!)"
+        print(f"  {name:12s} {elapsed:7.2f}s  {rate:12,.0f} rows/s  {rate / baseline:5.1f}x{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+bench-cbai-client.py — cbai_client.CbaiClient vs the old per-call urlopen loop.
+
+Starts a local stub of CBAI's /api/v1/chat (fixed latency, optional 503
+rate, counts TCP connections) and pushes the same prompts through:
+
+  urlopen      a fresh urllib connection per prompt, serial, sleep(--pace)
+               between calls — what the pipelines did
+  client xN    CbaiClient at each --concurrency, rate 1/--pace
+
+Offline; no real CBAI needed.
+
+  python3 scripts/bench-cbai-client.py
+  python3 scripts/bench-cbai-client.py --requests 40 --latency 1.5 --pace 2 --concurrency 1 4
+  python3 scripts/bench-cbai-client.py --fail-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cbai_client import CbaiClient
+
+
+class StubCbai(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, fail_rate: float):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    wbufsize = -1  # headers + body in one send(); otherwise Nagle/delayed-ACK adds ~40ms per reply
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        if random.random() < self.server.fail_rate:
+            status, out = 503, b'{"error": "busy"}'
+        else:
+            prompt = body["messages"][0]["content"]
+            status, out = 200, json.dumps({"content": f"ok: {prompt[:40]}"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+def old_loop(url: str, prompts: list[str], pace: float) -> int:
+    ok = 0
+    for prompt in prompts:
+        payload = json.dumps({"messages": [{"role": "user", "content": prompt}],
+                              "provider": "stub", "max_tokens": 100}).encode()
+        req = urllib.request.Request(f"{url}/api/v1/chat", data=payload,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                ok += bool(json.loads(resp.read()).get("content"))
+        except Exception:
+            pass
+        time.sleep(pace)
+    return ok
+
+
+def client_loop(url: str, prompts: list[str], pace: float, concurrency: int) -> int:
+    client = CbaiClient(url, provider="stub", concurrency=concurrency,
+                        rate=1 / pace if pace else 0, backoff=0.05)
+
+    def one(prompt: str) -> bool:
+        try:
+            return bool(client.chat(prompt, max_tokens=100, timeout=30))
+        except Exception:
+            return False
+
+    try:
+        return sum(client.map(one, prompts))
+    finally:
+        client.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.05, help="stub seconds per response")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction of 503s from the stub")
+    ap.add_argument("--pace", type=float, default=0.0, help="old sleep between calls (client rate = 1/pace)")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = ap.parse_args()
+
+    prompts = [f"prompt {i}: summarize repo r{i}" for i in range(args.requests)]
+    print(f"{args.requests} prompts · stub latency {args.latency}s · fail {args.fail_rate:.0%} · pace {args.pace}s\n")
+
+    runs = [("urlopen", lambda url: old_loop(url, prompts, args.pace))]
+    runs += [(f"client x{n}", lambda url, n=n: client_loop(url, prompts, args.pace, n)) for n in args.concurrency]
+
+    baseline = None
+    for name, run in runs:
+        server = StubCbai(args.latency, args.fail_rate)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        start = time.perf_counter()
+        ok = run(server.url)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        server.server_close()
+        baseline = baseline or elapsed
+        print(f"  {name:12s} {elapsed:7.2f}s  {ok:5d} ok  {server.requests:5d} reqs  "
+              f"{server.connections:5d} conns  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+bench-visitors-parse.py — lines/sec of visitors_collector's log-line parser.
+
+Writes a synthetic nginx combined log (realistic ip/ua/path mix, lines a few
+per second apart, no real data), then times per line, over the same file:
+
+  regex      LINE_RE + strptime + astimezone/strftime — what scan() used to do
+  parse_row  the split-on-quotes parser with the memoised timestamp decode
+
+and checks the two agree on every line before reporting — and on a set of
+malformed lines (truncated, extra tokens, out-of-range or non-canonical
+times) plus random mutations of good ones.
+
+  python3 scripts/bench-visitors-parse.py                  # 1M lines
+  python3 scripts/bench-visitors-parse.py --lines 200000
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import visitors_collector as vc
+
+LINE_RE = re.compile(
+    r'^(?P<ip>\S+) \S+ \S+ \[(?P<ts>[^\]]+)\] "(?P<req>[^"]*)" '
+    r'(?P<status>\d{3}) (?P<bytes>\S+) "(?P<ref>[^"]*)" "(?P<ua>[^"]*)"'
+)
+UAS = [
+    "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 Version/17.5 Safari/604.1",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "curl/8.5.0", "-",
+]
+PATHS = ["/", "/about", "/projects/dragonfli?_rsc=1x2y", "/api/trng", "/_next/static/chunks/a.js",
+         "/visitors", "/wp-login.php", "/.env"]
+REFS = ["-", "https://news.ycombinator.com/", "https://bradley.io/projects", "https://www.google.com/"]
+GOOD = '1.2.3.4 - - [12/Aug/2026:18:03:49 -0400] "GET / HTTP/1.1" 200 512 "-" "Mozilla/5.0"\n'
+MALFORMED = [
+    GOOD,
+    GOOD.replace('"Mozilla/5.0"\n', '"Mozilla/5.0\n'),             # truncated: UA never closed
+    GOOD.replace('"Mozilla/5.0"\n', '"Mozilla/5.0" "extra"\n'),    # trailing field
+    GOOD.replace(" 200 512 ", " 200 512 99 "),                      # extra token before ref
+    GOOD.replace(" 200 512 ", " 200 "),                             # no bytes
+    GOOD.replace(" 200 512 ", " 20x 512 "),
+    GOOD.replace(" 200 512 ", " 2000 512 "),
+    GOOD.replace("1.2.3.4 - -", "1.2.3.4  -"),                      # empty ident
+    GOOD.replace("1.2.3.4 - -", "1.2.3.4\t- -"),
+    GOOD.replace("18:03:49", "24:03:49"),
+    GOOD.replace("18:03:49", "18:60:49"),
+    GOOD.replace("18:03:49", "18:03:60"),
+    GOOD.replace("18:03:49", "18:3:49"),
+    GOOD.replace("18:03:49", "18:+3:49"),
+    GOOD.replace("12/Aug", "32/Aug"),
+    GOOD.replace("12/Aug", "00/Aug"),
+    GOOD.replace("12/Aug", "2/Aug"),                                # strptime takes one digit
+    GOOD.replace("12/Aug", " 2/Aug"),
+    GOOD.replace("Aug", "aug"),
+    GOOD.replace("Aug", "Agu"),
+    GOOD.replace("-0400", "Z"),
+    GOOD.replace("-0400", "-04:00"),
+    GOOD.replace("-0400", "+0099"),
+    GOOD.replace("-0400", "+2400"),
+    GOOD.replace("-0400", "0400"),
+    GOOD.replace("[12", "[[12"),
+    GOOD.replace("-0400]", "-0400]]"),
+    GOOD.replace("] ", "]"),
+    '',
+    '-\n',
+    GOOD.replace('"GET / HTTP/1.1"', '"GET /a\\x22b HTTP/1.1"'),
+]
+
+
+def synth_log(path: Path, n_lines: int, seed: int = 7):
+    rng = random.Random(seed)
+    tz = timezone(timedelta(hours=-4))
+    ts = datetime(2026, 8, 1, tzinfo=tz)
+    with open(path, "w") as f:
+        for _ in range(n_lines):
+            ts += timedelta(seconds=rng.choice((0, 0, 0, 1, 1, 2, 5)))
+            ip = f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            f.write(
+                f'{ip} - - [{ts.strftime("%d/%b/%Y:%H:%M:%S %z")}] "GET {rng.choice(PATHS)} HTTP/1.1" '
+                f'{rng.choice((200, 200, 200, 304, 404, 444))} {rng.randint(0, 90000)} '
+                f'"{rng.choice(REFS)}" "{rng.choice(UAS)}"\n'
+            )
+
+
+def regex_parse(line):
+    m = LINE_RE.match(line)
+    if not m:
+        return None
+    try:
+        ts = datetime.strptime(m.group("ts"), "%d/%b/%Y:%H:%M:%S %z")
+    except ValueError:
+        return None
+    utc = ts.astimezone(timezone.utc)
+    # isoformat rather than strftime("%Y-%m-%d"): the same day, except that
+    # glibc leaves years before 1000 unpadded
+    return (m.group("ip"), m.group("req"), m.group("status"), m.group("ref"), m.group("ua"),
+            int(ts.timestamp()), utc.date().isoformat(), utc.hour)
+
+
+def fast_parse(line):
+    r = vc.parse_row(line)
+    if r is None:
+        return None
+    return r.ip, r.req, r.status, r.ref, r.ua, r.ts, vc.day_key(r.day), r.hour
+
+
+def mutations(n: int, seed: int = 11):
+    """Good lines with a character dropped, duplicated or replaced. No raw
+    quote is added: nginx escapes them, and parse_row relies on that."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        line = GOOD
+        for _ in range(rng.randint(1, 2)):
+            i = rng.randrange(len(line))
+            op = rng.randrange(3)
+            c = rng.choice(' []:/-+0123456789aZ\t')
+            if op == 1 and line[i] == '"':
+                op = 0
+            line = line[:i] + (c if op == 2 else line[i] * 2 if op == 1 else "") + line[i + 1:]
+        yield line
+
+
+def bench(parse, path: Path) -> tuple[float, int]:
+    parsed = 0
+    start = time.perf_counter()
+    with open(path, errors="replace") as fh:
+        for line in fh:
+            if parse(line) is not None:
+                parsed += 1
+    return time.perf_counter() - start, parsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=1_000_000, help="synthetic log lines to generate")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "access.log"
+        synth_log(path, args.lines)
+        print(f"synthetic log: {args.lines:,} lines · {path.stat().st_size / 1e6:.0f} MB\n")
+
+        with open(path) as fh:
+            mismatched = sum(1 for line in fh if regex_parse(line) != fast_parse(line))
+        odd = [line for line in (*MALFORMED, *mutations(20_000)) if regex_parse(line) != fast_parse(line)]
+        if mismatched or odd:
+            print(f"  !! parsers disagree on {mismatched:,} synthetic + {len(odd):,} malformed lines")
+            for line in odd[:5]:
+                print(f"     {line!r}")
+
+        baseline = None
+        for name, parse in (("regex", regex_parse), ("parse_row", fast_parse)):
+            elapsed, parsed = bench(parse, path)
+            rate = args.lines / elapsed
+            baseline = baseline or rate
+            print(f"  {name:10s} {elapsed:7.2f}s  {rate:12,.0f} lines/s  {rate / baseline:5.1f}x  ({parsed:,} parsed)")
+
+
+if __name__ == "__main__":
+    main()
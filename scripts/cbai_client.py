@@ -0,0 +1,316 @@
+"""
+cbai_client.py — shared client for the local CBAI chat endpoint.
+
+The pipelines used to open a fresh urllib connection per prompt, run prompts
+one at a time, and `time.sleep(2)` between them. CbaiClient keeps one
+keep-alive HTTP connection per worker thread, runs prompts on a small pool,
+paces them with a token bucket instead of fixed sleeps, and retries dropped
+connections / 429 / 5xx with jittered exponential backoff:
+
+    cbai = CbaiClient.from_env()
+    text = cbai.chat("Summarize ...", max_tokens=500)
+    results = cbai.map(lambda p: cbai.chat(p["prompt"]), items)   # input order
+
+Config (env): CBAI_URL, CBAI_PROVIDER, CBAI_CONCURRENCY (4), CBAI_RATE
+(requests/s, 0.5 — the old one-call-per-2s pacing), CBAI_BURST (1). The
+pace halves whenever CBAI sheds load (429/5xx) and creeps back on successes.
+scripts/bench-cbai-client.py benchmarks it against a local stub server.
+
+With a ResponseCache, chat() is content-addressed: sha256 of (prompt,
+provider, max_tokens) → stored text, in one SQLite file shared by every
+pipeline. Only replies the caller's `validate` accepts are stored, so a
+refusal or an unparseable answer is asked again next run rather than kept
+for the TTL; a rerun with unchanged inputs makes no model calls. Entries expire
+after CBAI_CACHE_TTL_DAYS (30) and the least recently used beyond
+CBAI_CACHE_MAX (5000) are evicted when the cache is opened.
+
+Stdlib only.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class CbaiError(Exception):
+    """Non-retryable (or retries exhausted) failure talking to CBAI."""
+
+
+def extract_json(text: str, pattern: str = r"\{[\s\S]*\}"):
+    """First `pattern` match in a model reply, parsed; None if absent or not JSON."""
+    match = re.search(pattern, text or "")
+    if not match:
+        return None
+    try:
+        return json.loads(match.group())
+    except json.JSONDecodeError:
+        return None
+
+
+class TokenBucket:
+    """`rate` tokens/s, at most `burst` banked; acquire() blocks for one.
+
+    Adaptive (AIMD): slow_down() halves the rate, down to 1/8 of the
+    configured one; speed_up() wins back a tenth of it per call.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = rate / 8
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class ResponseCache:
+    """Content-addressed prompt → response store (SQLite, WAL, TTL + LRU)."""
+
+    def __init__(self, path: Path, ttl_days: float = 30, max_entries: int = 5000):
+        self.path = Path(path)
+        self.ttl_s = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, content TEXT NOT NULL,"
+            " created REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.prune()
+
+    @staticmethod
+    def key(prompt: str, provider: str, max_tokens: int) -> str:
+        return hashlib.sha256(json.dumps([prompt, provider, max_tokens]).encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl_s)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, content: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+
+    def prune(self) -> int:
+        """Drop expired entries, then the least recently used over max_entries."""
+        with self._lock:
+            cur = self._db.execute("DELETE FROM responses WHERE created <= ?", (time.time() - self.ttl_s,))
+            dropped = cur.rowcount
+            cur = self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses"
+                " ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+            dropped += cur.rowcount
+            if dropped > self.max_entries // 10:
+                self._db.execute("VACUUM")
+            return dropped
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CbaiClient:
+    def __init__(self, url: str = "http://127.0.0.1:3220", provider: str = "ollama",
+                 concurrency: int = 4, rate: float = 0.5, burst: int = 1,
+                 retries: int = 3, backoff: float = 1.0, cache: ResponseCache | None = None):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.path = parts.path.rstrip("/") + "/api/v1/chat"
+        self.provider = provider
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+        self.calls = 0  # requests actually sent (cache misses + retries)
+        self._local = threading.local()
+        self._conns: list[http.client.HTTPConnection] = []  # every thread's, for close()
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()  # pool, _conns and the calls counter
+
+    @classmethod
+    def from_env(cls, cache_path: Path | None = None, **overrides) -> "CbaiClient":
+        """Client configured from CBAI_* env; cache_path (or CBAI_CACHE) enables the response cache."""
+        cache_path = os.environ.get("CBAI_CACHE", cache_path)
+        cache = None
+        if cache_path:
+            cache = ResponseCache(
+                Path(cache_path),
+                ttl_days=float(os.environ.get("CBAI_CACHE_TTL_DAYS", "30")),
+                max_entries=int(os.environ.get("CBAI_CACHE_MAX", "5000")),
+            )
+        kwargs = dict(
+            cache=cache,
+            url=os.environ.get("CBAI_URL", "http://127.0.0.1:3220"),
+            provider=os.environ.get("CBAI_PROVIDER", "ollama"),
+            concurrency=int(os.environ.get("CBAI_CONCURRENCY", "4")),
+            rate=float(os.environ.get("CBAI_RATE", "0.5")),
+            burst=int(os.environ.get("CBAI_BURST", "1")),
+        )
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    # ── connection ────────────────────────────────────────────────────
+
+    def _conn(self, timeout: float) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _drop_conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._lock:
+                if conn in self._conns:
+                    self._conns.remove(conn)
+
+    def _post(self, body: bytes, timeout: float) -> tuple[int, bytes]:
+        conn = self._conn(timeout)
+        try:
+            conn.request("POST", self.path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            data = resp.read()  # drain fully so the connection can be reused
+        except BaseException:
+            self._drop_conn()
+            raise
+        if resp.will_close:
+            self._drop_conn()
+        return resp.status, data
+
+    # ── calls ─────────────────────────────────────────────────────────
+
+    def chat(self, prompt: str, max_tokens: int = 1000, timeout: float = 60,
+             validate: Callable[[str], bool] | None = None) -> str:
+        """Send one prompt; return the response's `content` text.
+
+        With a cache, a stored reply is returned without a call, and a fresh
+        one is stored only if `validate(content)` is true — without a
+        validator nothing is stored.
+        """
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(prompt, self.provider, max_tokens)
+            cached = self.cache.get(key)
+            if cached is not None and (validate is None or validate(cached)):
+                return cached
+        body = json.dumps({
+            "messages": [{"role": "user", "content": prompt}],
+            "provider": self.provider,
+            "max_tokens": max_tokens,
+        }).encode()
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            with self._lock:
+                self.calls += 1
+            try:
+                status, data = self._post(body, timeout)
+            except (ConnectionError, http.client.HTTPException) as e:
+                # Includes a keep-alive socket the server already closed
+                if attempt == self.retries:
+                    raise CbaiError(f"CBAI connection failed: {e}") from e
+            else:
+                if status == 200:
+                    self.bucket.speed_up()
+                    content = json.loads(data).get("content", "")
+                    if key is not None and validate is not None and validate(content):
+                        self.cache.put(key, content)
+                    return content
+                if status not in RETRY_STATUS or attempt == self.retries:
+                    raise CbaiError(f"CBAI HTTP {status}: {data[:200]!r}")
+                self.bucket.slow_down()  # server is shedding load: back the pace off for everyone
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def submit(self, fn: Callable[..., R], *args, **kwargs) -> "Future[R]":
+        """fn on the `concurrency`-thread pool (for callers that want as_completed)."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="cbai")
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """fn over items on `concurrency` threads; results in input order."""
+        return [f.result() for f in [self.submit(fn, item) for item in items]]
+
+    def stats(self) -> str:
+        if self.cache is None:
+            return f"cbai: {self.calls} calls (no cache)"
+        return f"cbai: {self.calls} calls, cache {self.cache.hits} hits / {self.cache.misses} misses"
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:  # pool threads' keep-alive sockets too, not just this thread's
+            conn.close()
+        self._local.conn = None
+        if self.cache is not None:
+            self.cache.close()
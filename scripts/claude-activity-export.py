@@ -18,26 +18,41 @@ safe; a uuid primary key on `turns` + ON CONFLICT makes re-reads idempotent.
 
   python3 scripts/claude-activity-export.py            # incremental
   python3 scripts/claude-activity-export.py --full     # wipe + rebuild
+  python3 scripts/claude-activity-export.py --full -j 8  # parse in 8 worker processes
+  python3 scripts/claude-activity-export.py --engine sql # extract in DuckDB (read_ndjson)
   python3 scripts/claude-activity-export.py --parquet data/claude-parquet
   python3 scripts/claude-activity-export.py --db /path/to/other.duckdb
 
-Requires: duckdb (pyenv tinymachines env).
+Rows are bulk-loaded a batch at a time (--ingest): column arrays registered as
+an Arrow relation when pyarrow is available, else NDJSON staged through
+read_json; `executemany` is the old row-at-a-time path. Compare them with
+scripts/bench-activity-ingest.py. The python engine reads through
+claude_sessions.scan (as refresh-stats-cache.py does), with a RowCollector
+turning entries into rows. --engine sql skips Python decoding entirely:
+DuckDB's read_ndjson reads each file's new lines and the same fields are
+extracted (and message.content unnested into tool_calls) in SQL.
+
+Requires: duckdb (pyenv tinymachines env); pyarrow optional.
 """
 
 import argparse
 import json
+import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
 import duckdb
 
-HOME = Path.home()
-# (root, host-label). Local sessions win over the mirror on a stem collision.
-SOURCES = [
-    (HOME / ".claude" / "projects", "dc0"),
-    (HOME / ".claude-dc1" / "projects", "dc1"),
-]
+try:
+    import pyarrow as pa
+except ImportError:  # optional — --ingest auto falls back to NDJSON staging
+    pa = None
+
+from claude_sessions import Aggregator, SessionFile, discover_session_files, read_tail, scan
+
 DEFAULT_DB = Path(__file__).resolve().parent.parent / "data" / "claude-activity.duckdb"
 
 BATCH = 5000
@@ -47,18 +62,9 @@ def log(msg: str):
     print(f"  [{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
 
 
-def discover_files() -> list[tuple[Path, str]]:
-    """All session JSONL files, deduped by stem (prefer local/dc0)."""
-    seen: dict[str, tuple[Path, str]] = {}
-    for root, host in SOURCES:
-        if not root.exists():
-            continue
-        for f in root.rglob("*.jsonl"):
-            p = str(f)
-            if "/memory/" in p or "/subagents/" in p:
-                continue
-            seen.setdefault(f.stem, (f, host))  # first source wins
-    return list(seen.values())
+def discover_files() -> list[SessionFile]:
+    """All main session JSONL files (stat'd), deduped by stem (prefer local/dc0)."""
+    return discover_session_files()
 
 
 def ensure_schema(con: duckdb.DuckDBPyConnection):
@@ -162,8 +168,11 @@ def parse_line(entry: dict, host: str, session_id: str):
     if isinstance(content, list):
         for c in content:
             if isinstance(c, dict) and c.get("type") == "tool_use":
+                caller = c.get("caller")
+                if isinstance(caller, dict):  # {"type": "direct"} — store as compact JSON text
+                    caller = json.dumps(caller, separators=(",", ":"))
                 tool_rows.append(
-                    (uuid, session_id, host, ts, c.get("name"), c.get("caller"), sidechain)
+                    (uuid, session_id, host, ts, c.get("name"), caller, sidechain)
                 )
     n_tools = len(tool_rows)
 
@@ -174,7 +183,21 @@ def parse_line(entry: dict, host: str, session_id: str):
     return turn_row, tool_rows
 
 
+TURN_COLS = {
+    "uuid": "VARCHAR", "session_id": "VARCHAR", "host": "VARCHAR", "project": "VARCHAR",
+    "git_branch": "VARCHAR", "ts": "TIMESTAMP", "role": "VARCHAR", "model": "VARCHAR",
+    "input_tokens": "BIGINT", "output_tokens": "BIGINT", "cache_read_tokens": "BIGINT",
+    "cache_creation_tokens": "BIGINT", "n_tool_uses": "INTEGER", "is_sidechain": "BOOLEAN",
+    "version": "VARCHAR",
+}
+TOOL_COLS = {
+    "turn_uuid": "VARCHAR", "session_id": "VARCHAR", "host": "VARCHAR", "ts": "TIMESTAMP",
+    "tool_name": "VARCHAR", "caller": "VARCHAR", "is_sidechain": "BOOLEAN",
+}
+
+
 def flush(con, turns, tools):
+    """Row-at-a-time executemany — the original path, kept for --ingest executemany."""
     if turns:
         con.executemany(
             "INSERT INTO turns VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?) ON CONFLICT (uuid) DO NOTHING",
@@ -186,39 +209,221 @@ def flush(con, turns, tools):
         tools.clear()
 
 
-def process_file(con, path: Path, host: str, start_offset: int):
-    """Read complete new lines from start_offset; return (new_offset, n_turns, n_tools)."""
-    turns, tools = [], []
-    nt = ntc = 0
-    with open(path, "rb") as f:
-        f.seek(start_offset)
-        data = f.read()
-    if not data:
-        return start_offset, 0, 0
-    # Only advance past the last complete line (handles a mid-write tail).
-    last_nl = data.rfind(b"\n")
-    if last_nl == -1:
-        return start_offset, 0, 0  # no complete line yet
-    complete = data[: last_nl + 1]
-    new_offset = start_offset + last_nl + 1
-
-    for raw in complete.split(b"\n"):
-        if not raw.strip():
+def _arrow_table(rows, cols: dict):
+    # Transpose the row tuples into one array per column; ts stays a string and
+    # is cast by the INSERT, exactly as a bound ? parameter would be.
+    arrow_types = {"VARCHAR": pa.string(), "TIMESTAMP": pa.string(), "BIGINT": pa.int64(),
+                   "INTEGER": pa.int32(), "BOOLEAN": pa.bool_()}
+    columns = list(zip(*rows))
+    return pa.table(
+        [pa.array(col, type=arrow_types[t]) for col, t in zip(columns, cols.values())],
+        names=list(cols),
+    )
+
+
+def flush_arrow(con, turns, tools):
+    """Column arrays → registered Arrow relation → one INSERT ... SELECT per table."""
+    for rows, cols, table, verb in ((turns, TURN_COLS, "turns", "INSERT OR IGNORE"),
+                                    (tools, TOOL_COLS, "tool_calls", "INSERT")):
+        if not rows:
             continue
+        con.register("_batch", _arrow_table(rows, cols))
         try:
-            entry = json.loads(raw)
-        except (json.JSONDecodeError, UnicodeDecodeError):
+            con.execute(f"{verb} INTO {table} SELECT * FROM _batch")
+        finally:
+            con.unregister("_batch")
+        rows.clear()
+
+
+def flush_ndjson(con, turns, tools):
+    """Stage rows as NDJSON and load them with read_json (no pyarrow needed)."""
+    for rows, cols, table, verb in ((turns, TURN_COLS, "turns", "INSERT OR IGNORE"),
+                                    (tools, TOOL_COLS, "tool_calls", "INSERT")):
+        if not rows:
             continue
-        turn_row, tool_rows = parse_line(entry, host, path.stem)
+        names = list(cols)
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(names, row))))
+                f.write("\n")
+        try:
+            columns = "{" + ", ".join(f"'{c}': '{t}'" for c, t in cols.items()) + "}"
+            con.execute(
+                f"{verb} INTO {table} SELECT * FROM read_json(?, format='newline_delimited', "
+                f"columns={columns})",
+                [f.name],
+            )
+        finally:
+            os.unlink(f.name)
+        rows.clear()
+
+
+INGESTERS = {"executemany": flush, "arrow": flush_arrow, "ndjson": flush_ndjson}
+
+
+class RowCollector(Aggregator):
+    """claude_sessions.scan() consumer: one file's turn / tool_call rows.
+
+    The python engine reads through the same scanner (read_tail + decode_lines,
+    only complete lines past the offset) as refresh-stats-cache.py; `on_file`
+    gets (sf, turns, tools) once each file is decoded.
+    """
+
+    def __init__(self, on_file=None):
+        self.on_file = on_file
+        self.turns, self.tools = [], []
+
+    def begin(self, sf: SessionFile):
+        self.turns, self.tools = [], []
+        self._host, self._session = sf.host, sf.path.stem
+
+    def add(self, entry: dict):
+        turn_row, tool_rows = parse_line(entry, self._host, self._session)
         if turn_row:
-            turns.append(turn_row)
-            nt += 1
+            self.turns.append(turn_row)
         if tool_rows:
-            tools.extend(tool_rows)
-            ntc += len(tool_rows)
-        if len(turns) >= BATCH:
-            flush(con, turns, tools)
-    flush(con, turns, tools)
+            self.tools.extend(tool_rows)
+
+    def end(self, sf: SessionFile):
+        if self.on_file:
+            self.on_file(sf, self.turns, self.tools)
+
+
+def parse_file(path: Path, host: str, start_offset: int):
+    """Parse complete new lines from start_offset; return (new_offset, turns, tools).
+
+    Pure (no DB handle) so it can run in a worker process under --jobs.
+    """
+    rows = RowCollector()
+    offsets = {str(path): start_offset}
+    if not scan([SessionFile(path, host, False)], [rows], offsets=offsets):
+        raise OSError(f"could not read {path}")
+    return offsets[str(path)], rows.turns, rows.tools
+
+
+def write_file(con, path: Path, host: str, size: int, reset: bool, new_offset: int, turns, tools,
+               ingest=flush):
+    """Rows + watermark for one file in a single transaction — a crash never
+    leaves rows without the offset that covers them (tool_calls has no key to
+    dedupe a re-read)."""
+    con.execute("BEGIN TRANSACTION")
+    try:
+        if reset:  # file truncated / rewritten → replace everything from it
+            con.execute("DELETE FROM turns WHERE session_id = ?", [path.stem])
+            con.execute("DELETE FROM tool_calls WHERE session_id = ?", [path.stem])
+        for i in range(0, max(len(turns), len(tools)), BATCH):
+            ingest(con, turns[i:i + BATCH], tools[i:i + BATCH])
+        con.execute(
+            "INSERT INTO _watermark VALUES (?,?,?,?,now()) "
+            "ON CONFLICT (file_path) DO UPDATE SET size_bytes=excluded.size_bytes, "
+            "offset_bytes=excluded.offset_bytes, updated_at=now()",
+            [str(path), host, size, new_offset],
+        )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+
+# --engine sql: the same turn/tool_call extraction as parse_line, pushed down into
+# DuckDB's vectorised NDJSON reader. Only the fields parse_line reads are typed;
+# `message` stays JSON so model/usage/content are pulled out in SQL.
+SQL_READ = """
+    CREATE TEMP TABLE _lines AS
+    SELECT
+        row_number() OVER () AS rn,
+        uuid,
+        type AS role,
+        timestamp AS ts,
+        CASE WHEN cwd <> '' THEN regexp_extract(rtrim(cwd, '/'), '[^/]*$') END AS project,
+        nullif(gitBranch, '') AS git_branch,
+        nullif(version, '') AS version,
+        coalesce(isSidechain, false) AS is_sidechain,
+        message
+    FROM read_ndjson(?, columns = {
+        type: 'VARCHAR', uuid: 'VARCHAR', timestamp: 'VARCHAR', cwd: 'VARCHAR',
+        gitBranch: 'VARCHAR', version: 'VARCHAR', isSidechain: 'BOOLEAN', message: 'JSON'
+    }, ignore_errors = true)
+    WHERE type IN ('user', 'assistant') AND uuid <> ''
+"""
+# message.content unnested; keyed by line (rn) since a uuid can repeat in a file.
+SQL_TOOL_USES = """
+    CREATE TEMP TABLE _tool_uses AS
+    SELECT rn, uuid, ts, is_sidechain, c
+    FROM (
+        SELECT rn, uuid, ts, is_sidechain,
+               unnest(coalesce(json_extract(message, '$.content[*]'), []::JSON[])) AS c
+        FROM _lines
+    )
+    WHERE json_type(c) = 'OBJECT' AND json_extract_string(c, '$.type') = 'tool_use'
+"""
+SQL_TURNS = """
+    INSERT OR IGNORE INTO turns
+    SELECT
+        l.uuid, $session_id, $host, l.project, l.git_branch, l.ts, l.role,
+        CASE WHEN l.role = 'assistant' THEN json_extract_string(l.message, '$.model') END,
+        CASE WHEN l.role = 'assistant' THEN coalesce(TRY_CAST(json_extract_string(l.message, '$.usage.input_tokens') AS BIGINT), 0) ELSE 0 END,
+        CASE WHEN l.role = 'assistant' THEN coalesce(TRY_CAST(json_extract_string(l.message, '$.usage.output_tokens') AS BIGINT), 0) ELSE 0 END,
+        CASE WHEN l.role = 'assistant' THEN coalesce(TRY_CAST(json_extract_string(l.message, '$.usage.cache_read_input_tokens') AS BIGINT), 0) ELSE 0 END,
+        CASE WHEN l.role = 'assistant' THEN coalesce(TRY_CAST(json_extract_string(l.message, '$.usage.cache_creation_input_tokens') AS BIGINT), 0) ELSE 0 END,
+        coalesce(n.n_tools, 0),
+        l.is_sidechain,
+        l.version
+    FROM _lines l
+    LEFT JOIN (SELECT rn, count(*) AS n_tools FROM _tool_uses GROUP BY rn) n USING (rn)
+    ORDER BY l.rn
+"""
+SQL_TOOLS = """
+    INSERT INTO tool_calls
+    SELECT uuid, $session_id, $host, ts,
+           json_extract_string(c, '$.name'), json_extract_string(c, '$.caller'), is_sidechain
+    FROM _tool_uses
+"""
+
+
+def load_file_sql(con, path: Path, host: str, size: int, start_offset: int, reset: bool):
+    """--engine sql: load one file's new lines via read_ndjson; return (new_offset, n_turns, n_tools).
+
+    read_ndjson can't start at a byte offset, and reading the live file could
+    pick up lines past the watermark, so the complete new lines are copied,
+    undecoded, to a temp file first.
+    """
+    new_offset, complete = read_tail(path, start_offset)
+    staged = None
+    if complete:
+        with tempfile.NamedTemporaryFile("wb", suffix=".ndjson", delete=False) as f:
+            f.write(complete)
+        staged = f.name
+
+    params = {"session_id": path.stem, "host": host}
+    con.execute("BEGIN TRANSACTION")
+    try:
+        if reset:
+            con.execute("DELETE FROM turns WHERE session_id = ?", [path.stem])
+            con.execute("DELETE FROM tool_calls WHERE session_id = ?", [path.stem])
+        nt = ntc = 0
+        if staged:
+            con.execute(SQL_READ, [staged])
+            con.execute(SQL_TOOL_USES)
+            nt = con.execute("SELECT count(*) FROM _lines").fetchone()[0]
+            ntc = con.execute("SELECT count(*) FROM _tool_uses").fetchone()[0]
+            con.execute(SQL_TURNS, params)
+            con.execute(SQL_TOOLS, params)
+            con.execute("DROP TABLE _tool_uses")
+            con.execute("DROP TABLE _lines")
+        con.execute(
+            "INSERT INTO _watermark VALUES (?,?,?,?,now()) "
+            "ON CONFLICT (file_path) DO UPDATE SET size_bytes=excluded.size_bytes, "
+            "offset_bytes=excluded.offset_bytes, updated_at=now()",
+            [str(path), host, size, new_offset],
+        )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        if staged:
+            os.unlink(staged)
     return new_offset, nt, ntc
 
 
@@ -227,7 +432,20 @@ def main():
     ap.add_argument("--full", action="store_true", help="wipe tables + reparse from scratch")
     ap.add_argument("--db", default=str(DEFAULT_DB), help="output DuckDB path")
     ap.add_argument("--parquet", metavar="DIR", help="also export each table to Parquet in DIR")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="parse files in N worker processes (single DB writer)")
+    ap.add_argument("--ingest", choices=["auto", *INGESTERS], default="auto",
+                    help="bulk-load path (auto: arrow if pyarrow is installed, else ndjson)")
+    ap.add_argument("--engine", choices=["python", "sql"], default="python",
+                    help="python: json.loads + parse_line; sql: DuckDB read_ndjson does the extraction")
     args = ap.parse_args()
+    if args.engine == "sql" and args.jobs > 1:
+        ap.error("--jobs applies to the python engine (read_ndjson is already multi-threaded)")
+    if args.ingest == "auto":
+        args.ingest = "arrow" if pa is not None else "ndjson"
+    elif args.ingest == "arrow" and pa is None:
+        ap.error("--ingest arrow needs pyarrow")
+    ingest = INGESTERS[args.ingest]
 
     db_path = Path(args.db)
     db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -246,34 +464,55 @@ def main():
     }
 
     files = discover_files()
-    log(f"{len(files)} session files; DB={db_path.name}; mode={'FULL' if args.full else 'incremental'}")
-
-    processed = skipped = tot_turns = tot_tools = 0
-    for path, host in files:
-        p = str(path)
-        try:
-            size = path.stat().st_size
-        except OSError:
-            continue
-        prev_size, prev_off = wm.get(p, (None, 0))
+    log(f"{len(files)} session files; DB={db_path.name}; mode={'FULL' if args.full else 'incremental'}; "
+        f"engine={args.engine}" + (f"; ingest={args.ingest}" if args.engine == "python" else "")
+        + (f"; jobs={args.jobs}" if args.jobs > 1 else ""))
+
+    skipped = 0
+    todo = []  # (sf, offset, reset)
+    for sf in files:
+        prev_size, prev_off = wm.get(str(sf.path), (None, 0))
         offset = prev_off or 0
-        if prev_size is not None and size == prev_size:
+        if prev_size is not None and sf.size == prev_size:
             skipped += 1
             continue
-        if size < offset:  # file truncated / rewritten → reparse whole file
-            con.execute("DELETE FROM turns WHERE session_id = ?", [path.stem])
-            con.execute("DELETE FROM tool_calls WHERE session_id = ?", [path.stem])
-            offset = 0
-        new_off, nt, ntc = process_file(con, path, host, offset)
-        con.execute(
-            "INSERT INTO _watermark VALUES (?,?,?,?,now()) "
-            "ON CONFLICT (file_path) DO UPDATE SET size_bytes=excluded.size_bytes, "
-            "offset_bytes=excluded.offset_bytes, updated_at=now()",
-            [p, host, size, new_off],
-        )
-        processed += 1
-        tot_turns += nt
-        tot_tools += ntc
+        reset = sf.size < offset  # file truncated / rewritten → reparse whole file
+        todo.append((sf, 0 if reset else offset, reset))
+
+    processed = tot_turns = tot_tools = 0
+    if args.engine == "sql":
+        for sf, offset, reset in todo:
+            new_off, nt, ntc = load_file_sql(con, sf.path, sf.host, sf.size, offset, reset)
+            processed += 1
+            tot_turns += nt
+            tot_tools += ntc
+    elif args.jobs > 1 and len(todo) > 1:
+        # Workers only parse; this process is the sole DuckDB writer.
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = {
+                pool.submit(parse_file, sf.path, sf.host, offset): (sf, reset)
+                for sf, offset, reset in todo
+            }
+            for fut in as_completed(futures):
+                sf, reset = futures[fut]
+                new_off, turns, tools = fut.result()
+                write_file(con, sf.path, sf.host, sf.size, reset, new_off, turns, tools, ingest)
+                processed += 1
+                tot_turns += len(turns)
+                tot_tools += len(tools)
+    else:
+        # One scan() pass; each file's rows + watermark are written as it finishes
+        offsets = {str(sf.path): offset for sf, offset, _ in todo}
+        resets = {str(sf.path): reset for sf, _, reset in todo}
+
+        def write(sf: SessionFile, turns, tools):
+            nonlocal tot_turns, tot_tools
+            key = str(sf.path)
+            write_file(con, sf.path, sf.host, sf.size, resets[key], offsets[key], turns, tools, ingest)
+            tot_turns += len(turns)
+            tot_tools += len(tools)
+
+        processed = scan([sf for sf, _, _ in todo], [RowCollector(write)], log=log, offsets=offsets)
 
     con.execute("CHECKPOINT")
     log(f"processed {processed} files ({skipped} unchanged) · +{tot_turns} turns · +{tot_tools} tool calls")
@@ -0,0 +1,632 @@
+"""
+claude_sessions.py — shared single-pass scanner for Claude Code session JSONL.
+
+Every Claude-history consumer in the 4h chain used to walk ~/.claude/projects
+(+ the DC-1 mirror) and json-decode the same multi-GB corpus on its own. This
+module does the walk and the decode once, and fans each entry out to any number
+of pluggable aggregators:
+
+    files = discover_session_files(subagents=True)
+    stats = StatsCacheAggregator()
+    index = SessionIndexAggregator()
+    scan(files, [stats, index])
+
+An aggregator sees begin(sf) / add(entry)... / end(sf) for every file it
+`wants`, and returns its fold from result(). Aggregators that only need a
+subset of files (main sessions only, a sample) filter in `wants` — a file no
+aggregator wants is never opened. The built-in ones keep a JSON-able partial
+per file, so a caller can persist them with per-file byte offsets and resume
+from the appended tail (see refresh-stats-cache.py).
+
+refresh-stats-cache.py runs the stats fold together with ai-pilot-pipeline's
+session index and tool/tech sample, and drops the latter two into a snapshot
+(SCAN_SNAPSHOT) that ai-pilot-pipeline.py reads instead of re-scanning.
+
+Stdlib only — imported by scripts that run on both the pyenv and system python.
+"""
+
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+HOME = Path.home()
+CLAUDE_DIR = HOME / ".claude"
+# (root, host-label). Local sessions win over the mirror on a stem collision.
+SOURCES = [
+    (CLAUDE_DIR / "projects", "dc0"),
+    (HOME / ".claude-dc1" / "projects", "dc1"),
+]
+SCAN_SNAPSHOT = CLAUDE_DIR / "session-scan.json"
+DISCOVERY_INDEX = CLAUDE_DIR / "session-files-index.json"
+# Directory mtimes this fresh may hide a same-tick change; such listings aren't cached.
+RACY_MTIME_S = 2
+
+# Technology extraction patterns (ai-pilot skills / instrument ratings)
+TECH_PATTERNS = [
+    "Python", "TypeScript", "JavaScript", "React", "Next.js", "Tailwind CSS",
+    "D3.js", "Node.js", "FastAPI", "Flask", "Django", "Docker", "Nginx",
+    "PostgreSQL", "SQLite", "DuckDB", "Redis", "MongoDB", "Snowflake",
+    "AWS", "GCP", "Azure", "Vercel", "GitHub Actions", "Terraform",
+    "Kubernetes", "Raspberry Pi", "Arduino", "ESP32", "MQTT", "LoRa",
+    "Ollama", "LangChain", "OpenAI", "Anthropic", "Rust", "Go", "C++",
+    "Svelte", "Vue.js", "Angular", "GraphQL", "REST API", "WebSocket",
+    "Socket.IO", "Framer Motion", "Recharts", "Shadcn", "Radix UI",
+    "Tailwind", "CSS", "HTML", "Bash", "Linux", "systemd", "PM2",
+    "Git", "Markdown", "MDX", "JSON", "YAML", "TOML", "CSV",
+    "Pandas", "NumPy", "Jupyter", "Matplotlib", "Seaborn",
+    "TLS", "Ed25519", "JWT", "OAuth", "SSH", "WireGuard",
+    "Meshtastic", "Zigbee", "Bluetooth", "I2C", "SPI", "GPIO",
+    "SWR", "Zustand", "Redux", "MobX", "Prisma", "Drizzle",
+    "Pydantic", "SQLAlchemy", "Alembic", "Pytest",
+]
+
+
+class SessionFile(NamedTuple):
+    path: Path
+    host: str
+    subagent: bool
+    # stat at discovery time (-1 / 0 when discovered without stat)
+    size: int = -1
+    mtime: float = 0.0
+    ino: int = 0
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def project_dir(self) -> Path:
+        # <projects>/<proj>/<stem>.jsonl or <projects>/<proj>/<session>/subagents/agent-*.jsonl
+        return self.path.parents[2] if self.subagent else self.path.parent
+
+
+# ── Discovery ─────────────────────────────────────────────────
+
+
+class FileIndex:
+    """Persistent directory listings for the projects trees.
+
+    A directory's mtime only moves when entries are added, removed or renamed
+    in it, so a directory whose mtime matches the saved one is not re-listed —
+    its cached listing is reused. Discovery then costs one stat per directory
+    and file instead of a glob/rglob of the whole tree. (Appends don't touch
+    directory mtimes, so files are still stat'd for size/mtime; that is what
+    every consumer's change detection keys on.)
+
+    Saved as {"dirs": {dir: [mtime_ns, [*.jsonl names], [subdir names]]}}.
+    Callers walk different depths (subagent listings are only read with
+    subagents=True), so a listing this run didn't visit is kept as long as
+    its parent's listing still names it.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path | None):
+        self.path = path  # None → in-memory only
+        self.dirs: dict[str, list] = {}
+        self._visited: dict[str, list] = {}
+        self._now = time.time()
+        if path is None:
+            return
+        try:
+            saved = json.loads(path.read_text())
+            if saved.get("version") == self.VERSION:
+                self.dirs = saved["dirs"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+    def listing(self, d: Path) -> tuple[list[str], list[str]]:
+        """(*.jsonl file names, subdir names) of d — from the index if d is unchanged."""
+        key = str(d)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return [], []
+        cached = self.dirs.get(key)
+        if cached and cached[0] == st.st_mtime_ns:
+            self._visited[key] = cached
+            return cached[1], cached[2]
+        files, subdirs = [], []
+        try:
+            with os.scandir(key) as it:
+                for e in it:
+                    if e.is_dir():
+                        subdirs.append(e.name)
+                    elif e.name.endswith(".jsonl"):
+                        files.append(e.name)
+        except OSError:
+            return [], []
+        # Listed within the mtime granularity window: the dir may change again
+        # without its mtime moving, so don't trust this listing next run.
+        mtime = st.st_mtime_ns if self._now - st.st_mtime > RACY_MTIME_S else None
+        self._visited[key] = [mtime, files, subdirs]
+        return files, subdirs
+
+    def save(self, roots: Iterable[Path]):
+        """Persist listings: this run's, plus older ones still reachable from a
+        root through the (now current) subdir names. Removed dirs drop out."""
+        if self.path is None:
+            return
+        merged = {**self.dirs, **self._visited}
+        prefixes = tuple(os.path.join(str(r), "") for r in roots)
+        dirs = {k: v for k, v in merged.items()
+                if not k.startswith(prefixes) and k.rstrip(os.sep) + os.sep not in prefixes}
+        stack = [str(r) for r in roots]
+        while stack:
+            key = stack.pop()
+            entry = merged.get(key)
+            if entry is None or key in dirs:
+                continue
+            dirs[key] = entry
+            stack.extend(os.path.join(key, name) for name in entry[2])
+        payload = {"version": self.VERSION, "dirs": dirs}
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(json.dumps(payload, separators=(",", ":")))
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+
+def discover_session_files(subagents: bool = False, sources=None, index: bool = True) -> list[SessionFile]:
+    """All session JSONL files across DC-0 + DC-1, deduped by stem (first source wins).
+
+    Main sessions are <proj>/*.jsonl; with subagents=True the per-session
+    <proj>/<session>/subagents/agent-*.jsonl frames are included too. Each
+    file comes back stat'd (size/mtime/ino); files that vanish mid-walk are
+    left out. index=False ignores (and doesn't update) DISCOVERY_INDEX.
+    """
+    idx = FileIndex(DISCOVERY_INDEX if index else None)
+    files: list[SessionFile] = []
+    seen: set[str] = set()
+    roots = []
+
+    def add(path: Path, host: str, subagent: bool):
+        if path.stem in seen:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        seen.add(path.stem)
+        files.append(SessionFile(path, host, subagent, st.st_size, st.st_mtime, st.st_ino))
+
+    for root, host in sources or SOURCES:
+        roots.append(root)
+        _, proj_names = idx.listing(root)
+        for proj_name in proj_names:
+            proj_dir = root / proj_name
+            names, session_names = idx.listing(proj_dir)
+            for name in names:
+                add(proj_dir / name, host, False)
+            if not subagents:
+                continue
+            for session_name in session_names:
+                _, sub = idx.listing(proj_dir / session_name)
+                if "subagents" not in sub:
+                    continue
+                subagents_dir = proj_dir / session_name / "subagents"
+                agent_names, _ = idx.listing(subagents_dir)
+                for name in agent_names:
+                    if name.startswith("agent-"):
+                        add(subagents_dir / name, host, True)
+    idx.save(roots)
+    return files
+
+
+def sample_files(files: Iterable[SessionFile], max_files: int = 100) -> list[SessionFile]:
+    """Oldest + newest main session per project dir, capped at max_files."""
+    by_project: dict[Path, list[tuple[float, SessionFile]]] = defaultdict(list)
+    for sf in files:
+        if sf.subagent:
+            continue
+        by_project[sf.project_dir].append((sf.mtime, sf))
+    picked: list[SessionFile] = []
+    for entries in by_project.values():
+        entries.sort(key=lambda e: e[0])
+        picked.append(entries[0][1])
+        if len(entries) >= 2:
+            picked.append(entries[-1][1])
+    return picked[:max_files]
+
+
+# ── Reading ───────────────────────────────────────────────────
+
+
+def read_tail(path: Path, offset: int = 0) -> tuple[int, bytes]:
+    """Bytes of every complete line from offset on; returns (new_offset, data).
+
+    Only advances past the last newline, so a line mid-write is left for the
+    next reader rather than half-parsed.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    last_nl = data.rfind(b"\n")
+    if last_nl == -1:
+        return offset, b""
+    return offset + last_nl + 1, data[: last_nl + 1]
+
+
+def decode_lines(data: bytes) -> Iterator[dict]:
+    """json-decode each non-blank line, skipping anything malformed."""
+    for raw in data.split(b"\n"):
+        if not raw.strip():
+            continue
+        try:
+            entry = json.loads(raw.decode("utf-8", "replace"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict):
+            yield entry
+
+
+class Aggregator:
+    """A per-consumer fold over scanned session files. Override what you need."""
+
+    def wants(self, sf: SessionFile) -> bool:
+        return True
+
+    def begin(self, sf: SessionFile):
+        pass
+
+    def add(self, entry: dict):
+        pass
+
+    def end(self, sf: SessionFile):
+        pass
+
+    def result(self):
+        return None
+
+
+def scan(files: Iterable[SessionFile], aggregators: list[Aggregator], log=None,
+         offsets: dict[str, int] | None = None) -> int:
+    """Read each file once and feed every interested aggregator; returns #files read.
+
+    With `offsets` ({path: byte offset}) each file is read from its offset only,
+    and the dict is advanced past the last complete line consumed.
+    """
+    n_read = 0
+    for sf in files:
+        active = [a for a in aggregators if a.wants(sf)]
+        if not active:
+            continue
+        key = str(sf.path)
+        try:
+            new_offset, data = read_tail(sf.path, offsets.get(key, 0) if offsets is not None else 0)
+        except OSError as e:
+            if log:
+                log(f"Failed to read {sf.path}: {e}")
+            continue
+        if offsets is not None:
+            offsets[key] = new_offset
+        n_read += 1
+        for a in active:
+            a.begin(sf)
+        if len(active) == 1:
+            add = active[0].add
+            for entry in decode_lines(data):
+                add(entry)
+        else:
+            for entry in decode_lines(data):
+                for a in active:
+                    a.add(entry)
+        for a in active:
+            a.end(sf)
+    return n_read
+
+
+def parse_ts(ts) -> datetime | None:
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+# ── Aggregators ───────────────────────────────────────────────
+#
+# Each keeps a small JSON-able partial per file (keyed by path) and folds the
+# partials in result(). That is what makes them resumable: a caller can persist
+# `partials`, hand them back next run, and scan only the bytes appended since.
+
+
+class PartialAggregator(Aggregator):
+    """Aggregator whose per-file state is a plain dict in self.partials[path]."""
+
+    def __init__(self, partials: dict | None = None):
+        self.partials: dict[str, dict] = partials if partials is not None else {}
+
+    def new_partial(self) -> dict:
+        raise NotImplementedError
+
+    def begin(self, sf):
+        key = str(sf.path)
+        p = self.partials.get(key)
+        if p is None:
+            p = self.partials[key] = self.new_partial()
+        self._p = p
+
+    def restrict(self, paths: Iterable[str]):
+        """Keep only these paths' partials, in this order (drops deleted files)."""
+        self.partials = {k: self.partials[k] for k in paths if k in self.partials}
+
+
+class StatsCacheAggregator(PartialAggregator):
+    """Claude Code's stats-cache (version 2) — see refresh-stats-cache.py."""
+
+    def new_partial(self):
+        # n main messages, first/last ts, tool_use blocks, {model: [in, out, cache_read, cache_create]}
+        return {"n": 0, "first_ts": "", "last_ts": "", "tools": 0, "usage": {}, "spec": 0}
+
+    def add(self, entry):
+        p = self._p
+        t = entry.get("type")
+        if t == "speculation-accept":
+            p["spec"] += entry.get("timeSavedMs", 0)
+            return
+        if t not in ("user", "assistant") or entry.get("isSidechain", False):
+            return
+        if p["n"] == 0:
+            p["first_ts"] = entry.get("timestamp", "")
+        p["last_ts"] = entry.get("timestamp", "")
+        p["n"] += 1
+        if t != "assistant":
+            return
+
+        msg = entry.get("message", {})
+        content = msg.get("content", [])
+        if isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    p["tools"] += 1
+
+        usage = msg.get("usage", {})
+        model = msg.get("model", "")
+        if not model or not usage:
+            return
+        u = p["usage"].get(model)
+        if u is None:
+            u = p["usage"][model] = [0, 0, 0, 0]
+        u[0] += usage.get("input_tokens", 0)
+        u[1] += usage.get("output_tokens", 0)
+        u[2] += usage.get("cache_read_input_tokens", 0)
+        u[3] += usage.get("cache_creation_input_tokens", 0)
+
+    def result(self):
+        daily_activity = defaultdict(lambda: {"messageCount": 0, "sessionCount": 0, "toolCallCount": 0})
+        daily_model_tokens = defaultdict(lambda: defaultdict(int))
+        model_usage = defaultdict(lambda: {
+            "inputTokens": 0, "outputTokens": 0,
+            "cacheReadInputTokens": 0, "cacheCreationInputTokens": 0,
+            "webSearchRequests": 0, "costUSD": 0,
+            "contextWindow": 0, "maxOutputTokens": 0,
+        })
+        hour_counts = Counter()
+        total_sessions = 0
+        total_messages = 0
+        total_speculation_ms = 0
+        longest_session = None
+        first_session_date = None
+
+        for path, p in self.partials.items():
+            total_speculation_ms += p["spec"]
+            if not p["n"]:
+                continue
+            total_sessions += 1
+            total_messages += p["n"]
+
+            first_ts = p["first_ts"]
+            first_dt = parse_ts(first_ts)
+            last_dt = parse_ts(p["last_ts"])
+            if first_dt is None or last_dt is None:
+                continue
+            duration_ms = int((last_dt - first_dt).total_seconds() * 1000)
+            date_str = first_dt.strftime("%Y-%m-%d")
+            hour_counts[first_dt.hour] += 1
+
+            day = daily_activity[date_str]
+            day["messageCount"] += p["n"]
+            day["sessionCount"] += 1
+            day["toolCallCount"] += p["tools"]
+
+            if first_session_date is None or first_ts < first_session_date:
+                first_session_date = first_ts
+
+            if longest_session is None or duration_ms > longest_session.get("duration", 0):
+                longest_session = {
+                    "sessionId": Path(path).stem,
+                    "duration": duration_ms,
+                    "messageCount": p["n"],
+                    "timestamp": first_ts,
+                }
+
+            for model, (input_tok, output_tok, cache_read, cache_create) in p["usage"].items():
+                mu = model_usage[model]
+                mu["inputTokens"] += input_tok
+                mu["outputTokens"] += output_tok
+                mu["cacheReadInputTokens"] += cache_read
+                mu["cacheCreationInputTokens"] += cache_create
+                total_tok = input_tok + output_tok
+                if total_tok > 0:
+                    daily_model_tokens[date_str][model] += total_tok
+
+        sorted_daily = sorted(
+            [{"date": d, **v} for d, v in daily_activity.items()],
+            key=lambda x: x["date"],
+        )
+        sorted_model_tokens = sorted(
+            [{"date": d, "tokensByModel": dict(v)} for d, v in daily_model_tokens.items()],
+            key=lambda x: x["date"],
+        )
+        return {
+            "version": 2,
+            "lastComputedDate": datetime.now().strftime("%Y-%m-%d"),
+            "dailyActivity": sorted_daily,
+            "dailyModelTokens": sorted_model_tokens,
+            "modelUsage": {k: dict(v) for k, v in model_usage.items()},
+            "totalSessions": total_sessions,
+            "totalMessages": total_messages,
+            "longestSession": longest_session,
+            "firstSessionDate": first_session_date,
+            "hourCounts": dict(hour_counts),
+            "totalSpeculationTimeSavedMs": total_speculation_ms,
+        }
+
+
+class SessionIndexAggregator(PartialAggregator):
+    """Per-session / per-project / per-model rollup for ai-pilot-pipeline (main sessions only)."""
+
+    def wants(self, sf):
+        return not sf.subagent
+
+    def new_partial(self):
+        return {"n": 0, "user": 0, "asst": 0, "cwd": None, "first_ts": "", "last_ts": "", "models": {}}
+
+    def add(self, entry):
+        t = entry.get("type")
+        if t not in ("user", "assistant") or entry.get("isSidechain"):
+            return
+        p = self._p
+        if p["n"] == 0:
+            p["first_ts"] = entry.get("timestamp", "")
+        p["last_ts"] = entry.get("timestamp", "")
+        p["n"] += 1
+        if not p["cwd"] and entry.get("cwd"):
+            p["cwd"] = entry["cwd"]
+        if t == "user":
+            p["user"] += 1
+            return
+        p["asst"] += 1
+        model = entry.get("message", {}).get("model", "")
+        if model and model != "<synthetic>":
+            p["models"][model] = p["models"].get(model, 0) + 1
+
+    def result(self):
+        sessions = []
+        project_agg = defaultdict(lambda: {
+            "sessions": 0, "messages": 0,
+            "first_active": None, "last_active": None,
+        })
+        model_agg = defaultdict(lambda: {"msg_count": 0, "total_cost": 0, "total_duration": 0})
+
+        for path, p in self.partials.items():
+            if not p["n"]:
+                continue
+            first_dt = parse_ts(p["first_ts"])
+            last_dt = parse_ts(p["last_ts"])
+            first_epoch = last_epoch = None
+            if first_dt is not None and last_dt is not None:
+                first_epoch = int(first_dt.timestamp() * 1000)
+                last_epoch = int(last_dt.timestamp() * 1000)
+
+            cwd = p["cwd"]
+            sessions.append({
+                "session_id": Path(path).stem,
+                "cwd": cwd or "",
+                "first_msg": first_epoch,
+                "last_msg": last_epoch,
+                "msg_count": p["n"],
+                "user_msgs": p["user"],
+                "asst_msgs": p["asst"],
+            })
+
+            if cwd:
+                pa = project_agg[cwd]
+                pa["sessions"] += 1
+                pa["messages"] += p["n"]
+                if first_epoch and (pa["first_active"] is None or first_epoch < pa["first_active"]):
+                    pa["first_active"] = first_epoch
+                if last_epoch and (pa["last_active"] is None or last_epoch > pa["last_active"]):
+                    pa["last_active"] = last_epoch
+
+            for model, n in p["models"].items():
+                model_agg[model]["msg_count"] += n
+
+        projects = sorted(
+            [{"cwd": cwd, **v} for cwd, v in project_agg.items()],
+            key=lambda p: p["messages"],
+            reverse=True,
+        )
+        models = [{"model": m, **v} for m, v in model_agg.items()]
+        return {"sessions": sessions, "projects": projects, "models": models}
+
+
+class ToolSampleAggregator(PartialAggregator):
+    """Tool-use counts + tech mentions over a sample of sessions (see sample_files)."""
+
+    def __init__(self, sample: Iterable[SessionFile], tech_patterns=TECH_PATTERNS, partials=None):
+        super().__init__(partials)
+        self.sample = {sf.path for sf in sample}
+        self.patterns = [(tech, tech.lower()) for tech in tech_patterns]
+
+    def wants(self, sf):
+        return sf.path in self.sample
+
+    def new_partial(self):
+        return {"tools": {}, "tech": {}}
+
+    def _mentions(self, text_lower: str):
+        tech = self._p["tech"]
+        for name, needle in self.patterns:
+            if needle in text_lower:
+                tech[name] = tech.get(name, 0) + 1
+
+    def add(self, entry):
+        t = entry.get("type")
+        msg = entry.get("message", {})
+        content = msg.get("content", "") if isinstance(msg, dict) else ""
+        if t == "assistant" and isinstance(content, list):
+            tools = self._p["tools"]
+            for block in content:
+                if not isinstance(block, dict):
+                    continue
+                if block.get("type") == "tool_use":
+                    name = block.get("name", "unknown")
+                    tools[name] = tools.get(name, 0) + 1
+                elif block.get("type") == "text":
+                    self._mentions(block.get("text", "").lower())
+        elif t == "user" and isinstance(content, str):
+            self._mentions(content.lower())
+
+    def result(self):
+        tool_counts = Counter()
+        tech_mentions = Counter()
+        n = 0
+        for path, p in self.partials.items():
+            if Path(path) not in self.sample:
+                continue
+            n += 1
+            tool_counts.update(p["tools"])
+            tech_mentions.update(p["tech"])
+        return {
+            "tool_counts": tool_counts,
+            "tech_mentions": tech_mentions,
+            "files_sampled": n,
+        }
+
+
+# ── Snapshot (cross-process sharing within the 4h chain) ──────
+
+
+def write_snapshot(results: dict, path: Path = SCAN_SNAPSHOT):
+    """Persist aggregator results for later steps of the chain (atomic replace)."""
+    payload = {"generated": time.time(), **results}
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload))
+    tmp.replace(path)
+
+
+def load_snapshot(max_age_s: float, path: Path = SCAN_SNAPSHOT) -> dict | None:
+    """The snapshot if it is younger than max_age_s, else None."""
+    try:
+        payload = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if time.time() - payload.get("generated", 0) > max_age_s:
+        return None
+    return payload
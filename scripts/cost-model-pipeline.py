@@ -8,11 +8,12 @@ Standard library only.
 """
 
 import json
-import subprocess
 from collections import defaultdict
 from datetime import datetime, date, timedelta
 from pathlib import Path
 
+from github_cli import GhRunner, HttpCache
+
 # ---------- paths ----------------------------------------------------------
 ROOT = Path(__file__).resolve().parent.parent
 PUBLIC_DATA = ROOT / "public" / "data"
@@ -22,6 +23,7 @@ SITE_DATA_PATH = PUBLIC_DATA / "site-data.json"
 TIMELINE_PATH = PUBLIC_DATA / "nominate-ai-timeline.json"
 STATS_CACHE_PATH = Path.home() / ".claude" / "stats-cache.json"
 OUTPUT_PATH = PUBLIC_DATA / "cost-model.json"
+GH_HTTP_CACHE_DIR = ROOT / ".gh-http-cache"
 
 # ---------- scope ----------------------------------------------------------
 SCOPE_START = date(2025, 12, 1)
@@ -237,6 +239,7 @@ for entry in pilot_heatmap:
 
 # --- GitHub Issues (pull live from gh CLI) ---
 issues_by_week = defaultdict(lambda: {"opened": 0, "closed": 0})
+GH = GhRunner(cache=HttpCache(GH_HTTP_CACHE_DIR))
 total_issues = {"opened": 0, "closed": 0, "bugs": 0, "features": 0, "other": 0}
 
 try:
@@ -245,15 +248,21 @@ try:
 
     for repo_name in cb_repo_names:
         try:
-            result = subprocess.run(
-                ["gh", "issue", "list", "-R", f"nominate-ai/{repo_name}",
-                 "--state", "all", "--limit", "500",
-                 "--json", "number,state,labels,createdAt,closedAt"],
-                capture_output=True, text=True, timeout=15,
-            )
-            if result.returncode != 0:
-                continue
-            issues = json.loads(result.stdout)
+            # REST (not `gh issue list`, which is GraphQL) so unchanged pages
+            # come back as free 304s from the ETag cache
+            issues = []
+            for page in range(1, 6):  # ≤ 500, as `--limit 500` was
+                items = GH.get_json(f"/repos/nominate-ai/{repo_name}/issues?state=all&per_page=100&page={page}",
+                                    timeout=15)
+                if not isinstance(items, list):
+                    break
+                issues.extend(
+                    {"createdAt": i.get("created_at") or "", "closedAt": i.get("closed_at"),
+                     "labels": i.get("labels") or []}
+                    for i in items if "pull_request" not in i  # the issues endpoint lists PRs too
+                )
+                if len(items) < 100:
+                    break
             for issue in issues:
                 created = issue.get("createdAt", "")[:10]
                 closed = issue.get("closedAt")
@@ -398,6 +407,7 @@ print(f"  Legacy cost: ${total_legacy_low:,} - ${total_legacy_high:,}")
 print(f"  Actual cost: ${actual_total_cost:,} (operator ${actual_operator_cost:,} + AI ${actual_ai_cost:,})")
 print(f"  Time-series: {len(time_series)} weeks")
 print(f"  Issues: {total_issues['opened']} opened, {total_issues['closed']} closed ({total_issues['bugs']} bugs, {total_issues['features']} features)")
+GH.cache.report(lambda msg: print(f"  {msg}"))
 print(f"  Velocity multiplier: {velocity_multiplier}x")
 print(f"  Time compression: {time_compression}")
 print(f"  Cost savings: {cost_savings_pct}%")
@@ -0,0 +1,325 @@
+"""
+github_cli.py — bounded-concurrency `gh` runner with shared rate-limit backoff.
+
+The pipelines talk to GitHub through the `gh` CLI, one blocking subprocess
+per repo. GhRunner runs those calls on a thread pool instead (a `gh` call is
+almost all network wait), with a per-owner cap so one org's long repo list
+can't take every slot:
+
+    gh = GhRunner(workers=8, per_owner=4, log=log)
+    results = gh.map(lambda spec: gh.run(["repo", "view", spec, ...], owner=spec), specs)
+
+When a call fails on a rate limit, every worker pauses: the runner asks
+`gh api rate_limit` when the core quota resets and sleeps until then (capped
+at max_wait), or backs off exponentially for a secondary limit, then retries.
+
+graphql() wraps `gh api graphql` for callers that batch many repos into one
+aliased query instead of one REST call each.
+
+get_json() is a REST GET through an optional on-disk HttpCache: the stored
+ETag / Last-Modified go out as If-None-Match / If-Modified-Since, and a 304
+(which GitHub doesn't count against the rate limit) is answered from disk.
+Hits and misses are counted per route (/repos/:owner/:repo/commits, ...).
+One-shot URLs (a `since`/`until` window, a /compare/ between moving heads)
+are never stored, and entries unused for max_age_days, or beyond the newest
+max_entries, are pruned when the cache is opened.
+
+Stdlib only.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
+from urllib.parse import parse_qs
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RATE_LIMIT_MARKERS = ("rate limit", "abuse detection", "http 429")
+
+# Query parameters that make a URL unique to one run; caching those only grows the store
+ONE_SHOT_PARAMS = ("since", "until")
+
+
+def is_rate_limited(result: subprocess.CompletedProcess) -> bool:
+    return result.returncode != 0 and any(m in (result.stderr or "").lower() for m in RATE_LIMIT_MARKERS)
+
+
+_ROUTE_RE = re.compile(r"^/(repos/[^/]+/[^/]+|orgs/[^/]+|users/[^/]+)")
+
+
+def route(endpoint: str) -> str:
+    """/repos/a/b/commits?page=2 → /repos/:owner/:repo/commits (counter key)."""
+    path = endpoint.split("?")[0]
+    m = _ROUTE_RE.match(path)
+    if not m:
+        return path
+    kind = m.group(1).split("/")[0]
+    stub = {"repos": "/repos/:owner/:repo", "orgs": "/orgs/:org", "users": "/users/:user"}[kind]
+    return stub + path[m.end():]
+
+
+def cacheable(endpoint: str) -> bool:
+    """False for URLs that won't be asked again: time windows and /compare/ of two heads."""
+    path, _, query = endpoint.partition("?")
+    return "/compare/" not in path and not any(p in ONE_SHOT_PARAMS for p in parse_qs(query))
+
+
+class HttpCache:
+    """ETag / Last-Modified store for GitHub REST GETs, one gzip file per endpoint."""
+
+    def __init__(self, root: Path, max_age_days: float = 30, max_entries: int = 5000):
+        self.root = Path(root)
+        self.max_age_s = max_age_days * 86400
+        self.max_entries = max_entries
+        self.stats: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+        self.pruned = self.prune()
+
+    def _path(self, endpoint: str) -> Path:
+        return self.root / f"{hashlib.sha1(endpoint.encode()).hexdigest()}.json.gz"
+
+    def get(self, endpoint: str) -> dict | None:
+        path = self._path(endpoint)
+        try:
+            with gzip.open(path, "rt") as f:
+                entry = json.load(f)
+            if entry.get("endpoint") != endpoint:
+                return None
+            os.utime(path)  # mtime = last use, for prune()
+            return entry
+        except (OSError, EOFError, json.JSONDecodeError):
+            return None
+
+    def put(self, endpoint: str, etag: str | None, last_modified: str | None, body: Any):
+        if not (etag or last_modified):
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(endpoint)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wt") as f:
+            json.dump({"endpoint": endpoint, "etag": etag, "last_modified": last_modified, "body": body}, f)
+        tmp.replace(path)
+
+    def prune(self) -> int:
+        """Drop entries unused for max_age_days, then the least recently used over max_entries."""
+        entries = []
+        for path in self.root.glob("*.json.gz"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.max_age_s
+        dropped = 0
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or mtime <= cutoff:
+                path.unlink(missing_ok=True)
+                dropped += 1
+        return dropped
+
+    def count(self, endpoint: str, hit: bool):
+        with self._lock:
+            self.stats[route(endpoint)]["hits" if hit else "misses"] += 1
+
+    def report(self, log: Callable[[str], None]):
+        """One line total, then one per route."""
+        hits = sum(c["hits"] for c in self.stats.values())
+        misses = sum(c["misses"] for c in self.stats.values())
+        log(f"gh http cache: {hits} hits (304) / {misses} misses, {self.pruned} old entries pruned")
+        for name, c in sorted(self.stats.items()):
+            log(f"  {name}: {c['hits']} hits / {c['misses']} misses")
+
+
+def _split_response(stdout: str) -> tuple[int, dict[str, str], str]:
+    """Parse `gh api -i` output → (status, lower-cased headers, body)."""
+    head, sep, body = stdout.replace("\r\n", "\n").partition("\n\n")
+    lines = head.split("\n")
+    if not sep or not lines[0].startswith("HTTP/"):
+        return 0, {}, stdout
+    try:
+        status = int(lines[0].split()[1])
+    except (IndexError, ValueError):
+        return 0, {}, stdout
+    headers = {}
+    for line in lines[1:]:
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+class GhRunner:
+    """Thread pool for `gh` subprocess calls; safe to share across stages."""
+
+    def __init__(self, workers: int = 8, per_owner: int = 4, retries: int = 3,
+                 max_wait: float = 300, log: Callable[[str], None] | None = None,
+                 cache: HttpCache | None = None):
+        self.workers = max(1, workers)
+        self.per_owner = max(1, per_owner)
+        self.retries = retries
+        self.max_wait = max_wait
+        self.log = log or (lambda msg: None)
+        self.cache = cache
+        self._pool: ThreadPoolExecutor | None = None
+        self._owners: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()  # pool, owner slots and the pause times; never held across a `gh` call
+        self._probe_lock = threading.Lock()  # one rate-limit probe at a time
+        self._resume_at = 0.0  # time.monotonic() before which nobody calls gh
+        self._exhausted_until = 0.0  # quota gone for longer than max_wait: fail fast
+
+    # ── pool ──────────────────────────────────────────────────────────
+
+    def submit(self, fn: Callable[..., R], *args, **kwargs) -> "Future[R]":
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="gh")
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """fn over items on the pool; results in input order."""
+        return [f.result() for f in [self.submit(fn, item) for item in items]]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── calls ─────────────────────────────────────────────────────────
+
+    def _owner_slot(self, owner: str | None) -> threading.BoundedSemaphore | None:
+        if not owner:
+            return None
+        key = owner.split("/")[0].lower()
+        with self._lock:
+            if key not in self._owners:
+                self._owners[key] = threading.BoundedSemaphore(self.per_owner)
+            return self._owners[key]
+
+    def run(self, args: list[str], timeout: float = 15, owner: str | None = None) -> subprocess.CompletedProcess:
+        """`gh <args>` with capture_output/text, as subprocess.run would.
+
+        Raises subprocess.TimeoutExpired / FileNotFoundError like the direct
+        call did, so callers keep their existing error handling.
+        """
+        if time.monotonic() < self._exhausted_until:
+            return subprocess.CompletedProcess(["gh", *args], 1, "", "rate limit exhausted (skipped)\n")
+        slot = self._owner_slot(owner)
+        for attempt in range(self.retries + 1):
+            self._wait_for_quota()
+            if slot:
+                slot.acquire()
+            try:
+                result = subprocess.run(["gh", *args], capture_output=True, text=True, timeout=timeout)
+            finally:
+                if slot:
+                    slot.release()
+            if not is_rate_limited(result) or attempt == self.retries:
+                return result
+            if not self._back_off(attempt):
+                return result
+        return result
+
+    def graphql(self, query: str, variables: dict[str, str] | None = None, timeout: float = 30,
+                owner: str | None = None) -> tuple[dict | None, list[dict]]:
+        """`gh api graphql` → (data, errors).
+
+        GitHub answers a partially failed query (one alias unresolvable) with
+        both data and errors and gh exits non-zero, so the body is parsed
+        whatever the exit code; data is None only if nothing usable came back.
+        """
+        args = ["api", "graphql", "-f", f"query={query}"]
+        for key, value in (variables or {}).items():
+            args += ["-f", f"{key}={value}"]
+        result = self.run(args, timeout=timeout, owner=owner)
+        try:
+            body = json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return None, [{"message": result.stderr.strip() or f"gh exited {result.returncode}"}]
+        if not isinstance(body, dict):
+            return None, [{"message": "unexpected GraphQL response"}]
+        return body.get("data"), body.get("errors") or []
+
+    def get_json(self, endpoint: str, timeout: float = 30, owner: str | None = None) -> Any:
+        """Parsed JSON body of a REST GET, or None on any failure.
+
+        With a cache (and a cacheable() endpoint), a stored validator is sent
+        along and a 304 returns the stored body. Raises
+        subprocess.TimeoutExpired / FileNotFoundError like run().
+        """
+        cache = self.cache if self.cache and cacheable(endpoint) else None
+        entry = cache.get(endpoint) if cache else None
+        args = ["api", "-i", endpoint]
+        if entry and entry.get("etag"):
+            args += ["-H", f"If-None-Match: {entry['etag']}"]
+        elif entry and entry.get("last_modified"):
+            args += ["-H", f"If-Modified-Since: {entry['last_modified']}"]
+        result = self.run(args, timeout=timeout, owner=owner)
+        status, headers, body = _split_response(result.stdout)
+
+        if status == 304 and entry:
+            cache.count(endpoint, hit=True)
+            return entry["body"]
+        if cache:
+            cache.count(endpoint, hit=False)
+        if status != 200:
+            return None
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            return None
+        if cache:
+            cache.put(endpoint, headers.get("etag"), headers.get("last-modified"), data)
+        return data
+
+    def _wait_for_quota(self):
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def rate_limit(self) -> tuple[int, float] | None:
+        """(core remaining, seconds until reset) from `gh api rate_limit`."""
+        try:
+            result = subprocess.run(["gh", "api", "rate_limit"], capture_output=True, text=True, timeout=15)
+            core = json.loads(result.stdout)["resources"]["core"]
+            return int(core["remaining"]), max(0.0, core["reset"] - time.time())
+        except (subprocess.TimeoutExpired, FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    def _back_off(self, attempt: int) -> bool:
+        """Push the shared resume time out; False if the wait is beyond max_wait."""
+        with self._probe_lock:
+            with self._lock:
+                if self._resume_at > time.monotonic():
+                    return True  # another worker already scheduled the pause
+            # `gh api rate_limit` can take up to its timeout: ask outside _lock,
+            # so submit() and the owner slots don't stall behind it
+            quota = self.rate_limit()
+            if quota and quota[0] == 0:
+                wait = quota[1] + 1
+            else:  # secondary / abuse limit: the reset time doesn't apply
+                wait = min(self.max_wait, 5 * 2 ** attempt) + random.uniform(0, 1)
+            if wait > self.max_wait:
+                self.log(f"gh: rate limited, quota resets in {wait:.0f}s (> {self.max_wait:.0f}s) — giving up")
+                with self._lock:
+                    self._exhausted_until = time.monotonic() + wait
+                return False
+            self.log(f"gh: rate limited, pausing all calls for {wait:.0f}s")
+            with self._lock:
+                self._resume_at = time.monotonic() + wait
+            return True
@@ -8,27 +8,34 @@ Generates public/data/site-data.json from multiple sources:
   - CBAI for AI enrichment
 
 Usage:
-  python3 scripts/nightly-pipeline.py [--verbose] [--skip-ai] [--skip-github]
+  python3 scripts/nightly-pipeline.py [--verbose] [--skip-ai] [--skip-github] [--no-graphql]
 """
 
+import functools
 import json
 import os
 import sys
-import time
-import hashlib
 import subprocess
 import re
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from cbai_client import CbaiClient, extract_json
+from github_cli import GhRunner, HttpCache
+
+try:
+    import ijson  # optional: true event streaming for the Claude Web export
+except ImportError:
+    ijson = None
+
 # ─── Configuration ────────────────────────────────────────────────────────
 
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 OUTPUT_FILE = PROJECT_ROOT / "public" / "data" / "site-data.json"
 AI_PILOT_FILE = PROJECT_ROOT / "public" / "data" / "ai-pilot-data.json"
-CACHE_FILE = PROJECT_ROOT / ".summary-cache.json"
+GH_HTTP_CACHE_DIR = PROJECT_ROOT / ".gh-http-cache"  # ETag store, shared with the other gh pipelines
 
 # Load .env if exists
 ENV_FILE = PROJECT_ROOT / ".env"
@@ -71,9 +78,16 @@ BIG_IDEAS_ORGS = os.environ.get(
     "Nominate-AI,meatballai,tinymachines,Sysforge-AI"
 ).split(",")
 
+# Concurrent `gh` calls overall / per org-or-user
+GH_WORKERS = int(os.environ.get("GH_WORKERS", "8"))
+GH_PER_OWNER = int(os.environ.get("GH_PER_OWNER", "4"))
+# Repos / owners per aliased GraphQL query (Stage 1 / Stage 5)
+GH_GRAPHQL_BATCH = int(os.environ.get("GH_GRAPHQL_BATCH", "25"))
+
 VERBOSE = "--verbose" in sys.argv or "-v" in sys.argv
 SKIP_AI = "--skip-ai" in sys.argv
 SKIP_GITHUB = "--skip-github" in sys.argv
+NO_GRAPHQL = "--no-graphql" in sys.argv  # one REST call per repo, the pre-batching path
 
 # ─── Category Classification ─────────────────────────────────────────────
 
@@ -122,21 +136,77 @@ def classify_category(name: str, description: str, technologies: list[str]) -> s
     return best
 
 
+_ORG_PREFIX_RE = re.compile(r"^(tinymachines|sysforge-ai)/")
+_EXT_SUFFIX_RE = re.compile(r"\.(py|ts|js|rs)$")
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]")
+_DASH_RUN_RE = re.compile(r"-+")
+
+
+@functools.lru_cache(maxsize=None)
 def normalize_name(name: str) -> str:
     """Normalize a project name for fuzzy matching."""
     name = name.lower().strip()
     # Apply aliases
-    for alias, canonical in PROJECT_ALIASES.items():
-        if name == alias:
-            return canonical
+    if name in PROJECT_ALIASES:
+        return PROJECT_ALIASES[name]
     # Remove common prefixes/suffixes
-    name = re.sub(r"^(tinymachines|sysforge-ai)/", "", name)
-    name = re.sub(r"\.(py|ts|js|rs)$", "", name)
-    name = re.sub(r"[^a-z0-9]", "-", name)
-    name = re.sub(r"-+", "-", name).strip("-")
+    name = _ORG_PREFIX_RE.sub("", name)
+    name = _EXT_SUFFIX_RE.sub("", name)
+    name = _NON_SLUG_RE.sub("-", name)
+    name = _DASH_RUN_RE.sub("-", name).strip("-")
     return name
 
 
+def conversation_key(name: str) -> str:
+    """Slug for a conversation title: the part before any " - " or ":"."""
+    return normalize_name(name.split(" - ")[0].split(":")[0])
+
+
+class SlugIndex:
+    """Answers "first project whose slug matches" without scanning every project.
+
+    Matching is the old linear rule: the first project (in list order) with
+    slug == key, key in slug, or slug in key. "key in slug" is a lookup in a
+    table of every substring of every slug; "slug in key" slides a window of
+    each distinct slug length over the key and hashes it. Both keep the
+    lowest list index, so the winner is the one the linear scan would pick.
+    """
+
+    def __init__(self, projects: list[dict[str, Any]]):
+        self.projects = projects
+        self.exact: dict[str, int] = {}
+        self.substrings: dict[str, int] = {}
+        for i, proj in enumerate(projects):
+            slug = proj["slug"]
+            self.exact.setdefault(slug, i)
+            for a in range(len(slug) + 1):
+                for b in range(a, len(slug) + 1):
+                    self.substrings.setdefault(slug[a:b], i)
+        self.lengths = sorted({len(slug) for slug in self.exact})
+        self._memo: dict[str, dict[str, Any] | None] = {}
+
+    def get(self, slug: str) -> dict[str, Any] | None:
+        """Exact slug match."""
+        i = self.exact.get(slug)
+        return None if i is None else self.projects[i]
+
+    def match(self, key: str) -> dict[str, Any] | None:
+        """Exact or substring match in either direction."""
+        if key in self._memo:
+            return self._memo[key]
+        best = self.substrings.get(key, len(self.projects))
+        for n in self.lengths:
+            if n > len(key):
+                break
+            for a in range(len(key) - n + 1):
+                i = self.exact.get(key[a:a + n])
+                if i is not None and i < best:
+                    best = i
+        proj = self.projects[best] if best < len(self.projects) else None
+        self._memo[key] = proj
+        return proj
+
+
 def log(msg: str):
     if VERBOSE:
         print(f"  [{datetime.now().strftime('%H:%M:%S')}] {msg}")
@@ -158,8 +228,7 @@ def collect_claude_web() -> dict[str, Any]:
         log(f"Claude Web: {len(result['projects'])} projects")
 
     if conversations_file.exists():
-        data = json.loads(conversations_file.read_text())
-        result["conversations"] = data if isinstance(data, list) else []
+        result["conversations"] = list(stream_conversations(conversations_file))
         log(f"Claude Web: {len(result['conversations'])} conversations")
 
     if memories_file.exists():
@@ -170,34 +239,168 @@ def collect_claude_web() -> dict[str, Any]:
     return result
 
 
-def collect_github() -> list[dict[str, Any]]:
+CONVERSATION_FIELDS = ("name", "updated_at", "summary")
+
+
+def slim_conversation(convo: dict[str, Any]) -> dict[str, Any]:
+    """Keep only what merge/feed use from a Claude Web conversation."""
+    first_human = ""
+    messages = convo.get("chat_messages") or []
+    for msg in messages:
+        if msg.get("sender") == "human" and msg.get("text"):
+            first_human = msg["text"][:200]
+            break
+    slim = {k: convo[k] for k in CONVERSATION_FIELDS if k in convo}
+    slim["message_count"] = len(messages)
+    slim["first_human_text"] = first_human
+    return slim
+
+
+def _stream_conversations_ijson(f):
+    """Event-level parse: no conversation (or message list) is ever materialised."""
+    convo: dict[str, Any] = {}
+    sender = text = None
+    for prefix, event, value in ijson.parse(f):
+        if prefix == "item" and event == "start_map":
+            convo = {"message_count": 0, "first_human_text": ""}
+        elif prefix == "item" and event == "end_map":
+            yield convo
+        elif prefix[5:] in CONVERSATION_FIELDS and prefix.startswith("item."):
+            convo[prefix[5:]] = value
+        elif prefix == "item.chat_messages.item":
+            if event == "start_map":
+                sender = text = None
+            elif event == "end_map":
+                convo["message_count"] += 1
+                if sender == "human" and text and not convo["first_human_text"]:
+                    convo["first_human_text"] = text[:200]
+        elif prefix == "item.chat_messages.item.sender":
+            sender = value
+        elif prefix == "item.chat_messages.item.text" and not convo["first_human_text"]:
+            text = value
+
+
+def _stream_conversations_stdlib(f, chunk: int = 1 << 20):
+    """raw_decode one array element at a time; memory ~ the largest conversation."""
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk)
+    pos = len(buf) - len(buf.lstrip())
+    if buf[pos:pos + 1] != "[":
+        return
+    pos += 1
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                return
+            more = f.read(chunk)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            convo, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Element spans past the buffer: grow geometrically so a huge
+            # conversation costs O(size) re-parses, not O(size / chunk).
+            more = f.read(max(chunk, len(buf) - pos))
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        if isinstance(convo, dict):
+            yield slim_conversation(convo)
+        pos = end  # buf is trimmed only on refill: slicing per element copied up to a chunk each time
+
+
+def stream_conversations(path: Path):
+    """Yield slim conversation records from a Claude Web conversations.json."""
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from _stream_conversations_ijson(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from _stream_conversations_stdlib(f)
+
+
+def collect_github(gh: GhRunner) -> list[dict[str, Any]]:
     """Fetch GitHub repo data using gh CLI."""
     if SKIP_GITHUB:
         log("Skipping GitHub collection (--skip-github)")
         return []
 
-    repos = []
-    for repo_spec in FEATURED_REPOS:
-        repo_spec = repo_spec.strip()
-        if not repo_spec:
-            continue
+    def fetch(repo_spec: str) -> dict[str, Any] | None:
         try:
-            result = subprocess.run(
-                ["gh", "repo", "view", repo_spec, "--json",
-                 "name,description,url,pushedAt,stargazerCount,primaryLanguage,isPrivate"],
-                capture_output=True, text=True, timeout=15,
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                data["fullName"] = repo_spec
-                repos.append(data)
-                log(f"GitHub: fetched {repo_spec}")
-            else:
-                log(f"GitHub: failed {repo_spec}: {result.stderr.strip()}")
+            repo = gh.get_json(f"/repos/{repo_spec}", timeout=15, owner=repo_spec)
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
             log(f"GitHub: error {repo_spec}: {e}")
+            return None
+        if not isinstance(repo, dict):
+            log(f"GitHub: failed {repo_spec}")
+            return None
+        log(f"GitHub: fetched {repo_spec}")
+        # Same shape as `gh repo view --json` / graphql_repos
+        return {
+            "name": repo.get("name", ""),
+            "description": repo.get("description"),
+            "url": repo.get("html_url", ""),
+            "pushedAt": repo.get("pushed_at", ""),
+            "stargazerCount": repo.get("stargazers_count", 0),
+            "primaryLanguage": {"name": repo["language"]} if repo.get("language") else None,
+            "isPrivate": repo.get("private", False),
+            "fullName": repo_spec,
+        }
+
+    specs = [spec.strip() for spec in FEATURED_REPOS if spec.strip()]
+    batched = {} if NO_GRAPHQL else graphql_repos(gh, specs)
+    rest = [spec for spec in specs if spec not in batched]
+    fetched = dict(zip(rest, gh.map(fetch, rest)))
+    return [data for spec in specs if (data := batched.get(spec) or fetched.get(spec)) is not None]
+
+
+def _chunks(items: list, n: int):
+    for i in range(0, len(items), max(1, n)):
+        yield items[i:i + n]
+
+
+REPO_VIEW_FIELDS = "name description url pushedAt stargazerCount primaryLanguage { name } isPrivate"
 
-    return repos
+
+def graphql_repos(gh: GhRunner, specs: list[str]) -> dict[str, dict[str, Any]]:
+    """owner/name → `gh repo view --json`-shaped dict, GH_GRAPHQL_BATCH repos per query.
+
+    Specs GraphQL couldn't resolve (bad name, query error) are simply absent;
+    the caller fetches those over REST.
+    """
+    def batch(chunk: list[str]) -> dict[str, dict[str, Any]]:
+        aliases = []
+        for i, spec in enumerate(chunk):
+            owner, _, name = spec.partition("/")
+            aliases.append(f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+                           f"{{ {REPO_VIEW_FIELDS} }}")
+        try:
+            data, errors = gh.graphql("query { " + " ".join(aliases) + " }")
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            data, errors = None, [{"message": str(e)}]
+        if errors:
+            log(f"GitHub: GraphQL batch of {len(chunk)}: {errors[0].get('message', errors[0])}")
+        found = {}
+        for i, spec in enumerate(chunk):
+            repo = (data or {}).get(f"r{i}")
+            if repo:
+                repo["fullName"] = spec
+                found[spec] = repo
+                log(f"GitHub: fetched {spec} (graphql)")
+        return found
+
+    found: dict[str, dict[str, Any]] = {}
+    for part in gh.map(batch, list(_chunks(specs, GH_GRAPHQL_BATCH))):
+        found.update(part)
+    return found
 
 
 def collect_ai_pilot() -> dict[str, Any] | None:
@@ -225,7 +428,7 @@ def merge_projects(
     for convo in claude_web.get("conversations", []):
         name = convo.get("name", "")
         if name:
-            key = normalize_name(name.split(" - ")[0].split(":")[0])
+            key = conversation_key(name)
             if key not in convo_name_index:
                 convo_name_index[key] = []
             convo_name_index[key].append(convo)
@@ -252,10 +455,7 @@ def merge_projects(
 
         # Count messages from conversations matching this project
         matched_convos = convo_name_index.get(norm, [])
-        total_msgs = sum(
-            len(c.get("chat_messages", []))
-            for c in matched_convos
-        )
+        total_msgs = sum(c["message_count"] for c in matched_convos)
         last_convo = max(
             (c.get("updated_at", "") for c in matched_convos),
             default=""
@@ -353,51 +553,39 @@ def merge_projects(
 
 # ─── Stage 3: AI Enrichment ──────────────────────────────────────────────
 
-def load_cache() -> dict[str, Any]:
-    if CACHE_FILE.exists():
-        return json.loads(CACHE_FILE.read_text())
-    return {}
-
+def _json_object(content: str) -> dict[str, Any] | None:
+    """The flat JSON object a prompt asked for, or None."""
+    parsed = extract_json(content, r'\{[^}]+\}')
+    return parsed if isinstance(parsed, dict) else None
 
-def save_cache(cache: dict[str, Any]):
-    CACHE_FILE.write_text(json.dumps(cache, indent=2))
 
+def _json_list(content: str) -> list[dict[str, Any]] | None:
+    """A non-empty JSON array of objects, or None."""
+    parsed = extract_json(content, r'(?s)\[.*\]')
+    if isinstance(parsed, list) and parsed and all(isinstance(i, dict) for i in parsed):
+        return parsed
+    return None
 
-def project_hash(proj: dict) -> str:
-    """Hash key fields to detect changes."""
-    key = f"{proj['name']}|{proj['description']}|{proj.get('totalMessages', 0)}"
-    return hashlib.md5(key.encode()).hexdigest()[:12]
 
+def enrich_with_ai(cbai: CbaiClient | None, projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Use CBAI to generate taglines and descriptions for projects missing them.
 
-def enrich_with_ai(projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Use CBAI to generate taglines and descriptions for projects missing them."""
+    Unchanged projects produce unchanged prompts, which the CBAI response
+    cache answers without a model call.
+    """
     if SKIP_AI:
         log("Skipping AI enrichment (--skip-ai)")
         return projects
 
-    cache = load_cache()
-    updated = False
-
-    for proj in projects:
-        phash = project_hash(proj)
-        cache_key = f"{proj['slug']}_{phash}"
-
-        # Check cache
-        if cache_key in cache:
-            cached = cache[cache_key]
-            if not proj.get("tagline"):
-                proj["tagline"] = cached.get("tagline", "")
-            if not proj.get("description") or len(proj["description"]) < 50:
-                proj["description"] = cached.get("description", proj["description"])
-            continue
-
-        # Only call AI if we need tagline or description
-        if proj.get("tagline") and len(proj.get("description", "")) > 50:
-            continue
+    # Only call AI if we need tagline or description
+    todo = [
+        proj for proj in projects
+        if not (proj.get("tagline") and len(proj.get("description", "")) > 50)
+    ]
 
+    def enrich(proj: dict[str, Any]) -> dict[str, Any] | None:
         log(f"AI enrichment: {proj['name']}")
         try:
-            import urllib.request
             prompt = (
                 f"Generate a short tagline (under 80 chars) and a 2-3 sentence description "
                 f"for a technical project called '{proj['name']}'. "
@@ -406,41 +594,27 @@ def enrich_with_ai(projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
                 f"Existing description: {proj.get('description', 'none')[:200]}. "
                 f"Return JSON: {{\"tagline\": \"...\", \"description\": \"...\"}}"
             )
-            payload = json.dumps({
-                "messages": [{"role": "user", "content": prompt}],
-                "provider": CBAI_PROVIDER,
-                "max_tokens": 300,
-            }).encode()
-            req = urllib.request.Request(
-                f"{CBAI_URL}/api/v1/chat",
-                data=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                result = json.loads(resp.read())
-                content = result.get("content", "")
-                # Try to parse JSON from response
-                match = re.search(r'\{[^}]+\}', content)
-                if match:
-                    enriched = json.loads(match.group())
-                    if not proj.get("tagline"):
-                        proj["tagline"] = enriched.get("tagline", "")
-                    if not proj.get("description") or len(proj["description"]) < 50:
-                        proj["description"] = enriched.get("description", proj["description"])
-                    cache[cache_key] = enriched
-                    updated = True
-
-            time.sleep(2)  # Rate limit
+            content = cbai.chat(prompt, max_tokens=300, timeout=30,
+                                validate=lambda c: _json_object(c) is not None)
+            return _json_object(content)
         except Exception as e:
             log(f"AI enrichment failed for {proj['name']}: {e}")
+        return None
 
-    if updated:
-        save_cache(cache)
+    # Prompts run concurrently (paced by the client); results applied in order
+    for proj, enriched in zip(todo, cbai.map(enrich, todo)):
+        if enriched is None:
+            continue
+        if not proj.get("tagline"):
+            proj["tagline"] = enriched.get("tagline", "")
+        if not proj.get("description") or len(proj["description"]) < 50:
+            proj["description"] = enriched.get("description", proj["description"])
 
     return projects
 
 
 def generate_claude_corner(
+    cbai: CbaiClient | None,
     projects: list[dict[str, Any]],
     stats: dict[str, Any],
 ) -> dict[str, Any] | None:
@@ -449,8 +623,6 @@ def generate_claude_corner(
         log("Skipping Claude Corner (--skip-ai)")
         return None
 
-    import urllib.request
-
     active = [p for p in projects if p.get("status") == "active"]
     top_projects = ", ".join(p["name"] for p in active[:5])
     moods = ["excited", "reflective", "impressed", "curious", "amused"]
@@ -464,47 +636,31 @@ def generate_claude_corner(
     )
 
     try:
-        payload = json.dumps({
-            "messages": [{"role": "user", "content": prompt}],
-            "provider": CBAI_PROVIDER,
-            "max_tokens": 400,
-        }).encode()
-        req = urllib.request.Request(
-            f"{CBAI_URL}/api/v1/chat",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read())
-            content = result.get("content", "")
-            match = re.search(r'\{[^}]+\}', content)
-            if match:
-                parsed = json.loads(match.group())
-                if parsed.get("mood") not in moods:
-                    parsed["mood"] = "impressed"
-                parsed["generatedAt"] = datetime.now(timezone.utc).isoformat()
-                log(f"Claude Corner generated: mood={parsed['mood']}")
-                return parsed
+        content = cbai.chat(prompt, max_tokens=400, timeout=30,
+                            validate=lambda c: bool((_json_object(c) or {}).get("quote")))
+        parsed = _json_object(content)
+        if parsed and parsed.get("quote"):
+            if parsed.get("mood") not in moods:
+                parsed["mood"] = "impressed"
+            parsed["generatedAt"] = datetime.now(timezone.utc).isoformat()
+            log(f"Claude Corner generated: mood={parsed['mood']}")
+            return parsed
     except Exception as e:
         log(f"Claude Corner generation failed: {e}")
 
     return None
 
 
-def generate_claude_recommendations(projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def generate_claude_recommendations(cbai: CbaiClient | None, projects: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """Generate AI co-developer involvement text for featured/active projects."""
     if SKIP_AI:
         log("Skipping Claude recommendations (--skip-ai)")
         return projects
 
-    import urllib.request
-
     featured = [p for p in projects if p.get("isFeatured") and p.get("status") == "active"]
+    todo = [proj for proj in featured if not proj.get("claudeInvolvement")]
 
-    for proj in featured:
-        if proj.get("claudeInvolvement"):
-            continue
-
+    def involvement(proj: dict[str, Any]):
         log(f"Generating Claude involvement for: {proj['name']}")
         prompt = (
             f"You are Claude, an AI co-developer. In 2-3 sentences, describe your involvement "
@@ -517,27 +673,15 @@ def generate_claude_recommendations(projects: list[dict[str, Any]]) -> list[dict
         )
 
         try:
-            payload = json.dumps({
-                "messages": [{"role": "user", "content": prompt}],
-                "provider": CBAI_PROVIDER,
-                "max_tokens": 200,
-            }).encode()
-            req = urllib.request.Request(
-                f"{CBAI_URL}/api/v1/chat",
-                data=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                result = json.loads(resp.read())
-                content = result.get("content", "").strip()
-                if content and len(content) > 20:
-                    proj["claudeInvolvement"] = content
-                    log(f"  Generated {len(content)} chars")
-
-            time.sleep(2)  # Rate limit
+            content = cbai.chat(prompt, max_tokens=200, timeout=30,
+                                validate=lambda c: len(c.strip()) > 20).strip()
+            if content and len(content) > 20:
+                proj["claudeInvolvement"] = content
+                log(f"  Generated {len(content)} chars")
         except Exception as e:
             log(f"  Failed: {e}")
 
+    cbai.map(involvement, todo)
     return projects
 
 
@@ -551,22 +695,18 @@ def build_activity_feed(
 ) -> list[dict[str, Any]]:
     """Merge recent events, sort newest-first, cap at 50."""
     feed: list[dict[str, Any]] = []
+    index = SlugIndex(projects)
 
     # Claude Web conversations (recent ones)
     for convo in claude_web.get("conversations", []):
         updated = convo.get("updated_at", "")
         name = convo.get("name", "Untitled conversation")
-        msg_count = len(convo.get("chat_messages", []))
+        msg_count = convo["message_count"]
         if msg_count < 2:
             continue
 
-        summary = convo.get("summary", "")
-        if not summary and convo.get("chat_messages"):
-            # Use first human message as summary
-            for msg in convo["chat_messages"]:
-                if msg.get("sender") == "human" and msg.get("text"):
-                    summary = msg["text"][:200]
-                    break
+        # Fall back to the first human message as summary
+        summary = convo.get("summary", "") or convo["first_human_text"]
         # Strip markdown formatting from summaries
         if summary:
             summary = re.sub(r'\*?\*?Conversation [Oo]verview\*?\*?\s*', '', summary)
@@ -574,14 +714,9 @@ def build_activity_feed(
             summary = summary.strip()
 
         # Try to match to a project
-        convo_norm = normalize_name(name.split(" - ")[0].split(":")[0])
-        matched_project = None
-        matched_category = None
-        for proj in projects:
-            if proj["slug"] == convo_norm or convo_norm in proj["slug"] or proj["slug"] in convo_norm:
-                matched_project = proj["slug"]
-                matched_category = proj["category"]
-                break
+        proj = index.match(conversation_key(name))
+        matched_project = proj["slug"] if proj else None
+        matched_category = proj["category"] if proj else None
 
         feed.append({
             "type": "claude-web",
@@ -597,14 +732,9 @@ def build_activity_feed(
     for repo in github_repos:
         pushed = repo.get("pushedAt", "")
         name = repo.get("name", "")
-        norm = normalize_name(name)
-        matched_project = None
-        matched_category = None
-        for proj in projects:
-            if proj["slug"] == norm:
-                matched_project = proj["slug"]
-                matched_category = proj["category"]
-                break
+        proj = index.get(normalize_name(name))
+        matched_project = proj["slug"] if proj else None
+        matched_category = proj["category"] if proj else None
 
         feed.append({
             "type": "github",
@@ -731,84 +861,133 @@ def build_about(ai_pilot: dict[str, Any] | None) -> dict[str, Any]:
 
 # ─── Stage: Big Ideas (Cross-Org Commit Intelligence) ────────────────
 
-def collect_cross_org_commits() -> list[dict[str, str]]:
+def collect_cross_org_commits(gh: GhRunner) -> list[dict[str, str]]:
     """Fetch recent commits across all configured orgs."""
     if SKIP_GITHUB:
         log("Skipping cross-org commits (--skip-github)")
         return []
 
-    since = (datetime.now(timezone.utc) - __import__("datetime").timedelta(days=7)).isoformat()
+    since_dt = datetime.now(timezone.utc) - __import__("datetime").timedelta(days=7)
+    since = since_dt.isoformat()
     commits: list[dict[str, str]] = []
     noise_prefixes = ("bump:", "deploy:", "nightly:", "merge ", "chore: bump", "chore: deploy")
 
-    for org in BIG_IDEAS_ORGS:
-        org = org.strip()
-        if not org:
-            continue
+    # REST `since` is rounded down to the day so the endpoint (the HTTP cache
+    # key) is stable across a day's runs; the exact cut-off is applied here.
+    since_day = since[:10] + "T00:00:00Z"
 
+    def list_repos(org: str) -> list[str]:
         # Get active repos for this org
         try:
-            result = subprocess.run(
-                ["gh", "api", f"/orgs/{org}/repos", "-q",
-                 '[.[] | select(.pushed_at > "' + since[:10] + '") | .full_name] | .[:10] | .[]'],
-                capture_output=True, text=True, timeout=15,
-            )
-            if result.returncode != 0:
+            repos = gh.get_json(f"/orgs/{org}/repos", timeout=15, owner=org)
+            if repos is None:
                 # Try as user instead of org
-                result = subprocess.run(
-                    ["gh", "api", f"/users/{org}/repos?sort=pushed&per_page=10", "-q",
-                     '[.[] | select(.pushed_at > "' + since[:10] + '") | .full_name] | .[:10] | .[]'],
-                    capture_output=True, text=True, timeout=15,
-                )
-            if result.returncode != 0:
+                repos = gh.get_json(f"/users/{org}/repos?sort=pushed&per_page=10", timeout=15, owner=org)
+            if not isinstance(repos, list):
                 log(f"Big Ideas: failed to list repos for {org}")
-                continue
+                return []
 
-            repo_names = [r.strip() for r in result.stdout.strip().splitlines() if r.strip()]
+            repo_names = [r["full_name"] for r in repos if (r.get("pushed_at") or "") > since[:10]][:10]
             log(f"Big Ideas: {org} → {len(repo_names)} active repos")
+            return repo_names
 
         except (subprocess.TimeoutExpired, FileNotFoundError) as e:
             log(f"Big Ideas: error listing {org}: {e}")
-            continue
+            return []
 
-        # Get recent commits for each repo
-        for repo_full in repo_names:
-            try:
-                result = subprocess.run(
-                    ["gh", "api", f"/repos/{repo_full}/commits?since={since}&per_page=20",
-                     "-q", r'.[] | "\(.commit.message | split("\n") | .[0])\t\(.commit.author.date)\t\(.html_url)"'],
-                    capture_output=True, text=True, timeout=15,
-                )
-                if result.returncode != 0:
-                    continue
-
-                for line in result.stdout.strip().splitlines():
-                    parts = line.split("\t")
-                    if len(parts) < 2:
-                        continue
-                    msg = parts[0].strip()
-                    date = parts[1].strip() if len(parts) > 1 else ""
-
-                    # Filter noise
-                    if any(msg.lower().startswith(p) for p in noise_prefixes):
-                        continue
-                    if len(msg) < 10:
-                        continue
-
-                    commits.append({
-                        "repo": repo_full,
-                        "message": msg[:200],
-                        "date": date,
-                    })
-
-            except (subprocess.TimeoutExpired, FileNotFoundError):
+    def repo_commits(repo_full: str) -> list[dict[str, str]]:
+        # Get recent commits for one repo
+        found: list[dict[str, str]] = []
+        try:
+            items = gh.get_json(f"/repos/{repo_full}/commits?since={since_day}&per_page=20",
+                                timeout=15, owner=repo_full)
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return found
+        for item in items if isinstance(items, list) else []:
+            commit = item.get("commit") or {}
+            committed = (commit.get("committer") or {}).get("date") or ""
+            if committed and datetime.fromisoformat(committed.replace("Z", "+00:00")) < since_dt:
+                continue
+            entry = keep(repo_full, commit.get("message") or "", (commit.get("author") or {}).get("date") or "")
+            if entry:
+                found.append(entry)
+        return found
+
+    def keep(repo_full: str, message: str, date: str) -> dict[str, str] | None:
+        msg = message.split("\n")[0].strip()
+        # Filter noise
+        if any(msg.lower().startswith(p) for p in noise_prefixes) or len(msg) < 10:
+            return None
+        return {"repo": repo_full, "message": msg[:200], "date": date}
+
+    def graphql_batch(chunk: list[str]) -> dict[str, list[dict[str, str]]]:
+        # Active repos + their last-7-day default-branch history, for a batch
+        # of owners, in one query. The same repos list_repos() picks: an org
+        # is REST's default page (30 newest by creation), a user the 10 most
+        # recently pushed PUBLIC repos it owns (REST's default type=owner, so
+        # not collaborations or org repos); both then filtered on pushedAt.
+        aliases = " ".join(
+            f"o{i}: repositoryOwner(login: {json.dumps(org)}) {{"
+            " ... on Organization { repositories(first: 30, orderBy: {field: CREATED_AT, direction: DESC})"
+            " { nodes { ...active } } }"
+            " ... on User { repositories(first: 10, privacy: PUBLIC, ownerAffiliations: OWNER,"
+            " orderBy: {field: PUSHED_AT, direction: DESC})"
+            " { nodes { ...active } } } }"
+            for i, org in enumerate(chunk)
+        )
+        query = (
+            "query($since: GitTimestamp!) { " + aliases + " }"
+            " fragment active on Repository { nameWithOwner pushedAt defaultBranchRef { target {"
+            " ... on Commit { history(since: $since, first: 20) { nodes { message author { date } } } } } } }"
+        )
+        try:
+            data, errors = gh.graphql(query, {"since": since})
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            data, errors = None, [{"message": str(e)}]
+        if errors:
+            log(f"Big Ideas: GraphQL batch of {len(chunk)}: {errors[0].get('message', errors[0])}")
+        by_org = {}
+        for i, org in enumerate(chunk):
+            owner = (data or {}).get(f"o{i}")
+            if not owner or "repositories" not in owner:
                 continue
+            active = [r for r in owner["repositories"]["nodes"] if (r.get("pushedAt") or "") > since[:10]][:10]
+            log(f"Big Ideas: {org} → {len(active)} active repos (graphql)")
+            found = []
+            for repo in active:
+                target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+                for node in (target.get("history") or {}).get("nodes", []):
+                    entry = keep(repo["nameWithOwner"], node.get("message") or "",
+                                 (node.get("author") or {}).get("date") or "")
+                    if entry:
+                        found.append(entry)
+            by_org[org] = found
+        return by_org
+
+    orgs = [org.strip() for org in BIG_IDEAS_ORGS if org.strip()]
+    by_org: dict[str, list[dict[str, str]]] = {}
+    if not NO_GRAPHQL:
+        for part in gh.map(graphql_batch, list(_chunks(orgs, GH_GRAPHQL_BATCH))):
+            by_org.update(part)
+
+    # REST for whatever GraphQL didn't cover: all org listings run at once;
+    # each org's commit fetches are queued as soon as its listing lands.
+    listings = {org: gh.submit(list_repos, org) for org in orgs if org not in by_org}
+    pending: dict[str, list] = {}
+    for org, listing in listings.items():
+        pending[org] = [gh.submit(repo_commits, repo_full) for repo_full in listing.result()]
+    for org in orgs:  # collected in config order, as before
+        if org in by_org:
+            commits.extend(by_org[org])
+        else:
+            for fut in pending[org]:
+                commits.extend(fut.result())
 
     log(f"Big Ideas: collected {len(commits)} commits across {len(BIG_IDEAS_ORGS)} orgs")
     return commits
 
 
-def generate_big_ideas(commits: list[dict[str, str]]) -> list[dict[str, Any]]:
+def generate_big_ideas(cbai: CbaiClient | None, commits: list[dict[str, str]]) -> list[dict[str, Any]]:
     """Use CBAI to synthesize top 3 big ideas from recent commits."""
     if SKIP_AI:
         log("Skipping Big Ideas generation (--skip-ai)")
@@ -818,15 +997,6 @@ def generate_big_ideas(commits: list[dict[str, str]]) -> list[dict[str, Any]]:
         log("Big Ideas: no commits to analyze")
         return []
 
-    # Check cache (keyed by today's date)
-    cache = load_cache()
-    today_key = f"big_ideas_{datetime.now(timezone.utc).strftime('%Y-%m-%d')}"
-    if today_key in cache:
-        log("Big Ideas: using cached result")
-        return cache[today_key]
-
-    import urllib.request
-
     # Build commit summary for the prompt
     commit_lines = []
     for c in commits[:80]:  # Cap to avoid token limits
@@ -846,45 +1016,28 @@ def generate_big_ideas(commits: list[dict[str, str]]) -> list[dict[str, Any]]:
     )
 
     try:
-        payload = json.dumps({
-            "messages": [{"role": "user", "content": prompt}],
-            "provider": CBAI_PROVIDER,
-            "max_tokens": 800,
-        }).encode()
-        req = urllib.request.Request(
-            f"{CBAI_URL}/api/v1/chat",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            result = json.loads(resp.read())
-            content = result.get("content", "")
-
-            # Parse JSON array from response
-            match = re.search(r'\[.*\]', content, re.DOTALL)
-            if match:
-                ideas = json.loads(match.group())
-                if isinstance(ideas, list) and len(ideas) > 0:
-                    # Normalize: take first category if pipe-separated
-                    for idea in ideas:
-                        cat = idea.get("category", "systems")
-                        idea["category"] = cat.split("|")[0].strip()
-
-                    # Add dates from most recent matching commit
-                    for idea in ideas:
-                        idea_repos = idea.get("repos", [])
-                        latest_date = ""
-                        for c in commits:
-                            if any(r in c["repo"] for r in idea_repos):
-                                if c["date"] > latest_date:
-                                    latest_date = c["date"]
-                        idea["date"] = latest_date or datetime.now(timezone.utc).isoformat()
-
-                    # Cache result
-                    cache[today_key] = ideas[:3]
-                    save_cache(cache)
-                    log(f"Big Ideas: generated {len(ideas[:3])} ideas")
-                    return ideas[:3]
+        content = cbai.chat(prompt, max_tokens=800, timeout=60,
+                            validate=lambda c: _json_list(c) is not None)
+
+        ideas = _json_list(content)
+        if ideas:
+            # Normalize: take first category if pipe-separated
+            for idea in ideas:
+                cat = idea.get("category", "systems")
+                idea["category"] = cat.split("|")[0].strip()
+
+            # Add dates from most recent matching commit
+            for idea in ideas:
+                idea_repos = idea.get("repos", [])
+                latest_date = ""
+                for c in commits:
+                    if any(r in c["repo"] for r in idea_repos):
+                        if c["date"] > latest_date:
+                            latest_date = c["date"]
+                idea["date"] = latest_date or datetime.now(timezone.utc).isoformat()
+
+            log(f"Big Ideas: generated {len(ideas[:3])} ideas")
+            return ideas[:3]
 
     except Exception as e:
         log(f"Big Ideas generation failed: {e}")
@@ -898,10 +1051,20 @@ def main():
     print(f"  {datetime.now(timezone.utc).isoformat()}")
     print("=" * 60)
 
+    # One pool for every `gh` call in the run (Stage 1 repo views, Stage 5 commits);
+    # REST reads go through the conditional-request cache
+    gh = GhRunner(workers=GH_WORKERS, per_owner=GH_PER_OWNER, log=log, cache=HttpCache(GH_HTTP_CACHE_DIR))
+    # Every CBAI prompt: keep-alive, CBAI_CONCURRENCY workers, CBAI_RATE pacing, and
+    # the content-addressed response cache shared with the timeline pipeline.
+    # Not opened at all under --skip-ai.
+    cbai = None if SKIP_AI else CbaiClient.from_env(
+        cache_path=PROJECT_ROOT / ".cbai-cache.sqlite", url=CBAI_URL, provider=CBAI_PROVIDER,
+    )
+
     # Stage 1: Collect
     print("\n[Stage 1] Collecting data sources...")
     claude_web = collect_claude_web()
-    github_repos = collect_github()
+    github_repos = collect_github(gh)
     ai_pilot = collect_ai_pilot()
 
     # Stage 2: Merge & Deduplicate
@@ -911,8 +1074,8 @@ def main():
 
     # Stage 3: AI Enrichment
     print("\n[Stage 3] AI enrichment...")
-    projects = enrich_with_ai(projects)
-    projects = generate_claude_recommendations(projects)
+    projects = enrich_with_ai(cbai, projects)
+    projects = generate_claude_recommendations(cbai, projects)
 
     # Sort projects by lastActivity (newest first)
     projects.sort(key=lambda p: p.get("lastActivity", ""), reverse=True)
@@ -924,14 +1087,15 @@ def main():
 
     # Stage 5: Big Ideas (Cross-Org Commit Intelligence)
     print("\n[Stage 5] Cross-org commit analysis...")
-    cross_org_commits = collect_cross_org_commits()
-    big_ideas = generate_big_ideas(cross_org_commits)
+    cross_org_commits = collect_cross_org_commits(gh)
+    gh.cache.report(log)
+    big_ideas = generate_big_ideas(cbai, cross_org_commits)
     log(f"Big Ideas: {len(big_ideas)} themes identified")
 
     # Stage 6: Output
     print("\n[Stage 6] Writing output...")
     stats = build_stats(projects, ai_pilot)
-    claude_corner = generate_claude_corner(projects, stats)
+    claude_corner = generate_claude_corner(cbai, projects, stats)
 
     site_data = {
         "generated": datetime.now(timezone.utc).isoformat(),
@@ -952,6 +1116,9 @@ def main():
     print(f"\n  Wrote {OUTPUT_FILE}")
     print(f"  {len(projects)} projects, {len(activity_feed)} activity items")
     print(f"  Stats: {json.dumps(stats)}")
+    if cbai is not None:
+        print(f"  {cbai.stats()}")
+        cbai.close()
 
     # Refresh MCP catalog
     mcp_script = SCRIPT_DIR / "generate-mcp-catalog.py"
@@ -9,35 +9,51 @@ summarizes per-repo via CBAI, then synthesizes cross-repo phases.
 Usage:
   python3 scripts/nominate-timeline-pipeline.py [--verbose] [--skip-ai] [--skip-cache]
   python3 scripts/nominate-timeline-pipeline.py --target tinymachines [--verbose] [--skip-ai]
+  python3 scripts/nominate-timeline-pipeline.py --targets Nominate-AI,tinymachines,Sysforge-AI,isenbek
+  python3 scripts/nominate-timeline-pipeline.py --workers 8   # parallel Stage 2 AI summaries
+
+--targets runs several orgs in one process: they share the gh runner and its
+ETag cache and the CBAI client and its response cache, and run side by side
+(TIMELINE_PARALLEL at a time, default all) so one org's GitHub fetches
+overlap another's AI calls. Exit status is 1 if any target failed.
 """
 
 import json
 import os
-import re
 import subprocess
 import sys
-import time
-import urllib.request
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
+from cbai_client import CbaiClient, extract_json
+from github_cli import GhRunner, HttpCache
+
 # ─── Config ──────────────────────────────────────────────────────────
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
-# Parse --target flag (default: Nominate-AI)
-ORG = "Nominate-AI"
+# Parse --target / --targets flags (default: Nominate-AI)
+TARGETS = ["Nominate-AI"]
+WORKERS = None  # --workers N overrides CBAI_CONCURRENCY
 for i, arg in enumerate(sys.argv):
     if arg == "--target" and i + 1 < len(sys.argv):
-        ORG = sys.argv[i + 1]
+        TARGETS = [sys.argv[i + 1]]
+    elif arg == "--targets" and i + 1 < len(sys.argv):
+        TARGETS = [t.strip() for t in sys.argv[i + 1].split(",") if t.strip()]
+    elif arg == "--workers" and i + 1 < len(sys.argv):
+        WORKERS = int(sys.argv[i + 1])
 
-# Per-target file paths
-ORG_SLUG = ORG.lower().replace(" ", "-")
-CACHE_FILE = PROJECT_ROOT / f".{ORG_SLUG}-timeline-cache.json"
-OUTPUT_FILE = PROJECT_ROOT / "public" / "data" / f"{ORG_SLUG}-timeline.json"
+# Targets run concurrently in batch mode; GitHub and CBAI calls stay bounded
+# by the shared gh / cbai pools built in main() either way
+TIMELINE_PARALLEL = max(1, int(os.environ.get("TIMELINE_PARALLEL", "0")) or len(TARGETS))
 
 CBAI_URL = os.environ.get("CBAI_URL", "http://127.0.0.1:3220")
 CBAI_PROVIDER = os.environ.get("CBAI_PROVIDER", "ollama")
 
+# AI summaries saved to the cache every N results during Stage 2
+SUMMARY_CHECKPOINT = max(1, int(os.environ.get("SUMMARY_CHECKPOINT", "10")))
+
 VERBOSE = "--verbose" in sys.argv
 SKIP_AI = "--skip-ai" in sys.argv
 SKIP_CACHE = "--skip-cache" in sys.argv
@@ -48,75 +64,92 @@ NOISE_PREFIXES = (
 )
 
 
+def _tag() -> str:
+    """Line prefix naming the target's thread in batch mode, so interleaved output stays readable."""
+    return f"[{threading.current_thread().name}] " if len(TARGETS) > 1 else ""
+
+
 def log(msg: str):
     if VERBOSE:
-        print(f"  [{datetime.now().strftime('%H:%M:%S')}] {msg}")
+        print(f"  [{datetime.now().strftime('%H:%M:%S')}] {_tag()}{msg}")
+
+
+def say(msg: str):
+    """Unconditional progress line (leading newlines kept ahead of the tag)."""
+    body = msg.lstrip("\n")
+    print(f"{msg[:len(msg) - len(body)]}{_tag()}{body}")
+
+
+class Target:
+    """One GitHub org (or user) and its per-target cache / output paths."""
 
+    def __init__(self, org: str):
+        self.org = org
+        self.slug = org.lower().replace(" ", "-")
+        self.cache_file = PROJECT_ROOT / f".{self.slug}-timeline-cache.json"
+        self.output_file = PROJECT_ROOT / "public" / "data" / f"{self.slug}-timeline.json"
 
-def load_cache() -> dict:
-    if not SKIP_CACHE and CACHE_FILE.exists():
-        return json.loads(CACHE_FILE.read_text())
+
+def write_atomic(path: Path, text: str):
+    """tmp + rename: readers (and a crash mid-write) only ever see a whole file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def load_cache(target: Target) -> dict:
+    if not SKIP_CACHE and target.cache_file.exists():
+        return json.loads(target.cache_file.read_text())
     return {}
 
 
-def save_cache(cache: dict):
-    CACHE_FILE.write_text(json.dumps(cache, indent=2))
+def save_cache(target: Target, cache: dict):
+    write_atomic(target.cache_file, json.dumps(cache, indent=2))
 
 
-def call_cbai(prompt: str, max_tokens: int = 1000, timeout: int = 60) -> str:
-    """Send a prompt to CBAI and return the text content."""
-    payload = json.dumps({
-        "messages": [{"role": "user", "content": prompt}],
-        "provider": CBAI_PROVIDER,
-        "max_tokens": max_tokens,
-    }).encode()
-    req = urllib.request.Request(
-        f"{CBAI_URL}/api/v1/chat",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        result = json.loads(resp.read())
-        return result.get("content", "")
+def call_cbai(cbai: CbaiClient, prompt: str, max_tokens: int = 1000, timeout: int = 60) -> dict | None:
+    """Send a prompt to CBAI and return the JSON object it answered with.
+
+    Only a reply that parses is kept in the CBAI response cache, so a bad
+    answer is asked again on the next run.
+    """
+    content = cbai.chat(prompt, max_tokens=max_tokens, timeout=timeout,
+                        validate=lambda c: isinstance(extract_json(c), dict))
+    parsed = extract_json(content)
+    return parsed if isinstance(parsed, dict) else None
 
 
 # ─── Stage 1: Fetch all repos + commits ─────────────────────────────
 
-def fetch_all_repos() -> list[dict]:
-    """Fetch all repos from the Nominate-AI org via gh CLI."""
-    log(f"Fetching repos for {ORG}...")
+def fetch_all_repos(gh: GhRunner, org: str) -> list[dict]:
+    """Fetch all repos from a GitHub org (or user) via gh CLI."""
+    log(f"Fetching repos for {org}...")
     repos = []
     page = 1
 
     while True:
         # Try org API first, fall back to user API
-        result = subprocess.run(
-            ["gh", "api", f"/orgs/{ORG}/repos?per_page=100&page={page}",
-             "-q", r'.[] | "\(.name)\t\(.language // "Unknown")\t\(.created_at)\t\(.pushed_at)\t\(.description // "")"'],
-            capture_output=True, text=True, timeout=30,
-        )
-        if result.returncode != 0 or not result.stdout.strip():
-            result = subprocess.run(
-                ["gh", "api", f"/users/{ORG}/repos?per_page=100&page={page}",
-                 "-q", r'.[] | "\(.name)\t\(.language // "Unknown")\t\(.created_at)\t\(.pushed_at)\t\(.description // "")"'],
-                capture_output=True, text=True, timeout=30,
-            )
-        if result.returncode != 0 or not result.stdout.strip():
+        try:
+            items = gh.get_json(f"/orgs/{org}/repos?per_page=100&page={page}")
+            if not items:
+                items = gh.get_json(f"/users/{org}/repos?per_page=100&page={page}")
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            break
+        if not items or not isinstance(items, list):
             break
 
-        for line in result.stdout.strip().splitlines():
-            parts = line.split("\t")
-            if len(parts) < 4:
-                continue
+        for item in items:
             repos.append({
-                "name": parts[0].strip(),
-                "language": parts[1].strip(),
-                "created_at": parts[2].strip(),
-                "pushed_at": parts[3].strip(),
-                "description": parts[4].strip() if len(parts) > 4 else "",
+                "name": item.get("name", ""),
+                "language": item.get("language") or "Unknown",
+                "created_at": item.get("created_at", ""),
+                "pushed_at": item.get("pushed_at", ""),
+                "default_branch": item.get("default_branch") or "",
+                "description": (item.get("description") or "").strip(),
             })
 
-        if len(result.stdout.strip().splitlines()) < 100:
+        if len(items) < 100:
             break
         page += 1
 
@@ -124,47 +157,65 @@ def fetch_all_repos() -> list[dict]:
     return repos
 
 
-def fetch_repo_commits(repo_name: str) -> list[dict]:
-    """Fetch all commits for a single repo, paginating."""
+def _commit_record(item: dict) -> dict:
+    commit = item.get("commit") or {}
+    author = commit.get("author") or {}
+    return {
+        "message": (commit.get("message") or "").split("\n")[0].strip()[:200],
+        "date": author.get("date") or "",
+        "sha": (item.get("sha") or "")[:7],
+        "author": author.get("name") or "",
+    }
+
+
+def fetch_repo_commits(gh: GhRunner, org: str, repo_name: str) -> tuple[list[dict], str] | None:
+    """Fetch all commits for a single repo, paginating → (commits, full head sha).
+
+    None if any page fails (timeout, error status, rate-limit skip): a partial
+    list must not be saved as synced, or the missing commits never come back.
+    """
     commits = []
+    head = ""
     page = 1
 
     while True:
         try:
-            result = subprocess.run(
-                ["gh", "api",
-                 f"/repos/{ORG}/{repo_name}/commits?per_page=100&page={page}",
-                 "-q", r'.[] | "\(.commit.message | split("\n") | .[0])\t\(.commit.author.date)\t\(.sha[:7])\t\(.commit.author.name)"'],
-                capture_output=True, text=True, timeout=30,
-            )
-            if result.returncode != 0 or not result.stdout.strip():
-                break
-
-            lines = result.stdout.strip().splitlines()
-            for line in lines:
-                parts = line.split("\t")
-                if len(parts) < 3:
-                    continue
-                msg = parts[0].strip()
-                date = parts[1].strip()
-                sha = parts[2].strip()
-                author = parts[3].strip() if len(parts) > 3 else ""
-
-                commits.append({
-                    "message": msg[:200],
-                    "date": date,
-                    "sha": sha,
-                    "author": author,
-                })
-
-            if len(lines) < 100:
-                break
-            page += 1
-
+            items = gh.get_json(f"/repos/{org}/{repo_name}/commits?per_page=100&page={page}")
         except (subprocess.TimeoutExpired, FileNotFoundError):
+            return None
+        if not isinstance(items, list):
+            return None
+
+        if page == 1 and items:
+            head = items[0].get("sha") or ""
+        commits.extend(_commit_record(item) for item in items)
+
+        if len(items) < 100:
             break
+        page += 1
+
+    return commits, head
+
 
-    return commits
+def fetch_new_commits(gh: GhRunner, org: str, repo_name: str, base: str, branch: str) -> tuple[list[dict], str] | None:
+    """Commits on `branch` not reachable from `base` (newest first) → (commits, head sha).
+
+    The compare API goes by ancestry, not date, so it also finds commits made
+    long before they were pushed. None when that isn't a plain fast-forward
+    (force-push: base is no longer an ancestor, or is gone), when the compare
+    is too long for one response, or on failure — the caller refetches.
+    """
+    try:
+        data = gh.get_json(f"/repos/{org}/{repo_name}/compare/{base}...{branch}")
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return None
+    if not isinstance(data, dict) or data.get("status") not in ("ahead", "identical"):
+        return None
+    items = data.get("commits") or []
+    if data.get("total_commits", 0) != len(items):
+        return None
+    head = items[-1].get("sha", "") if items else base
+    return [_commit_record(item) for item in reversed(items)], head
 
 
 def is_noise(msg: str) -> bool:
@@ -172,7 +223,7 @@ def is_noise(msg: str) -> bool:
     return any(lower.startswith(p) for p in NOISE_PREFIXES) or len(lower) < 10
 
 
-def fetch_all_data(cache: dict) -> dict:
+def fetch_all_data(gh: GhRunner, target: Target, cache: dict) -> dict:
     """Stage 1: Fetch all repos and their commits."""
     # Check cache for raw data
     if "raw_repos" in cache and not SKIP_CACHE:
@@ -184,17 +235,52 @@ def fetch_all_data(cache: dict) -> dict:
             log("Using cached raw data (< 24h old)")
             return cache
 
-    repos = fetch_all_repos()
+    repos = fetch_all_repos(gh, target.org)
     all_repo_data = []
+    # Watermarks from the last sync: the pushed_at we fetched at, and the
+    # default branch's head sha then. A push is synced by comparing that head
+    # with the branch; a rewritten history (or a cache from before head_sha
+    # was kept) is refetched whole, which also drops commits no longer on
+    # the branch. --skip-cache starts from {} → full refetch.
+    previous = {r["name"]: r for r in cache.get("raw_repos", [])}
+    synced = {"unchanged": 0, "incremental": 0, "full": 0, "failed": 0}
 
     for i, repo in enumerate(repos):
         name = repo["name"]
-        log(f"  [{i+1}/{len(repos)}] Fetching commits for {name}...")
-        commits = fetch_repo_commits(name)
+        prev = previous.get(name)
+        commits = None
+        if prev and prev.get("pushed_at") == repo["pushed_at"]:
+            synced["unchanged"] += 1
+            commits, head = prev["commits"], prev.get("head_sha", "")
+        elif prev and prev.get("head_sha") and repo.get("default_branch"):
+            log(f"  [{i+1}/{len(repos)}] Fetching commits for {name} since {prev['head_sha'][:7]}...")
+            fetched = fetch_new_commits(gh, target.org, name, prev["head_sha"], repo["default_branch"])
+            if fetched is not None:
+                synced["incremental"] += 1
+                fresh, head = fetched
+                commits = fresh + prev["commits"]  # newest-first, like the API
+        if commits is None:
+            log(f"  [{i+1}/{len(repos)}] Fetching commits for {name}...")
+            synced["full"] += 1
+            fetched = fetch_repo_commits(gh, target.org, name)
+            if fetched is not None:
+                commits, head = fetched
+
+        if commits is None:
+            # Keep the last good sync (or mark none) so the next run retries
+            log(f"  {name}: commit fetch failed — keeping previous data, will retry")
+            synced["failed"] += 1
+            if prev:
+                all_repo_data.append({**prev, **{k: v for k, v in repo.items() if k != "pushed_at"}})
+            else:
+                all_repo_data.append({**repo, "pushed_at": "", "commits": [], "meaningful_commits": [],
+                                      "total_commits": 0, "meaningful_count": 0})
+            continue
         meaningful = [c for c in commits if not is_noise(c["message"])]
 
         all_repo_data.append({
             **repo,
+            "head_sha": head,
             "commits": commits,
             "meaningful_commits": meaningful,
             "total_commits": len(commits),
@@ -206,7 +292,9 @@ def fetch_all_data(cache: dict) -> dict:
 
     cache["raw_repos"] = all_repo_data
     cache["raw_fetched_at"] = datetime.now(timezone.utc).isoformat()
-    save_cache(cache)
+    save_cache(target, cache)
+    log(f"Sync: {synced['unchanged']} repos unchanged (skipped), "
+        f"{synced['incremental']} incremental, {synced['full']} full, {synced['failed']} failed")
     log(f"Stage 1 complete: {len(all_repo_data)} repos, "
         f"{sum(r['total_commits'] for r in all_repo_data)} total commits")
     return cache
@@ -214,15 +302,55 @@ def fetch_all_data(cache: dict) -> dict:
 
 # ─── Stage 2: Per-repo summarization ────────────────────────────────
 
-def summarize_repos(cache: dict) -> dict:
-    """Stage 2: AI-summarize each repo's purpose and milestones."""
+def summarize_one(cbai: CbaiClient, repo: dict) -> tuple[dict, str]:
+    """AI summary of one repo → (summary, log note). Runs on the CBAI pool."""
+    name = repo["name"]
+    meaningful = repo["meaningful_commits"]
+    commit_text = "\n".join(
+        f"- {c['date'][:10]}: {c['message']}"
+        for c in meaningful[:30]
+    )
+    prompt = (
+        f"Summarize this GitHub repository in 2-3 sentences. "
+        f"Repo: {name}\n"
+        f"Language: {repo['language']}\n"
+        f"Description: {repo.get('description', 'none')}\n"
+        f"Recent commits (newest first):\n{commit_text}\n\n"
+        f"Also identify 1-3 key milestones (date + short title).\n"
+        f'Return JSON: {{"description": "...", "milestones": [{{"date": "YYYY-MM-DD", "title": "..."}}]}}'
+    )
+    fallback = {"name": name, "description": repo.get("description", ""), "milestones": []}
+
+    try:
+        parsed = call_cbai(cbai, prompt, max_tokens=500)
+        if parsed is None:
+            return fallback, "AI response unparseable"
+        return {
+            "name": name,
+            "description": parsed.get("description", repo.get("description", "")),
+            "milestones": parsed.get("milestones", []),
+        }, "AI summarized"
+    except Exception as e:
+        return fallback, f"AI failed ({e})"
+
+
+def summarize_repos(cbai: CbaiClient | None, target: Target, cache: dict) -> dict:
+    """Stage 2: AI-summarize each repo's purpose and milestones.
+
+    Cached and commit-list summaries are filled in directly; the rest go to
+    the CBAI pool (CBAI_CONCURRENCY / --workers) and are written back as
+    they finish, with a cache checkpoint every SUMMARY_CHECKPOINT results.
+    """
     repos = cache["raw_repos"]
     summaries = cache.get("repo_summaries", {})
+    index: dict[str, str] = {}  # repo name → key of its current summary
+    pending: dict = {}  # future → (position, repo, cache_key)
 
     for i, repo in enumerate(repos):
         name = repo["name"]
         latest_sha = repo["commits"][0]["sha"] if repo["commits"] else "none"
         cache_key = f"{name}_{latest_sha}"
+        index[name] = cache_key
 
         if cache_key in summaries:
             log(f"  [{i+1}/{len(repos)}] {name}: cached")
@@ -250,75 +378,64 @@ def summarize_repos(cache: dict) -> dict:
             }
             continue
 
-        # AI summarization
-        commit_text = "\n".join(
-            f"- {c['date'][:10]}: {c['message']}"
-            for c in meaningful[:30]
-        )
-        prompt = (
-            f"Summarize this GitHub repository in 2-3 sentences. "
-            f"Repo: {name}\n"
-            f"Language: {repo['language']}\n"
-            f"Description: {repo.get('description', 'none')}\n"
-            f"Recent commits (newest first):\n{commit_text}\n\n"
-            f"Also identify 1-3 key milestones (date + short title).\n"
-            f'Return JSON: {{"description": "...", "milestones": [{{"date": "YYYY-MM-DD", "title": "..."}}]}}'
-        )
-
-        try:
-            content = call_cbai(prompt, max_tokens=500)
-            match = re.search(r'\{[\s\S]*\}', content)
-            if match:
-                parsed = json.loads(match.group())
-                summaries[cache_key] = {
-                    "name": name,
-                    "description": parsed.get("description", repo.get("description", "")),
-                    "milestones": parsed.get("milestones", []),
-                }
-                log(f"  [{i+1}/{len(repos)}] {name}: AI summarized")
-            else:
-                summaries[cache_key] = {
-                    "name": name,
-                    "description": repo.get("description", ""),
-                    "milestones": [],
-                }
-                log(f"  [{i+1}/{len(repos)}] {name}: AI response unparseable")
-        except Exception as e:
-            log(f"  [{i+1}/{len(repos)}] {name}: AI failed ({e})")
-            summaries[cache_key] = {
-                "name": name,
-                "description": repo.get("description", ""),
-                "milestones": [],
-            }
+        pending[cbai.submit(summarize_one, cbai, repo)] = (i, repo, cache_key)
 
-        time.sleep(2)  # Rate limit
+    if pending:
+        log(f"  {len(pending)} repos queued for AI summaries ({cbai.concurrency} workers)")
+    cache["repo_summaries"] = summaries
+    for done, future in enumerate(as_completed(pending), 1):
+        i, repo, cache_key = pending[future]
+        summaries[cache_key], note = future.result()
+        log(f"  [{i+1}/{len(repos)}] {repo['name']}: {note}")
+        if done % SUMMARY_CHECKPOINT == 0 and done < len(pending):
+            save_cache(target, cache)
+            log(f"  Checkpoint: {done}/{len(pending)} AI summaries saved")
+
+    # GC: drop summaries for superseded heads and repos no longer listed.
+    # (Skipped on an empty listing — that's a failed fetch, not an empty org.)
+    if index:
+        live = set(index.values())
+        stale = [key for key in summaries if key not in live]
+        for key in stale:
+            del summaries[key]
+        if stale:
+            log(f"  Dropped {len(stale)} stale summaries")
+        cache["summary_index"] = index
 
     cache["repo_summaries"] = summaries
-    save_cache(cache)
+    save_cache(target, cache)
     log(f"Stage 2 complete: {len(summaries)} repo summaries")
     return cache
 
 
+def summary_lookup(cache: dict):
+    """name → current summary, through the index Stage 2 maintains."""
+    summaries = cache.get("repo_summaries", {})
+    index = cache.get("summary_index")
+    if index is None:  # cache from before the index: newest key per name wins
+        index = {key.rsplit("_", 1)[0]: key for key in summaries}
+
+    def get_summary(name: str) -> dict:
+        summary = summaries.get(index.get(name, ""))
+        return summary if summary is not None else {"name": name, "description": "", "milestones": []}
+
+    return get_summary
+
+
 # ─── Stage 3: Cross-repo phase synthesis ─────────────────────────────
 
-def synthesize_phases(cache: dict) -> dict:
+def synthesize_phases(cbai: CbaiClient | None, target: Target, cache: dict) -> dict:
     """Stage 3: Group repos into development phases via AI."""
     repos = cache["raw_repos"]
-    summaries = cache.get("repo_summaries", {})
 
     # Sort repos by creation date
     sorted_repos = sorted(repos, key=lambda r: r.get("created_at", ""))
 
-    # Build repo summary lookup (match by name prefix)
-    def get_summary(name: str) -> dict:
-        for key, val in summaries.items():
-            if key.startswith(f"{name}_"):
-                return val
-        return {"name": name, "description": "", "milestones": []}
+    get_summary = summary_lookup(cache)
 
     if SKIP_AI:
         # Auto-generate phases based on time quarters
-        return _auto_phases(sorted_repos, get_summary, cache)
+        return _auto_phases(target, sorted_repos, get_summary, cache)
 
     # Batch repos chronologically (6-8 per batch)
     batch_size = 7
@@ -336,7 +453,7 @@ def synthesize_phases(cache: dict) -> dict:
 
         prompt = (
             f"These {len(batch)} repos were created in chronological order as part of the "
-            f"{ORG} project ecosystem. What development phase do they represent?\n\n"
+            f"{target.org} project ecosystem. What development phase do they represent?\n\n"
             f"{repo_descriptions}\n\n"
             f"Give the phase a descriptive name, the date range it covers, "
             f"a 2-3 sentence narrative of what was built, and categorize it as one of: "
@@ -347,10 +464,8 @@ def synthesize_phases(cache: dict) -> dict:
         )
 
         try:
-            content = call_cbai(prompt, max_tokens=800)
-            match = re.search(r'\{[\s\S]*\}', content)
-            if match:
-                phase = json.loads(match.group())
+            phase = call_cbai(cbai, prompt, max_tokens=800)
+            if phase is not None:
                 phase["repos"] = [r["name"] for r in batch]
                 phase.setdefault("milestones", [])
                 phase.setdefault("category", "systems")
@@ -363,10 +478,8 @@ def synthesize_phases(cache: dict) -> dict:
             log(f"  Phase {bi+1}: AI failed ({e}), using auto")
             phases.append(_make_auto_phase(batch, bi, get_summary))
 
-        time.sleep(3)
-
     cache["phases"] = phases
-    save_cache(cache)
+    save_cache(target, cache)
     log(f"Stage 3 complete: {len(phases)} phases")
     return cache
 
@@ -386,7 +499,7 @@ def _make_auto_phase(batch: list, index: int, get_summary) -> dict:
     }
 
 
-def _auto_phases(sorted_repos: list, get_summary, cache: dict) -> dict:
+def _auto_phases(target: Target, sorted_repos: list, get_summary, cache: dict) -> dict:
     """Generate phases purely from temporal grouping (no AI)."""
     from collections import defaultdict
 
@@ -415,17 +528,16 @@ def _auto_phases(sorted_repos: list, get_summary, cache: dict) -> dict:
         })
 
     cache["phases"] = phases
-    save_cache(cache)
+    save_cache(target, cache)
     log(f"Stage 3 (auto): {len(phases)} phases from quarters")
     return cache
 
 
 # ─── Output generation ───────────────────────────────────────────────
 
-def build_output(cache: dict) -> dict:
-    """Build the final nominate-timeline.json from cached data."""
+def build_output(target: Target, cache: dict) -> dict | None:
+    """Build the final {slug}-timeline.json from cached data (None if refused)."""
     repos_raw = cache.get("raw_repos", [])
-    summaries = cache.get("repo_summaries", {})
     phases = cache.get("phases", [])
 
     # Guard: never overwrite a good timeline with an empty stub.
@@ -436,24 +548,25 @@ def build_output(cache: dict) -> dict:
     # loudly and leave the last-good file in place.
     if not repos_raw:
         existing_repos = 0
-        if OUTPUT_FILE.exists():
+        if target.output_file.exists():
             try:
-                existing_repos = json.loads(OUTPUT_FILE.read_text()).get("totalRepos", 0)
+                existing_repos = json.loads(target.output_file.read_text()).get("totalRepos", 0)
             except (json.JSONDecodeError, OSError):
                 existing_repos = 0
         print(
-            f"\nERROR: fetched 0 repos for {ORG} — refusing to overwrite "
-            f"{OUTPUT_FILE.name} (existing has {existing_repos} repos). "
+            f"\nERROR: fetched 0 repos for {target.org} — refusing to overwrite "
+            f"{target.output_file.name} (existing has {existing_repos} repos). "
             f"This usually means the GitHub fetch failed; not a real empty org.",
             file=sys.stderr,
         )
-        sys.exit(1)
+        return None
 
-    def get_summary(name: str) -> dict:
-        for key, val in summaries.items():
-            if key.startswith(f"{name}_"):
-                return val
-        return {"name": name, "description": "", "milestones": []}
+    get_summary = summary_lookup(cache)
+    # repo → first phase listing it
+    phase_of: dict[str, str] = {}
+    for p in phases:
+        for repo_name in p.get("repos", []):
+            phase_of.setdefault(repo_name, p.get("name", ""))
 
     # Language stats
     languages: dict[str, int] = {}
@@ -509,12 +622,7 @@ def build_output(cache: dict) -> dict:
         commits = r.get("commits", [])
         commit_dates = sorted([c["date"] for c in commits if c.get("date")])
 
-        # Find which phase this repo belongs to
-        phase_name = ""
-        for p in phases:
-            if r["name"] in p.get("repos", []):
-                phase_name = p.get("name", "")
-                break
+        phase_name = phase_of.get(r["name"], "")
 
         repo_list.append({
             "name": r["name"],
@@ -543,7 +651,7 @@ def build_output(cache: dict) -> dict:
 
     output = {
         "generated": datetime.now(timezone.utc).isoformat(),
-        "org": ORG,
+        "org": target.org,
         "totalRepos": len(repos_raw),
         "firstCommit": all_dates[0] if all_dates else "",
         "latestCommit": all_dates[-1] if all_dates else "",
@@ -554,41 +662,79 @@ def build_output(cache: dict) -> dict:
         "repos": sorted(repo_list, key=lambda r: r.get("firstCommit", "")),
     }
 
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    OUTPUT_FILE.write_text(json.dumps(output, indent=2))
-    print(f"\nOutput written to {OUTPUT_FILE}")
-    print(f"  Repos: {output['totalRepos']}")
-    print(f"  Commits: {output['totalCommits']}")
-    print(f"  Phases: {len(output['phases'])}")
-    print(f"  Languages: {len(output['languages'])}")
+    write_atomic(target.output_file, json.dumps(output, indent=2))
+    say(f"\nOutput written to {target.output_file}")
+    say(f"  Repos: {output['totalRepos']}")
+    say(f"  Commits: {output['totalCommits']}")
+    say(f"  Phases: {len(output['phases'])}")
+    say(f"  Languages: {len(output['languages'])}")
 
     return output
 
 
 # ─── Main ─────────────────────────────────────────────────────────────
 
-def main():
-    print(f"{ORG} Timeline Pipeline → {OUTPUT_FILE.name}")
-    print(f"{'=' * 40}")
+def run_target(gh: GhRunner, cbai: CbaiClient | None, target: Target) -> bool:
+    """All stages for one target; False if it produced no output."""
+    threading.current_thread().name = target.slug
+    say(f"{target.org} Timeline Pipeline → {target.output_file.name}")
+    say(f"{'=' * 40}")
 
-    cache = load_cache()
+    cache = load_cache(target)
 
     # Stage 1
-    print("\nStage 1: Fetching repos + commits...")
-    cache = fetch_all_data(cache)
+    say("\nStage 1: Fetching repos + commits...")
+    cache = fetch_all_data(gh, target, cache)
 
     # Stage 2
-    print("\nStage 2: Per-repo summarization...")
-    cache = summarize_repos(cache)
+    say("\nStage 2: Per-repo summarization...")
+    cache = summarize_repos(cbai, target, cache)
 
     # Stage 3
-    print("\nStage 3: Cross-repo phase synthesis...")
-    cache = synthesize_phases(cache)
+    say("\nStage 3: Cross-repo phase synthesis...")
+    cache = synthesize_phases(cbai, target, cache)
 
     # Build output
-    print("\nBuilding output...")
-    build_output(cache)
+    say("\nBuilding output...")
+    return build_output(target, cache) is not None
+
 
+def main():
+    targets = [Target(org) for org in TARGETS]
+
+    # GitHub REST reads: conditional requests against an on-disk ETag cache
+    gh = GhRunner(log=log, cache=HttpCache(PROJECT_ROOT / ".gh-http-cache"))
+    # Keep-alive CBAI client; its token bucket (CBAI_RATE) replaces the old sleeps.
+    # Responses are cached by (prompt, provider, max_tokens) in .cbai-cache.sqlite,
+    # which --skip-ai never opens.
+    cbai = None if SKIP_AI else CbaiClient.from_env(
+        cache_path=PROJECT_ROOT / ".cbai-cache.sqlite", url=CBAI_URL, provider=CBAI_PROVIDER,
+        **({"concurrency": WORKERS} if WORKERS else {}),
+    )
+
+    if len(targets) == 1:
+        ok = [run_target(gh, cbai, targets[0])]
+    else:
+        print(f"Batch: {', '.join(t.org for t in targets)} ({TIMELINE_PARALLEL} at a time)")
+        with ThreadPoolExecutor(TIMELINE_PARALLEL) as pool:
+            futures = {pool.submit(run_target, gh, cbai, t): t for t in targets}
+            ok = []
+            for future, target in futures.items():
+                try:
+                    ok.append(future.result())
+                except Exception as e:  # one org's failure doesn't cost the others
+                    print(f"\nERROR: {target.org} failed: {e}", file=sys.stderr)
+                    ok.append(False)
+
+    gh.cache.report(log)
+    if cbai is not None:
+        print(f"  {cbai.stats()}")
+        cbai.close()
+
+    if not all(ok):
+        failed = [t.org for t, good in zip(targets, ok) if not good]
+        print(f"\nFailed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
     print("\nDone!")
 
 
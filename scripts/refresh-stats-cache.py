@@ -6,27 +6,54 @@ Claude Code's stats-cache only updates when `claude stats` is run interactively.
 This script reads all JSONL session files and builds the cache independently,
 keeping the same format Claude Code expects (version 2).
 
+The read is shared: the same single pass (claude_sessions.scan) also folds
+ai-pilot-pipeline's session index + tool/tech sample, written to
+~/.claude/session-scan.json so the next step of the 4h chain skips its own scan.
+
+Incremental by default: ~/.claude/stats-cache-state.json keeps a per-file
+size + byte-offset + inode watermark (as claude-activity-export.py does) and the
+per-file partial aggregates, so a run only reads lines appended since the last
+one. --full ignores the saved state and re-reads everything.
+
+--from-duckdb skips the JSONL entirely and derives an *approximate* cache with
+grouped SQL over data/claude-activity.duckdb (kept current by
+claude-activity-export.py): the export lacks some of what the JSONL path
+counts, so the file carries an "approximate" list of the known gaps and the
+run prints a warning. It writes no session-scan snapshot.
+
 Usage:
-  python3 scripts/refresh-stats-cache.py [--verbose] [--dry-run]
+  python3 scripts/refresh-stats-cache.py [--verbose] [--dry-run] [--full]
+  python3 scripts/refresh-stats-cache.py --from-duckdb [--dry-run]
 """
 
 import json
-import os
 import sys
-from collections import Counter, defaultdict
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import datetime
 from pathlib import Path
 
-CLAUDE_DIR = Path.home() / ".claude"
-CLAUDE_DC1_DIR = Path.home() / ".claude-dc1"
-PROJECTS_DIRS = [CLAUDE_DIR / "projects"]
-if (CLAUDE_DC1_DIR / "projects").exists():
-    PROJECTS_DIRS.append(CLAUDE_DC1_DIR / "projects")
+from claude_sessions import (
+    CLAUDE_DIR, SCAN_SNAPSHOT, SOURCES, SessionIndexAggregator, StatsCacheAggregator,
+    ToolSampleAggregator, discover_session_files, sample_files, scan, write_snapshot,
+)
+
 STATS_CACHE = CLAUDE_DIR / "stats-cache.json"
+STATE_FILE = CLAUDE_DIR / "stats-cache-state.json"
+STATE_VERSION = 2  # 2: watermarks carry the inode
 CACHE_VERSION = 2
+ACTIVITY_DB = Path(__file__).resolve().parent.parent / "data" / "claude-activity.duckdb"
+
+# Where --from-duckdb differs from the JSONL path; written into the cache as "approximate"
+DUCKDB_GAPS = [
+    "subagent sessions are not counted (the export skips subagent files)",
+    "totalSpeculationTimeSavedMs is 0 (the export has no speculation-accept events)",
+    "a message repeated across resumed sessions is counted once (turns keyed by uuid)",
+]
 
 VERBOSE = "--verbose" in sys.argv or "-v" in sys.argv
 DRY_RUN = "--dry-run" in sys.argv
+FULL = "--full" in sys.argv
+FROM_DUCKDB = "--from-duckdb" in sys.argv
 
 
 def log(msg):
@@ -36,200 +63,231 @@ def log(msg):
 
 def collect_jsonl_files():
     """Find all JSONL session files across all project directories (DC-0 + DC-1)."""
-    files = []
-    seen_stems = set()
-    total_projects = 0
-
-    for projects_dir in PROJECTS_DIRS:
-        if not projects_dir.exists():
-            continue
-        for proj_dir in projects_dir.iterdir():
-            if not proj_dir.is_dir():
-                continue
-            total_projects += 1
-            # Main session files
-            for f in proj_dir.glob("*.jsonl"):
-                if f.stem not in seen_stems:
-                    seen_stems.add(f.stem)
-                    files.append(f)
-            # Subagent files
-            for session_dir in proj_dir.iterdir():
-                if session_dir.is_dir():
-                    subagents_dir = session_dir / "subagents"
-                    if subagents_dir.exists():
-                        for f in subagents_dir.glob("agent-*.jsonl"):
-                            if f.stem not in seen_stems:
-                                seen_stems.add(f.stem)
-                                files.append(f)
-
-    log(f"Found {len(files)} JSONL files across {total_projects} projects ({len(PROJECTS_DIRS)} sources)")
+    files = discover_session_files(subagents=True)
+    n_sub = sum(1 for sf in files if sf.subagent)
+    log(f"Found {len(files)} JSONL files ({n_sub} subagent) across {len(SOURCES)} sources")
     return files
 
 
-def parse_session_file(filepath):
-    """Parse a single JSONL session file, return messages (excluding sidechains)."""
-    messages = []
-    speculation_time = 0
+def empty_state():
+    return {"version": STATE_VERSION, "files": {}, "stats": {}, "index": {}, "sample": {}}
+
+
+def load_state():
+    """Watermarks + per-file partial aggregates from the previous run (empty on --full / mismatch)."""
+    if FULL:
+        log("--full: ignoring saved state")
+        return empty_state()
     try:
-        with open(filepath, errors="replace") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-
-                if entry.get("type") in ("user", "assistant"):
-                    messages.append(entry)
-                elif entry.get("type") == "speculation-accept":
-                    speculation_time += entry.get("timeSavedMs", 0)
-    except Exception as e:
-        log(f"Failed to read {filepath}: {e}")
-
-    # Filter out sidechain messages
-    main_messages = [m for m in messages if not m.get("isSidechain", False)]
-    return main_messages, speculation_time
-
-
-def build_stats_cache(jsonl_files):
-    """Process all JSONL files and build the stats cache."""
-    daily_activity = defaultdict(lambda: {"messageCount": 0, "sessionCount": 0, "toolCallCount": 0})
-    daily_model_tokens = defaultdict(lambda: defaultdict(int))
-    model_usage = defaultdict(lambda: {
-        "inputTokens": 0, "outputTokens": 0,
-        "cacheReadInputTokens": 0, "cacheCreationInputTokens": 0,
-        "webSearchRequests": 0, "costUSD": 0,
-        "contextWindow": 0, "maxOutputTokens": 0,
-    })
-    hour_counts = Counter()
-    total_sessions = 0
-    total_messages = 0
-    total_speculation_ms = 0
-    longest_session = None
-    first_session_date = None
-    session_stats = []
-
-    for filepath in jsonl_files:
-        messages, spec_time = parse_session_file(filepath)
-        total_speculation_ms += spec_time
-
-        if not messages:
+        state = json.loads(STATE_FILE.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return empty_state()
+    if state.get("version") != STATE_VERSION:
+        log(f"State version {state.get('version')} != {STATE_VERSION}; full rebuild")
+        return empty_state()
+    return state
+
+
+def save_state(state):
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, separators=(",", ":")))
+    tmp.replace(STATE_FILE)
+
+
+def build_stats_cache(jsonl_files, state=None):
+    """Scan new JSONL bytes once, building the stats cache plus ai-pilot's session aggregates.
+
+    Session files are append-only, so each file is read from its saved byte
+    offset and its new lines folded into the per-file partials carried in
+    `state`. A file that shrank (truncated) or has a new inode (replaced by a
+    rewrite, even one that grew) is dropped and re-read from byte 0. Totals are re-folded from the partials, which is
+    O(sessions), not O(lines).
+
+    Returns (stats_cache, shared, state) where shared holds the SessionIndex /
+    ToolSample results that ai-pilot-pipeline.py would otherwise re-scan for.
+    """
+    state = state or empty_state()
+    watermarks = state["files"]
+    stats = StatsCacheAggregator(state["stats"])
+    index = SessionIndexAggregator(state["index"])
+    sampled = sample_files(jsonl_files)
+    sample = ToolSampleAggregator(sampled, partials=state["sample"])
+    aggregators = [stats, index, sample]
+
+    offsets, sizes, inodes, changed = {}, {}, {}, []
+    n_reset = 0
+    for sf in jsonl_files:
+        key = str(sf.path)
+        size = sf.size
+        prev_size, offset, prev_ino = watermarks.get(key, (None, 0, None))
+        replaced = prev_size is not None and sf.ino != prev_ino
+        # Newly sampled for tools/tech (an older session dropped out, or the
+        # cap shifted) with history we never fed it: read it, even unchanged.
+        newly_sampled = prev_size is not None and sample.wants(sf) and key not in sample.partials
+        if prev_size is not None and size == prev_size and not (replaced or newly_sampled):
             continue
+        if size < offset or replaced or newly_sampled:
+            for agg in aggregators:
+                agg.partials.pop(key, None)
+            offset = 0
+            n_reset += 1
+        offsets[key] = offset
+        sizes[key] = size
+        inodes[key] = sf.ino
+        changed.append(sf)
+
+    n_read = scan(changed, aggregators, log=log, offsets=offsets)
+    log(f"Scanned {n_read} changed files in one pass ({n_reset} from byte 0, "
+        f"{len(jsonl_files) - len(changed)} unchanged)")
+
+    paths = [str(sf.path) for sf in jsonl_files]
+    for key, size in sizes.items():
+        watermarks[key] = [size, offsets[key], inodes[key]]
+    stats.restrict(paths)
+    index.restrict(paths)
+    sample.restrict(str(sf.path) for sf in sampled)
+    state = {
+        "version": STATE_VERSION,
+        "files": {k: watermarks[k] for k in paths if k in watermarks},
+        "stats": stats.partials,
+        "index": index.partials,
+        "sample": sample.partials,
+    }
+    shared = {"sessionIndex": index.result(), "toolSample": sample.result()}
+    return stats.result(), shared, state
+
+
+# Per-session rollup of main-thread turns; everything below groups over it.
+# A session's day/hour is that of its first message, as in the JSONL path.
+_DUCKDB_SESSIONS = """
+    CREATE TEMP TABLE s AS
+    SELECT session_id,
+           min(ts) AS first_ts,
+           max(ts) AS last_ts,
+           count(*) AS n_msgs,
+           coalesce(sum(n_tool_uses) FILTER (WHERE role = 'assistant'), 0) AS n_tools
+    FROM turns
+    WHERE NOT is_sidechain AND ts IS NOT NULL
+    GROUP BY session_id
+"""
+
 
-        total_sessions += 1
-        total_messages += len(messages)
-
-        # Session timing
-        first_msg = messages[0]
-        last_msg = messages[-1]
-        first_ts = first_msg.get("timestamp", "")
-        last_ts = last_msg.get("timestamp", "")
-
-        try:
-            first_dt = datetime.fromisoformat(first_ts.replace("Z", "+00:00"))
-            last_dt = datetime.fromisoformat(last_ts.replace("Z", "+00:00"))
-            duration_ms = int((last_dt - first_dt).total_seconds() * 1000)
-        except (ValueError, TypeError):
-            first_dt = None
-            last_dt = None
-            duration_ms = 0
-
-        if first_dt:
-            date_str = first_dt.strftime("%Y-%m-%d")
-            hour = first_dt.hour
-            hour_counts[hour] += 1
-
-            # Track daily activity
-            daily_activity[date_str]["messageCount"] += len(messages)
-            daily_activity[date_str]["sessionCount"] += 1
-
-            # Track first session date
-            if first_session_date is None or first_ts < first_session_date:
-                first_session_date = first_ts
-
-            # Track longest session
-            session_id = filepath.stem
-            if longest_session is None or duration_ms > longest_session.get("duration", 0):
-                longest_session = {
-                    "sessionId": session_id,
-                    "duration": duration_ms,
-                    "messageCount": len(messages),
-                    "timestamp": first_ts,
-                }
-
-            # Process assistant messages for model/token data and tool calls
-            for msg in messages:
-                if msg.get("type") != "assistant":
-                    continue
-
-                content = msg.get("message", {}).get("content", [])
-                if isinstance(content, list):
-                    for block in content:
-                        if isinstance(block, dict) and block.get("type") == "tool_use":
-                            daily_activity[date_str]["toolCallCount"] += 1
-
-                usage = msg.get("message", {}).get("usage", {})
-                model = msg.get("message", {}).get("model", "")
-                if not model or not usage:
-                    continue
-
-                input_tok = usage.get("input_tokens", 0)
-                output_tok = usage.get("output_tokens", 0)
-                cache_read = usage.get("cache_read_input_tokens", 0)
-                cache_create = usage.get("cache_creation_input_tokens", 0)
-
-                model_usage[model]["inputTokens"] += input_tok
-                model_usage[model]["outputTokens"] += output_tok
-                model_usage[model]["cacheReadInputTokens"] += cache_read
-                model_usage[model]["cacheCreationInputTokens"] += cache_create
-
-                total_tok = input_tok + output_tok
-                if total_tok > 0:
-                    daily_model_tokens[date_str][model] += total_tok
-
-    # Build final structure matching Claude Code's cache format (version 2)
-    sorted_daily = sorted(
-        [{"date": d, **v} for d, v in daily_activity.items()],
-        key=lambda x: x["date"],
-    )
-    sorted_model_tokens = sorted(
-        [{"date": d, "tokensByModel": dict(v)} for d, v in daily_model_tokens.items()],
-        key=lambda x: x["date"],
-    )
-    today = datetime.now().strftime("%Y-%m-%d")
+def build_stats_cache_from_duckdb(db_path):
+    """Build an approximate v2 stats-cache with grouped SQL over the claude-activity DuckDB.
+
+    claude-activity-export.py keeps `turns` current incrementally, so this is a
+    handful of aggregate queries instead of a corpus read. It is not a drop-in
+    for the JSONL path: the gaps are listed in DUCKDB_GAPS and recorded in the
+    result's "approximate" field.
+    """
+    import duckdb  # pyenv tinymachines env only; the JSONL path stays stdlib
+
+    con = duckdb.connect(str(db_path), read_only=True)
+    con.execute(_DUCKDB_SESSIONS)
+
+    daily = con.execute("""
+        SELECT strftime(first_ts, '%Y-%m-%d') AS d,
+               sum(n_msgs)::BIGINT, count(*), sum(n_tools)::BIGINT
+        FROM s GROUP BY d ORDER BY d
+    """).fetchall()
+
+    main_asst = """
+        FROM turns t JOIN s USING (session_id)
+        WHERE t.role = 'assistant' AND NOT t.is_sidechain
+          AND t.model IS NOT NULL AND t.model <> ''
+    """
+    daily_tokens = defaultdict(dict)
+    for d, model, tok in con.execute(f"""
+        SELECT strftime(s.first_ts, '%Y-%m-%d') AS d, t.model,
+               sum(t.input_tokens + t.output_tokens)::BIGINT AS tok
+        {main_asst}
+        GROUP BY d, t.model HAVING tok > 0 ORDER BY d
+    """).fetchall():
+        daily_tokens[d][model] = tok
+
+    model_usage = {}
+    for model, inp, out, cr, cc in con.execute(f"""
+        SELECT t.model, sum(t.input_tokens)::BIGINT, sum(t.output_tokens)::BIGINT,
+               sum(t.cache_read_tokens)::BIGINT, sum(t.cache_creation_tokens)::BIGINT
+        {main_asst}
+        GROUP BY t.model
+    """).fetchall():
+        model_usage[model] = {
+            "inputTokens": inp, "outputTokens": out,
+            "cacheReadInputTokens": cr, "cacheCreationInputTokens": cc,
+            "webSearchRequests": 0, "costUSD": 0,
+            "contextWindow": 0, "maxOutputTokens": 0,
+        }
+
+    hour_counts = dict(con.execute(
+        "SELECT hour(first_ts), count(*) FROM s GROUP BY 1 ORDER BY 1"
+    ).fetchall())
+
+    iso = "strftime({}, '%Y-%m-%dT%H:%M:%S.%gZ')"
+    longest = con.execute(f"""
+        SELECT session_id, epoch_ms(last_ts) - epoch_ms(first_ts) AS duration, n_msgs, {iso.format('first_ts')}
+        FROM s ORDER BY duration DESC, first_ts LIMIT 1
+    """).fetchone()
+    n_sessions, n_messages, first_session = con.execute(
+        f"SELECT count(*), coalesce(sum(n_msgs), 0)::BIGINT, {iso.format('min(first_ts)')} FROM s"
+    ).fetchone()
+    con.close()
 
     return {
         "version": CACHE_VERSION,
-        "lastComputedDate": today,
-        "dailyActivity": sorted_daily,
-        "dailyModelTokens": sorted_model_tokens,
-        "modelUsage": {k: dict(v) for k, v in model_usage.items()},
-        "totalSessions": total_sessions,
-        "totalMessages": total_messages,
-        "longestSession": longest_session,
-        "firstSessionDate": first_session_date,
-        "hourCounts": dict(hour_counts),
-        "totalSpeculationTimeSavedMs": total_speculation_ms,
+        "lastComputedDate": datetime.now().strftime("%Y-%m-%d"),
+        "dailyActivity": [
+            {"date": d, "messageCount": m, "sessionCount": n, "toolCallCount": t}
+            for d, m, n, t in daily
+        ],
+        "dailyModelTokens": [
+            {"date": d, "tokensByModel": v} for d, v in sorted(daily_tokens.items())
+        ],
+        "modelUsage": model_usage,
+        "totalSessions": n_sessions,
+        "totalMessages": n_messages,
+        "longestSession": {
+            "sessionId": longest[0],
+            "duration": longest[1],
+            "messageCount": longest[2],
+            "timestamp": longest[3],
+        } if longest else None,
+        "firstSessionDate": first_session,
+        "hourCounts": hour_counts,
+        "totalSpeculationTimeSavedMs": 0,
+        "approximate": DUCKDB_GAPS,
     }
 
 
 def main():
-    print("Refreshing stats-cache.json from JSONL files...", file=sys.stderr)
+    if FROM_DUCKDB:
+        print(f"Refreshing stats-cache.json from {ACTIVITY_DB}...", file=sys.stderr)
+        if not ACTIVITY_DB.exists():
+            print(f"{ACTIVITY_DB} not found — run claude-activity-export.py first", file=sys.stderr)
+            sys.exit(1)
+        cache, shared, state = build_stats_cache_from_duckdb(ACTIVITY_DB), None, None
+        print("WARNING: --from-duckdb output is approximate:", file=sys.stderr)
+        for gap in DUCKDB_GAPS:
+            print(f"  - {gap}", file=sys.stderr)
+    else:
+        print("Refreshing stats-cache.json from JSONL files...", file=sys.stderr)
 
-    jsonl_files = collect_jsonl_files()
-    if not jsonl_files:
-        print("No JSONL files found", file=sys.stderr)
-        return
+        jsonl_files = collect_jsonl_files()
+        if not jsonl_files:
+            print("No JSONL files found", file=sys.stderr)
+            return
 
-    cache = build_stats_cache(jsonl_files)
+        cache, shared, state = build_stats_cache(jsonl_files, load_state())
 
     if DRY_RUN:
         print(json.dumps(cache, indent=2))
     else:
         STATS_CACHE.write_text(json.dumps(cache, indent=2))
         print(f"Wrote {STATS_CACHE}", file=sys.stderr)
+        if shared is not None:
+            write_snapshot(shared)
+            print(f"Wrote {SCAN_SNAPSHOT}", file=sys.stderr)
+            save_state(state)
 
     print(f"  Sessions: {cache['totalSessions']}", file=sys.stderr)
     print(f"  Messages: {cache['totalMessages']}", file=sys.stderr)
@@ -20,9 +20,26 @@ PRIVACY POSTURE (deliberate, see the page copy):
   - Scanners and edge-dropped hosts are emitted at full IP. They are
     unsolicited automated traffic, not visitors.
 
+INCREMENTAL: per-UTC-day aggregates and the live logs' inode/offset persist
+in VISITORS_STATE (visitors-state.json beside the snapshot), so a run reads
+only the bytes nginx appended since the last one and rolls the window by
+dropping whole expired days. A rotation since the last run — renamed away
+(new inode) or copytruncated (shrank, or a different first line) — is bridged
+by finishing the old file from the rotated copy; anything that can't be
+bridged, a config change or `--full` rebuilds from the rotations. Rebuilds
+don't decompress those again: each rotated file's parsed contribution is
+cached once (VISITORS_ROTATION_CACHE) and merged per day with the live file.
+With VISITORS_JOBS > 1 the
+rotations a rebuild has to parse go to that many worker processes, each
+turning one file into a summary the parent merges in order.
+Neither file holds a human IP: session and unique-IP keys are BLAKE2 digests
+keyed by a random salt kept beside the cache, and all of it is 0600.
+
 Writes /var/lib/bradley-cam/visitors.json atomically for /api/visitors.
 """
+import bisect
 import gzip
+import hashlib
 import json
 import os
 import re
@@ -30,14 +47,19 @@ import socket
 import subprocess
 import sys
 import time
-from collections import defaultdict
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 
 LOG_DIR = os.environ.get("VISITORS_LOG_DIR", "/var/log/nginx")
 ACCESS_STEM = os.environ.get("VISITORS_ACCESS_STEM", "bradley.io.access.log")
 SCANNER_STEM = os.environ.get("VISITORS_SCANNER_STEM", "scanner.log")
 OUT_DIR = os.environ.get("CAM_CACHE_DIR", "/var/lib/bradley-cam")
 OUT = os.path.join(OUT_DIR, "visitors.json")
+STATE = os.environ.get("VISITORS_STATE", os.path.join(OUT_DIR, "visitors-state.json"))
+STATE_VERSION = 2              # bump when row classification changes: forces a rebuild
+HEAD_BYTES = 512               # first-line prefix that fingerprints a log file
+ROTATION_CACHE = os.environ.get("VISITORS_ROTATION_CACHE", os.path.join(OUT_DIR, "visitors-rotations"))
+JOBS = max(1, int(os.environ.get("VISITORS_JOBS", "1")))  # worker processes for a rebuild
 GEO_DIR = os.environ.get("GEOIP_DIR", "/var/lib/GeoIP")
 EDGE_HOST = os.environ.get("VISITORS_EDGE_HOST", "root@spydr.local")
 # A dedicated key whose authorized_keys entry is pinned to
@@ -51,6 +73,7 @@ EDGE_KEY = os.environ.get(
 
 WINDOW_DAYS = int(os.environ.get("VISITORS_WINDOW_DAYS", "30"))
 SESSION_GAP = 30 * 60          # seconds of silence that ends a session
+REORDER_SLACK = 120            # seconds a line may trail its key's newest and still sessionise in order
 TOP_N = 40
 
 # Hosts that are us, not visitors. Kept out of the public counts so the
@@ -76,17 +99,17 @@ BOT_ASNS = {15169}
 # Non-browser assets we don't want inflating "pageviews".
 ASSET_RE = re.compile(r"\.(?:webp|png|jpe?g|svg|ico|css|js|woff2?|map|txt|xml|json)(?:$|\?)", re.I)
 
-LINE_RE = re.compile(
-    r'^(?P<ip>\S+) \S+ \S+ \[(?P<ts>[^\]]+)\] "(?P<req>[^"]*)" '
-    r'(?P<status>\d{3}) (?P<bytes>\S+) "(?P<ref>[^"]*)" "(?P<ua>[^"]*)"'
-)
+MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+TS_MEMO_MAX = 100_000          # distinct log seconds memoised before the memo resets
 
 
 # ----------------------------------------------------------------- geo ----
 class Geo:
     """GeoLite2 lookups with a per-IP memo. Degrades to empty if unavailable."""
 
-    def __init__(self):
+    def __init__(self, quiet=False):
         self.city = self.asn = None
         self.memo = {}
         try:
@@ -95,7 +118,8 @@ class Geo:
             self.city = maxminddb.open_database(os.path.join(GEO_DIR, "GeoLite2-City.mmdb"))
             self.asn = maxminddb.open_database(os.path.join(GEO_DIR, "GeoLite2-ASN.mmdb"))
         except Exception as e:  # noqa: BLE001 — geo is optional, never fatal
-            print(f"geo: unavailable ({e})", file=sys.stderr)
+            if not quiet:
+                print(f"geo: unavailable ({e})", file=sys.stderr)
 
     def get(self, ip):
         if ip in self.memo:
@@ -153,53 +177,641 @@ def log_files(stem, days):
     return out
 
 
-def read_lines(path):
-    op = gzip.open if path.endswith(".gz") else open
-    try:
-        with op(path, "rt", errors="replace") as fh:
-            for line in fh:
-                yield line
-    except OSError as e:
-        print(f"skip {path}: {e}", file=sys.stderr)
+class Row:
+    """One parsed log line, as on_access / on_scanner see it: the raw fields
+    plus epoch seconds, UTC day index (days since 1970-01-01) and UTC hour."""
+
+    __slots__ = ("ip", "req", "status", "ref", "ua", "ts", "day", "hour")
+
+    def __init__(self, ip, req, status, ref, ua, ts, day, hour):
+        self.ip, self.req, self.status, self.ref, self.ua = ip, req, status, ref, ua
+        self.ts, self.day, self.hour = ts, day, hour
+
+
+_ts_memo = {}
 
 
 def parse_ts(s):
-    # 12/Aug/2026:18:03:49 -0400
+    """12/Aug/2026:18:03:49 -0400 → (epoch, utc_day, utc_hour), or None.
+
+    nginx's fixed layout is sliced at fixed offsets with a month table —
+    strptime was most of the profile. Anything else (out-of-range fields, a
+    lowercase month, `Z`) goes to strptime, so the same strings are accepted.
+    Lines arrive in bursts within the same second, so results are memoised
+    per timestamp string."""
+    hit = _ts_memo.get(s)
+    if hit is not None:
+        return hit
+    epoch = None
+    if (len(s) == 26 and s[2] == "/" and s[6] == "/" and s[11] == ":" and s[14] == ":"
+            and s[17] == ":" and s[20] == " " and s[21] in "+-" and s[3:6] in MONTHS):
+        digits = s[0:2] + s[7:11] + s[12:14] + s[15:17] + s[18:20] + s[22:26]
+        if digits.isascii() and digits.isdigit():
+            hh, mm, ss, oh, om = int(s[12:14]), int(s[15:17]), int(s[18:20]), int(s[22:24]), int(s[24:26])
+            if hh < 24 and mm < 60 and ss < 60 and oh < 24 and om < 60:
+                try:
+                    days = date(int(s[7:11]), MONTHS[s[3:6]], int(s[0:2])).toordinal() - EPOCH_ORDINAL
+                except ValueError:
+                    return None
+                off = (oh * 60 + om) * 60
+                epoch = days * 86400 + hh * 3600 + mm * 60 + ss + (off if s[21] == "-" else -off)
+    if epoch is None:
+        try:
+            epoch = int(datetime.strptime(s, "%d/%b/%Y:%H:%M:%S %z").timestamp())
+        except ValueError:
+            return None
+    if len(_ts_memo) >= TS_MEMO_MAX:
+        _ts_memo.clear()
+    hit = _ts_memo[s] = (epoch, epoch // 86400, epoch % 86400 // 3600)
+    return hit
+
+
+def parse_row(line):
+    """Row for a combined-format line, or None.
+
+    `ip ident user [ts] "req" status bytes "ref" "ua"...` — nginx escapes any
+    quote inside a field, so one split on '"' yields the fields. Accepts and
+    rejects what the old LINE_RE + strptime did, given that escaping (a raw
+    quote in ip/ident/user could shift the split); scripts/bench-visitors-parse.py
+    checks that on good and malformed lines and times both."""
+    parts = line.split('"', 6)
+    if len(parts) != 7 or parts[4] != " ":
+        return None
+    head = parts[0].split(" ", 3)
+    mid = parts[2]
+    if (len(head) != 4 or head[3][:1] != "[" or head[3][-2:] != "] " or "]" in head[3][1:-2]
+            or not all(f and f.split() == [f] for f in head[:3])
+            or len(mid) < 7 or mid[0] != " " or mid[4] != " " or mid[-1] != " "
+            or not mid[1:4].isdecimal() or mid[5:-1].split() != [mid[5:-1]]):
+        return None
+    ts = parse_ts(head[3][1:-2])
+    if ts is None:
+        return None
+    return Row(head[0], parts[1], mid[1:4], parts[3], parts[5], *ts)
+
+
+_day_keys = {}
+
+
+def day_key(day):
+    """UTC day index → "YYYY-MM-DD", the tally key."""
+    key = _day_keys.get(day)
+    if key is None:
+        key = _day_keys[day] = date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+    return key
+
+
+def head_sig(path):
+    """Digest of a log's first line. Survives a rename and gzip; changes when
+    copytruncate empties the file and nginx starts it over."""
+    op = gzip.open if path.endswith(".gz") else open
     try:
-        return datetime.strptime(s, "%d/%b/%Y:%H:%M:%S %z")
-    except ValueError:
+        with op(path, "rb") as fh:
+            return hashlib.sha1(fh.readline(HEAD_BYTES)).hexdigest()
+    except OSError:
         return None
 
 
-def scan(stem, cutoff, on_row):
+def tail(path, offset, on_line):
+    """Feed the complete lines after byte `offset` of a live log to on_line and
+    return its new position {inode, offset, head, at}. A trailing partial line
+    (nginx mid-write) is left for the next run; `at` is when the read began."""
+    at = time.time()
+    try:
+        fh = open(path, "rb")
+    except OSError:
+        return {"inode": None, "offset": 0, "head": None, "at": at}
+    with fh:
+        inode = os.fstat(fh.fileno()).st_ino
+        head = hashlib.sha1(fh.readline(HEAD_BYTES)).hexdigest()
+        fh.seek(offset)
+        pos = offset
+        for raw in fh:
+            if not raw.endswith(b"\n"):
+                break
+            pos += len(raw)
+            on_line(raw.decode("utf-8", "replace"))
+    return {"inode": inode, "offset": pos, "head": head, "at": at}
+
+
+def scan(stem, kind, cutoff, col, rotations, pending=None):
     """Walk a log family newest-first, stopping once a whole file predates the
-    window. Returns (rows_seen, files_touched)."""
+    window. The live file is parsed straight into col; each rotation comes
+    from the RotationCache (or its `pending` worker future, keyed by path)
+    and is merged in day by day. Returns (rows_seen,
+    files_touched, live_pos) — live_pos is where the live file was read up
+    to, for follow() to resume from."""
     rows = files = 0
+    live = os.path.join(LOG_DIR, stem)
+    live_pos = {"inode": None, "offset": 0, "head": None, "at": time.time()}
+    cutoff_day = cutoff.strftime("%Y-%m-%d")
+    cutoff_ts = cutoff.timestamp()
+    on_row = col.on_access if kind == "access" else col.on_scanner
     for path in log_files(stem, WINDOW_DAYS):
         if not os.path.exists(path):
             continue
         newest_in_file = None
         used = 0
-        for line in read_lines(path):
-            m = LINE_RE.match(line)
-            if not m:
-                continue
-            ts = parse_ts(m.group("ts"))
-            if ts is None:
-                continue
-            if newest_in_file is None or ts > newest_in_file:
-                newest_in_file = ts
-            if ts < cutoff:
+        if path == live:
+            def on_line(line):
+                nonlocal newest_in_file, used
+                row = parse_row(line)
+                if row is None:
+                    return
+                if newest_in_file is None or row.ts > newest_in_file:
+                    newest_in_file = row.ts
+                if row.ts < cutoff_ts:
+                    return
+                on_row(row)
+                used += 1
+
+            live_pos = tail(path, 0, on_line)
+        else:
+            summary = rotations.summary(path, kind, col.geo, (pending or {}).get(path))
+            if summary is None:
                 continue
-            on_row(m, ts)
-            used += 1
+            newest_in_file = summary["newest"]
+            for d, t in summary["days"].items():
+                if d >= cutoff_day:
+                    merge_day(col.days.setdefault(d, new_day()), t)
+                    used += day_rows(t, kind)
         rows += used
         files += 1
         # Rotations are ordered; once a file's newest entry is behind the
         # window there is nothing older worth opening.
-        if newest_in_file is not None and newest_in_file < cutoff:
+        if newest_in_file is not None and newest_in_file < cutoff_ts:
             break
-    return rows, files
+    return rows, files, live_pos
+
+
+def find_rotated(stem, pos):
+    """The first rotation, if it is the file last read at `pos`. Matched on
+    the first line rather than the inode: that survives a rename, a
+    copytruncate's copy and compression alike."""
+    for cand in (f"{stem}.1", f"{stem}.1.gz"):
+        path = os.path.join(LOG_DIR, cand)
+        if os.path.exists(path) and head_sig(path) == pos["head"]:
+            return path
+    return None
+
+
+def find_rotated_empty(stem, pos):
+    """find_rotated() for a file that held no complete line when last read,
+    so there is no first line to match. Returns the first rotation if it is
+    that file (same inode) or was written since (a rename or copytruncate
+    after the run), "" if nothing was rotated since, and None if that can't
+    be told or more than one rotation happened."""
+    at = pos.get("at")
+
+    def written_since(cand):  # gzip keeps the original's mtime
+        try:
+            return at is not None and os.stat(os.path.join(LOG_DIR, cand)).st_mtime > at
+        except OSError:
+            return False
+
+    if written_since(f"{stem}.2") or written_since(f"{stem}.2.gz"):
+        return None
+    for cand in (f"{stem}.1", f"{stem}.1.gz"):
+        path = os.path.join(LOG_DIR, cand)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_ino == pos["inode"] and not path.endswith(".gz"):
+            return path
+        if at is None:
+            return None
+        if written_since(cand):
+            return path
+    return "" if at is not None else None
+
+
+def follow(stem, pos, cutoff, on_row):
+    """Read only what a log family gained since `pos`. Returns (rows, files,
+    new_pos), or None when the gap can't be bridged (more than one rotation
+    since the last run) and the window has to be rebuilt."""
+    live = os.path.join(LOG_DIR, stem)
+    cutoff_ts = cutoff.timestamp()
+    rows = files = 0
+
+    def on_line(line):
+        nonlocal rows
+        row = parse_row(line)
+        if row is not None and row.ts >= cutoff_ts:
+            on_row(row)
+            rows += 1
+
+    try:
+        st = os.stat(live)
+    except OSError:
+        st = None
+    same = (
+        st is not None and st.st_ino == pos["inode"] and st.st_size >= pos["offset"]
+        and (pos["offset"] == 0 or head_sig(live) == pos["head"])
+    )
+    old = ""
+    if pos["offset"] == 0:
+        # Empty at the last run, so `same` can't see a copytruncate and there
+        # is no head to match: find_rotated_empty() goes by inode and mtime.
+        old = find_rotated_empty(stem, pos)
+        if old is None and (not same or "at" in pos):
+            return None
+        old = old or ""
+    elif not same:
+        # Rotated since the last run — renamed away (new inode), or copied and
+        # truncated in place (the file shrank, or regrew with a new first
+        # line). Whatever nginx wrote past our offset is in the rotated copy.
+        old = find_rotated(stem, pos)
+        if old is None:
+            return None
+    if old:
+        op = gzip.open if old.endswith(".gz") else open
+        try:
+            with op(old, "rb") as fh:
+                fh.seek(pos["offset"])
+                for raw in fh:
+                    on_line(raw.decode("utf-8", "replace"))
+        except OSError as e:
+            print(f"skip {old}: {e}", file=sys.stderr)
+            return None
+        files += 1
+    new_pos = tail(live, pos["offset"] if same else 0, on_line)
+    return rows, files + (st is not None), new_pos
+
+
+# ------------------------------------------------------------------ tally ---
+def new_day():
+    """Aggregates for one UTC day. Every field is a count, a max or a keyed
+    merge, so days combine (and expire) without touching the logs again."""
+    return {
+        "humans": 0, "bots": 0, "self": 0, "pageviews": 0, "prefetches": 0,
+        "hour": [0] * 24, "statuses": {}, "paths": {}, "refs": {},
+        "places": {}, "countries": {}, "asns": {},
+        "ips": {},                        # human-IP digest -> 1, for uniqueIpsSeen
+        "sessions": {},                   # (ip, ua) digest -> {"net", "first", "last", "n"}
+        "scanRows": 0, "scanHits": 0, "scanIps": {}, "scanPaths": {},
+    }
+
+
+def bump(d, key, n=1):
+    d[key] = d.get(key, 0) + n
+
+
+def _session_commit(s, ts):
+    if not s["n"]:
+        s["first"] = s["last"] = ts
+        s["n"] = 1
+    elif ts > s["last"]:
+        if ts - s["last"] > SESSION_GAP:
+            s["n"] += 1
+        s["last"] = ts
+    elif ts < s["first"]:
+        if s["first"] - ts > SESSION_GAP:
+            s["n"] += 1
+        s["first"] = ts
+    # else inside the span: part of a visit already counted (see session_add)
+
+
+def session_add(s, ts):
+    """Sessionise online: fold one stamp into a key's {"first", "last", "n"}
+    (n = visits between first and last).
+
+    Lines arrive nearly in time order (nginx logs a request when it ends,
+    stamped when it began), so the stamps within REORDER_SLACK of the key's
+    newest wait, sorted, in s["q"] and are committed in order once the newest
+    moves past them — exact for any line at most that late. A line later
+    than that is committed at once: before the span it extends it, inside it
+    it is taken as part of a visit already counted. That can overcount by
+    one visit per such line, and only when it lands in a silence longer than
+    SESSION_GAP, which it would have bridged. session_flush() commits the
+    rest; Collector.flush() runs it before anything is saved or merged."""
+    q = s.get("q")
+    if q is None:
+        q = s["q"] = []
+    bisect.insort(q, ts)
+    horizon = max(q[-1], s["last"] or 0) - REORDER_SLACK
+    i = 0
+    while i < len(q) and q[i] <= horizon:
+        _session_commit(s, q[i])
+        i += 1
+    del q[:i]
+
+
+def session_flush(s):
+    for ts in s.pop("q", None) or ():
+        _session_commit(s, ts)
+
+
+def session_merge(dst, src):
+    """Fold one key's session summary into another's. Disjoint spans (days,
+    rotations) join into one visit when the gap between them is short enough;
+    spans that overlap can only do so at a file boundary, so they share one."""
+    session_flush(dst)
+    session_flush(src)
+    if src["first"] > dst["last"]:
+        joined = src["first"] - dst["last"] <= SESSION_GAP
+    elif src["last"] < dst["first"]:
+        joined = dst["first"] - src["last"] <= SESSION_GAP
+    else:
+        joined = True
+    dst["n"] += src["n"] - joined
+    dst["first"] = min(dst["first"], src["first"])
+    dst["last"] = max(dst["last"], src["last"])
+
+
+def merge_day(dst, src):
+    """Fold one day's (or one slice's) tally into another."""
+    for k in ("humans", "bots", "self", "pageviews", "prefetches", "scanRows", "scanHits"):
+        dst[k] += src[k]
+    for h, n in enumerate(src["hour"]):
+        dst["hour"][h] += n
+    for k in ("statuses", "paths", "refs", "countries", "scanPaths"):
+        for key, n in src[k].items():
+            bump(dst[k], key, n)
+    dst["ips"].update(src["ips"])
+    for net, p in src["places"].items():
+        q = dst["places"].get(net)
+        if q is None:
+            dst["places"][net] = dict(p)
+        else:
+            q["hits"] += p["hits"]
+            q["reads"] += p["reads"]
+            q["last"] = max(q["last"], p["last"])
+    for asn, v in src["asns"].items():
+        q = dst["asns"].setdefault(asn, {"hits": 0, "org": None})
+        q["hits"] += v["hits"]
+        q["org"] = q["org"] or v["org"]
+    for ip, e in src["scanIps"].items():
+        q = dst["scanIps"].setdefault(ip, {"hits": 0, "last": 0, "target": None})
+        q["hits"] += e["hits"]
+        q["last"] = max(q["last"], e["last"])
+        q["target"] = q["target"] or e["target"]
+    for key, s in src["sessions"].items():
+        q = dst["sessions"].get(key)
+        if q is None:
+            dst["sessions"][key] = dict(s)
+        else:
+            session_merge(q, s)
+
+
+def day_rows(t, kind):
+    """Log rows behind one day's tally, for the `rows` source counters."""
+    return t["humans"] + t["bots"] + t["self"] if kind == "access" else t["scanRows"]
+
+
+class Collector:
+    """on_access / on_scanner row handlers for scan() and follow(), filling
+    {"YYYY-MM-DD": new_day()} tallies."""
+
+    def __init__(self, geo, salt, days=None):
+        self.geo = geo
+        self.salt = salt
+        self.key = bytes.fromhex(salt)
+        self.days = {} if days is None else days
+
+    def day(self, row):
+        d = day_key(row.day)
+        t = self.days.get(d)
+        if t is None:
+            t = self.days[d] = new_day()
+        return t
+
+    def flush(self):
+        """Commit every session's held-back stamps (see session_add)."""
+        for t in self.days.values():
+            for s in t["sessions"].values():
+                if "q" in s:
+                    session_flush(s)
+
+    def digest(self, text):
+        # Stable within one state file, meaningless without its salt.
+        return hashlib.blake2b(text.encode(), key=self.key, digest_size=12).hexdigest()
+
+    def on_access(self, row):
+        ip, ua = row.ip, row.ua
+        t = self.day(row)
+        if is_self(ip):
+            t["self"] += 1
+            return
+        g = self.geo.get(ip)
+        bot = bool(BOT_RE.search(ua)) or ua in ("-", "") or g["asn"] in BOT_ASNS
+        req = row.req.split(" ")
+        path = req[1] if len(req) > 1 else "-"
+        if bot:
+            t["bots"] += 1
+            return
+
+        t["humans"] += 1
+        t["hour"][row.hour] += 1
+        bump(t["statuses"], row.status)
+        t["ips"][self.digest(ip)] = 1
+        key = net24(ip)                    # <- the only identifier we keep
+        sk = self.digest(f"{ip}\t{ua}")
+        s = t["sessions"].get(sk)
+        if s is None:
+            s = t["sessions"][sk] = {"net": key, "first": None, "last": None, "n": 0}
+        session_add(s, row.ts)
+        # A "read" is a real page: assets and polled API endpoints are excluded.
+        # This matters — a single tab left open on the homepage polls /api/trng
+        # twice a minute, which would otherwise make it the busiest "visitor"
+        # on the map without anyone reading anything.
+        # Next.js <Link> prefetches every in-viewport route as an RSC payload
+        # (`?_rsc=`). Sitewide that is ~42% of non-API requests: the browser
+        # fetching pages nobody looked at. Counting them as reads made anyone
+        # who merely LANDED on the homepage look like they toured the site.
+        prefetch = "_rsc=" in path
+        read = not ASSET_RE.search(path) and not path.startswith("/api/") and not prefetch
+        if prefetch:
+            t["prefetches"] += 1
+        if read:
+            t["pageviews"] += 1
+            bump(t["paths"], path.split("?")[0][:120])
+        ref = row.ref
+        if ref and ref != "-" and "bradley.io" not in ref:
+            bump(t["refs"], ref[:160])
+
+        p = t["places"].get(key)
+        if p is None:
+            p = t["places"][key] = {
+                "net": key, "city": g["city"], "region": g["region"],
+                "country": g["country"], "cc": g["cc"], "lat": g["lat"], "lon": g["lon"],
+                "asn": g["asn"], "org": g["org"],
+                "hits": 0, "reads": 0, "sessions": 0, "last": 0,
+            }
+        p["hits"] += 1
+        p["reads"] += 1 if read else 0
+        p["last"] = max(p["last"], row.ts)
+        if g["cc"]:
+            bump(t["countries"], g["cc"])
+        if g["asn"]:
+            a = t["asns"].setdefault(str(g["asn"]), {"hits": 0, "org": None})
+            a["hits"] += 1
+            a["org"] = a["org"] or g["org"]
+
+    def on_scanner(self, row):
+        ip = row.ip
+        t = self.day(row)
+        t["scanRows"] += 1
+        if is_self(ip):
+            return
+        t["scanHits"] += 1
+        e = t["scanIps"].setdefault(ip, {"hits": 0, "last": 0, "target": None})
+        e["hits"] += 1
+        e["last"] = max(e["last"], row.ts)
+        req = row.req.split(" ")
+        path = (req[1] if len(req) > 1 else "-").split("?")[0][:100]
+        e["target"] = e["target"] or path
+        bump(t["scanPaths"], path)
+
+
+# -------------------------------------------------------------- rotations ---
+def summarize_rotation(path, kind, geo, salt):
+    """A rotated file's whole contribution, unfiltered: {"newest": epoch,
+    "days": tallies}. The window is applied per day when it is merged, so
+    one summary serves every later run."""
+    part = Collector(geo, salt)
+    on_row = part.on_access if kind == "access" else part.on_scanner
+    newest = None
+    op = gzip.open if path.endswith(".gz") else open
+    with op(path, "rt", errors="replace") as fh:
+        for line in fh:
+            row = parse_row(line)
+            if row is None:
+                continue
+            on_row(row)
+            newest = max(newest or 0, row.ts)
+    part.flush()
+    return {"newest": newest, "days": part.days}
+
+
+_worker_geo = None
+
+
+def _init_worker():
+    global _worker_geo
+    _worker_geo = Geo(quiet=True)  # mmdb readers don't pickle: one per worker process
+
+
+def _summarize_in_worker(path, kind, salt):
+    return summarize_rotation(path, kind, _worker_geo, salt)
+
+
+def prefetch_rotations(families, rotations, jobs):
+    """Start parsing every uncached rotation of every family on `jobs` worker
+    processes. Returns ({path: Future}, pool); scan() consumes the futures in
+    its usual order, so merging and the early stop are unchanged. Files past
+    that stop get parsed for nothing — at most one per family in practice."""
+    misses = [
+        (path, kind)
+        for kind, stem in families
+        for path in log_files(stem, WINDOW_DAYS)[1:]
+        if os.path.exists(path) and not rotations.cached(path, kind)
+    ]
+    if jobs < 2 or len(misses) < 2:
+        return {}, None
+    pool = ProcessPoolExecutor(min(jobs, len(misses)), initializer=_init_worker)
+    salt = rotations.salt
+    return {path: pool.submit(_summarize_in_worker, path, kind, salt) for path, kind in misses}, pool
+
+
+class RotationCache:
+    """Parsed summaries of rotated log files, which never change once
+    rotated: one gzipped JSON each under VISITORS_ROTATION_CACHE. Keyed by
+    first line + size + mtime rather than path — logrotate renames every
+    .N.gz to .N+1.gz daily, and the key has to survive that."""
+
+    def __init__(self, root):
+        self.root = root
+        self.used = set()
+        self.hits = self.misses = 0
+        self._salt = None
+
+    @property
+    def salt(self):
+        """Digest salt shared by every summary (and the state built from them)."""
+        if self._salt is None:
+            path = os.path.join(self.root, "salt")
+            try:
+                with open(path) as fh:
+                    self._salt = fh.read().strip()
+            except OSError:
+                os.makedirs(self.root, exist_ok=True)
+                self._salt = os.urandom(16).hex()
+                with open_private(path) as fh:
+                    fh.write(self._salt)
+        return self._salt
+
+    def key(self, path, kind):
+        st = os.stat(path)
+        raw = f"{kind}\0{head_sig(path)}\0{st.st_size}\0{st.st_mtime_ns}\0{STATE_VERSION}\0{self.salt}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def cached(self, path, kind):
+        try:
+            return os.path.exists(os.path.join(self.root, f"{self.key(path, kind)}.json.gz"))
+        except (OSError, EOFError):
+            return False
+
+    def summary(self, path, kind, geo, future=None):
+        """Cached summary of a rotated file; on a miss, the worker's result if
+        a future is given, else parsed here. None if unreadable."""
+        key = self.key(path, kind)
+        self.used.add(key)
+        cached = os.path.join(self.root, f"{key}.json.gz")
+        try:
+            with gzip.open(cached, "rt") as fh:
+                summary = json.load(fh)
+            self.hits += 1
+            return summary
+        except (OSError, EOFError, ValueError):
+            pass
+        self.misses += 1
+        try:
+            summary = future.result() if future else summarize_rotation(path, kind, geo, self.salt)
+        except (OSError, EOFError) as e:
+            print(f"skip {path}: {e}", file=sys.stderr)
+            return None
+        tmp = cached + ".tmp"
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as raw:
+            with gzip.open(raw, "wt") as fh:
+                json.dump(summary, fh, separators=(",", ":"))
+        os.replace(tmp, cached)
+        return summary
+
+    def prune(self):
+        """Drop summaries no scan asked for: their files have left the window."""
+        for name in os.listdir(self.root):
+            if name.endswith(".json.gz") and name[:-len(".json.gz")] not in self.used:
+                os.remove(os.path.join(self.root, name))
+
+
+# ------------------------------------------------------------------ state ---
+def state_config():
+    """What the saved days depend on; any change means a rebuild."""
+    return {"version": STATE_VERSION, "logDir": LOG_DIR, "access": ACCESS_STEM,
+            "scanner": SCANNER_STEM, "windowDays": WINDOW_DAYS}
+
+
+def load_state():
+    try:
+        with open(STATE) as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("config") == state_config() else None
+
+
+def open_private(path):
+    """Text writer for a 0600 file — the state and cache hold digests and salts."""
+    return open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w")
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE) or ".", exist_ok=True)
+    tmp = STATE + ".tmp"
+    with open_private(tmp) as fh:
+        json.dump(state, fh, separators=(",", ":"))
+    os.replace(tmp, STATE)
 
 
 # ------------------------------------------------------------------ edge ---
@@ -249,118 +861,67 @@ def main():
     t0 = time.time()
     geo = Geo()
     now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(days=WINDOW_DAYS)
-
-    # --- served traffic -------------------------------------------------
-    sessions = defaultdict(list)          # (ip, ua) -> [ts...]
-    key_net = {}                          # (ip, ua) -> /24, to attribute sessions to a place
-    human_ips, bot_ips, self_hits = set(), set(), 0
-    pageviews = bot_hits = prefetches = 0
-    day = defaultdict(lambda: {"humans": 0, "bots": 0})
-    hour = [0] * 24
-    paths = defaultdict(int)
-    refs = defaultdict(int)
-    place = {}                            # net24 -> aggregate
-    countries = defaultdict(int)
-    asns = defaultdict(lambda: {"sessions": 0, "org": None})
-    statuses = defaultdict(int)
-
-    def on_access(m, ts):
-        nonlocal pageviews, bot_hits, self_hits, prefetches
-        ip, ua = m.group("ip"), m.group("ua")
-        if is_self(ip):
-            self_hits += 1
-            return
-        g = geo.get(ip)
-        bot = bool(BOT_RE.search(ua)) or ua in ("-", "") or g["asn"] in BOT_ASNS
-        req = m.group("req").split(" ")
-        path = req[1] if len(req) > 1 else "-"
-        d = ts.astimezone(timezone.utc).strftime("%Y-%m-%d")
-        if bot:
-            bot_ips.add(ip)
-            bot_hits += 1
-            day[d]["bots"] += 1
-            return
+    # Whole UTC days, so rolling the window drops days rather than splitting one.
+    cutoff = (now - timedelta(days=WINDOW_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+    cutoff_day = cutoff.strftime("%Y-%m-%d")
+    families = (("access", ACCESS_STEM), ("scanner", SCANNER_STEM))
 
-        human_ips.add(ip)
-        day[d]["humans"] += 1
-        hour[ts.astimezone(timezone.utc).hour] += 1
-        statuses[m.group("status")] += 1
-        sessions[(ip, ua)].append(ts.timestamp())
-        # A "read" is a real page: assets and polled API endpoints are excluded.
-        # This matters — a single tab left open on the homepage polls /api/trng
-        # twice a minute, which would otherwise make it the busiest "visitor"
-        # on the map without anyone reading anything.
-        # Next.js <Link> prefetches every in-viewport route as an RSC payload
-        # (`?_rsc=`). Sitewide that is ~42% of non-API requests: the browser
-        # fetching pages nobody looked at. Counting them as reads made anyone
-        # who merely LANDED on the homepage look like they toured the site.
-        prefetch = "_rsc=" in path
-        read = not ASSET_RE.search(path) and not path.startswith("/api/") and not prefetch
-        if prefetch:
-            prefetches += 1
-        if read:
-            pageviews += 1
-            paths[path.split("?")[0][:120]] += 1
-        ref = m.group("ref")
-        if ref and ref != "-" and "bradley.io" not in ref:
-            refs[ref[:160]] += 1
+    # --- read: appended bytes only, or the whole window ------------------
+    state = None if "--full" in sys.argv else load_state()
+    sources = {}
+    if state is not None:
+        mode = "incremental"
+        col = Collector(geo, state["salt"], state["days"])
+        for name, stem in families:
+            on_row = col.on_access if name == "access" else col.on_scanner
+            res = follow(stem, state["logs"][name], cutoff, on_row)
+            if res is None:
+                print(f"{stem}: rotated more than once since the last run — rebuilding", file=sys.stderr)
+                state = None
+                break
+            rows, files, state["logs"][name] = res
+            sources[name] = {"stem": stem, "read": rows, "files": files}
+    if state is None:
+        mode = "full"
+        rotations = RotationCache(ROTATION_CACHE)
+        col = Collector(geo, rotations.salt)
+        state = {"config": state_config(), "salt": col.salt, "logs": {}, "days": col.days}
+        pending, pool = prefetch_rotations(families, rotations, JOBS)
+        try:
+            for name, stem in families:
+                rows, files, state["logs"][name] = scan(stem, name, cutoff, col, rotations, pending)
+                sources[name] = {"stem": stem, "read": rows, "files": files}
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        rotations.prune()
+        sources["rotations"] = {"cached": rotations.hits, "parsed": rotations.misses}
 
-        key = net24(ip)                    # <- the only identifier we keep
-        key_net[(ip, ua)] = key
-        p = place.get(key)
-        if p is None:
-            p = place[key] = {
-                "net": key, "city": g["city"], "region": g["region"],
-                "country": g["country"], "cc": g["cc"], "lat": g["lat"], "lon": g["lon"],
-                "asn": g["asn"], "org": g["org"],
-                "hits": 0, "reads": 0, "sessions": 0, "last": 0,
-            }
-        p["hits"] += 1
-        p["reads"] += 1 if read else 0
-        p["last"] = max(p["last"], ts.timestamp())
-        if g["cc"]:
-            countries[g["cc"]] += 1
-        if g["asn"]:
-            a = asns[g["asn"]]
-            a["sessions"] += 1
-            a["org"] = a["org"] or g["org"]
+    col.flush()
+    for d in [d for d in col.days if d < cutoff_day]:
+        del col.days[d]
+    save_state(state)
 
-    access_rows, access_files = scan(ACCESS_STEM, cutoff, on_access)
+    # --- fold the window ---------------------------------------------------
+    days = col.days
+    win = new_day()
+    for d in sorted(days):
+        merge_day(win, days[d])
+    place = win["places"]
+    # rows = in the window; read = parsed by this run
+    sources["access"]["rows"] = win["humans"] + win["bots"] + win["self"]
+    sources["scanner"]["rows"] = win["scanRows"]
 
-    # Sessionise: a gap longer than SESSION_GAP starts a new visit.
+    # Visits per key were counted as the rows came in; merge_day joined the
+    # days' summaries, so a visit that spans midnight counts once.
     session_count = 0
-    for k, stamps in sessions.items():
-        stamps.sort()
-        n = 1 + sum(1 for a, b in zip(stamps, stamps[1:]) if b - a > SESSION_GAP)
-        session_count += n
-        net = key_net.get(k)
-        if net in place:
-            place[net]["sessions"] += n
-
-    # --- trapped scanners ----------------------------------------------
-    scan_ips = defaultdict(lambda: {"hits": 0, "last": 0, "target": None})
-    scan_paths = defaultdict(int)
-    scan_hits = 0
-    scan_day = defaultdict(int)
-
-    def on_scanner(m, ts):
-        nonlocal scan_hits
-        ip = m.group("ip")
-        if is_self(ip):
-            return
-        scan_hits += 1
-        e = scan_ips[ip]
-        e["hits"] += 1
-        e["last"] = max(e["last"], ts.timestamp())
-        req = m.group("req").split(" ")
-        path = (req[1] if len(req) > 1 else "-").split("?")[0][:100]
-        e["target"] = e["target"] or path
-        scan_paths[path] += 1
-        scan_day[ts.astimezone(timezone.utc).strftime("%Y-%m-%d")] += 1
-
-    scanner_rows, scanner_files = scan(SCANNER_STEM, cutoff, on_scanner)
+    for s in win["sessions"].values():
+        session_count += s["n"]
+        if s["net"] in place:
+            place[s["net"]]["sessions"] += s["n"]
 
+    scan_ips = win["scanIps"]
+    scan_hits = win["scanHits"]
     top_scanners = sorted(scan_ips.items(), key=lambda kv: -kv[1]["hits"])[:TOP_N]
     scanners_out = []
     for ip, e in top_scanners:
@@ -389,61 +950,62 @@ def main():
     edge = read_edge()
     edge_pkts = sum(f["pkts"] for f in edge.get("feeds", []))
 
-    days_sorted = sorted(set(list(day.keys()) + list(scan_day.keys())))
+    served_days = [d for d in sorted(days) if days[d]["humans"] or days[d]["bots"]]
+    scanned_days = [d for d in sorted(days) if days[d]["scanHits"]]
     snapshot = {
         "generated": time.time(),
         "windowDays": WINDOW_DAYS,
+        "mode": mode,
         "tookMs": round((time.time() - t0) * 1000),
         "privacy": {
             "humans": "coarsened to /24 network, city and ASN — no visitor IP is stored or served",
             "automated": "scanners and edge-dropped hosts are shown at full IP",
         },
         "sources": {
-            "access": {"stem": ACCESS_STEM, "rows": access_rows, "files": access_files},
-            "scanner": {"stem": SCANNER_STEM, "rows": scanner_rows, "files": scanner_files},
+            **sources,                    # access, scanner (+ rotations on a rebuild)
             "edge": {"ok": edge["ok"], "host": EDGE_HOST, "error": edge.get("error")},
         },
         "funnel": {
             "edgeDropped": edge_pkts,
             "trapped": scan_hits,
-            "botsServed": bot_hits,
-            "humanHits": sum(d["humans"] for d in day.values()),
+            "botsServed": win["bots"],
+            "humanHits": win["humans"],
             "sessions": session_count,
         },
         "visitors": {
             "sessions": session_count,
             "uniqueNets": len(place),
-            "uniqueIpsSeen": len(human_ips),   # count only — the IPs are discarded
-            "pageviews": pageviews,
-            "prefetches": prefetches,
-            "selfHits": self_hits,
-            "byDay": [{"d": d, **day[d]} for d in days_sorted if d in day],
-            "byHourUtc": hour,
+            "uniqueIpsSeen": len(win["ips"]),   # count only — the IPs are discarded
+            "pageviews": win["pageviews"],
+            "prefetches": win["prefetches"],
+            "selfHits": win["self"],
+            "byDay": [{"d": d, "humans": days[d]["humans"], "bots": days[d]["bots"]} for d in served_days],
+            "byHourUtc": win["hour"],
             "places": sorted(place.values(), key=lambda p: (-p["reads"], -p["sessions"])),
             "countries": sorted(
-                ({"cc": cc, "hits": n} for cc, n in countries.items()),
+                ({"cc": cc, "hits": n} for cc, n in win["countries"].items()),
                 key=lambda c: -c["hits"],
             )[:TOP_N],
             "asns": sorted(
-                ({"asn": a, "org": v["org"], "hits": v["sessions"]} for a, v in asns.items()),
+                ({"asn": int(a), "org": v["org"], "hits": v["hits"]} for a, v in win["asns"].items()),
                 key=lambda a: -a["hits"],
             )[:TOP_N],
             "topPaths": sorted(
-                ({"path": p, "hits": n} for p, n in paths.items()), key=lambda p: -p["hits"]
+                ({"path": p, "hits": n} for p, n in win["paths"].items()), key=lambda p: -p["hits"]
             )[:TOP_N],
             "referrers": sorted(
-                ({"ref": r, "hits": n} for r, n in refs.items()), key=lambda r: -r["hits"]
+                ({"ref": r, "hits": n} for r, n in win["refs"].items()), key=lambda r: -r["hits"]
             )[:20],
-            "statuses": dict(sorted(statuses.items())),
+            "statuses": dict(sorted(win["statuses"].items())),
         },
         "scanners": {
             "hits": scan_hits,
             "uniqueIps": len(scan_ips),
-            "byDay": [{"d": d, "hits": scan_day[d]} for d in days_sorted if d in scan_day],
+            "byDay": [{"d": d, "hits": days[d]["scanHits"]} for d in scanned_days],
             "top": scanners_out,
             "places": sorted(scan_places.values(), key=lambda p: -p["hits"])[:400],
             "paths": sorted(
-                ({"path": p, "hits": n} for p, n in scan_paths.items()), key=lambda p: -p["hits"]
+                ({"path": p, "hits": n} for p, n in win["scanPaths"].items()), key=lambda p: -p["hits"]
             )[:TOP_N],
         },
         "edge": edge,
@@ -477,7 +1039,7 @@ def main():
         f"visitors: {session_count} sessions / {len(place)} nets, "
         f"{scan_hits} trapped from {len(scan_ips)} IPs, "
         f"edge {'ok' if edge['ok'] else 'DOWN'} ({edge_pkts} pkts) "
-        f"in {snapshot['tookMs']}ms → {OUT}"
+        f"in {snapshot['tookMs']}ms ({mode}) → {OUT}"
     )
 
 